@@ -13,6 +13,7 @@ from sqlalchemy import engine_from_config, pool
 from alembic import context
 from app.core.config import settings
 from app.db.base import Base, engine
+from app.db.partitions import is_partition_name
 from app.models import answer, question
 
 BASE_DIR = pathlib.Path(__file__).resolve().parent.parent
@@ -28,6 +29,16 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 
+def include_name(name, type_, parent_names) -> bool:
+    """
+    Не сравнивать с моделями секции answers (и отсоединённые секции):
+    их создают миграции и app.tools.answer_partitions, а не метаданные.
+    """
+    if type_ in ("table", "index"):
+        return not is_partition_name("answers", name)
+    return True
+
+
 def run_migrations_offline() -> None:
     """
     Запуск миграций без активного соединения.
@@ -40,6 +51,7 @@ def run_migrations_offline() -> None:
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
         compare_server_default=True,
+        include_name=include_name,
     )
     with context.begin_transaction():
         context.run_migrations()
@@ -58,6 +70,7 @@ def run_migrations_online() -> None:
             target_metadata=target_metadata,
             compare_type=True,
             compare_server_default=True,
+            include_name=include_name,
         )
         with context.begin_transaction():
             context.run_migrations()
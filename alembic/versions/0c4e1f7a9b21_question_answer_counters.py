@@ -0,0 +1,113 @@
+"""question answer counters
+
+Revision ID: 0c4e1f7a9b21
+Revises: 5d16430aa984
+Create Date: 2026-10-17 15:02:11.204816
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c4e1f7a9b21'
+down_revision: Union[str, Sequence[str], None] = '5d16430aa984'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Вопросов на одну транзакцию заполнения счётчиков
+BACKFILL_BATCH = 10_000
+
+_BACKFILL = sa.text(
+    """
+    UPDATE questions AS q
+    SET answers_count = s.cnt, last_answer_at = s.last_at
+    FROM (
+        SELECT question_id, count(*) AS cnt, max(created_at) AS last_at
+        FROM answers
+        WHERE question_id >= :lo AND question_id < :hi
+        GROUP BY question_id
+    ) AS s
+    WHERE q.id = s.question_id
+    """
+)
+
+
+def _backfill_counters() -> None:
+    """
+    Заполнить счётчики по уже существующим ответам.
+
+    Диапазонами id вопросов (по ix_answers_question_created), каждый —
+    отдельной транзакцией: один UPDATE по всей answers держал бы
+    блокировки строк questions до конца миграции. Вызывается в
+    autocommit_block.
+    """
+    bind = op.get_bind()
+    lo, last = bind.execute(
+        sa.text('SELECT min(id), max(id) FROM questions')
+    ).one()
+    if lo is None:
+        return
+    while lo <= last:
+        bind.execute(_BACKFILL, {'lo': lo, 'hi': lo + BACKFILL_BATCH})
+        lo += BACKFILL_BATCH
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'questions',
+        sa.Column(
+            'answers_count',
+            sa.Integer(),
+            server_default=sa.text('0'),
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        'questions',
+        sa.Column(
+            'last_answer_at', sa.DateTime(timezone=True), nullable=True
+        ),
+    )
+    # CONCURRENTLY не блокирует запись в большую таблицу,
+    # но не может выполняться внутри транзакции.
+    with op.get_context().autocommit_block():
+        _backfill_counters()
+        op.create_index(
+            'ix_questions_answers_count_id',
+            'questions',
+            [sa.text('answers_count DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_questions_last_activity_id',
+            'questions',
+            [
+                sa.text('coalesce(last_answer_at, created_at) DESC'),
+                sa.text('id DESC'),
+            ],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_questions_last_activity_id',
+            table_name='questions',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_questions_answers_count_id',
+            table_name='questions',
+            postgresql_concurrently=True,
+        )
+    op.drop_column('questions', 'last_answer_at')
+    op.drop_column('questions', 'answers_count')
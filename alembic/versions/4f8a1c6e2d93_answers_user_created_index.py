@@ -0,0 +1,41 @@
+"""answers user_id created_at index
+
+Revision ID: 4f8a1c6e2d93
+Revises: 9e2b6d4c1a37
+Create Date: 2026-10-17 18:42:37.250114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f8a1c6e2d93'
+down_revision: Union[str, Sequence[str], None] = '9e2b6d4c1a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись в большую таблицу,
+    # но не может выполняться внутри транзакции.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_answers_user_created',
+            'answers',
+            ['user_id', 'created_at'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_answers_user_created',
+            table_name='answers',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,38 @@
+"""question version
+
+Revision ID: 5d16430aa984
+Revises: b992c0a6727f
+Create Date: 2026-10-17 12:41:27.730914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d16430aa984'
+down_revision: Union[str, Sequence[str], None] = 'b992c0a6727f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Константный DEFAULT: в PostgreSQL 11+ колонка добавляется без
+    # перезаписи таблицы.
+    op.add_column(
+        'questions',
+        sa.Column(
+            'version',
+            sa.BigInteger(),
+            server_default=sa.text('1'),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('questions', 'version')
@@ -0,0 +1,66 @@
+"""full text search
+
+Revision ID: 7a3d2c9e5f10
+Revises: 0c4e1f7a9b21
+Create Date: 2026-10-17 16:20:45.118302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a3d2c9e5f10'
+down_revision: Union[str, Sequence[str], None] = '0c4e1f7a9b21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Совпадает с app.models.question.SEARCH_CONFIG на момент миграции
+SEARCH_CONFIG = 'russian'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # STORED-колонка вычисляется для всех строк: ALTER перезаписывает
+    # таблицу под эксклюзивной блокировкой — на больших таблицах
+    # выполнять в окно обслуживания.
+    for table in ('questions', 'answers'):
+        op.add_column(
+            table,
+            sa.Column(
+                'search_vector',
+                postgresql.TSVECTOR(),
+                sa.Computed(
+                    f"to_tsvector('{SEARCH_CONFIG}', text)", persisted=True
+                ),
+                nullable=True,
+            ),
+        )
+    # CONCURRENTLY не блокирует запись в большую таблицу,
+    # но не может выполняться внутри транзакции.
+    with op.get_context().autocommit_block():
+        for table in ('questions', 'answers'):
+            op.create_index(
+                f'ix_{table}_search_vector',
+                table,
+                ['search_vector'],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table in ('answers', 'questions'):
+            op.drop_index(
+                f'ix_{table}_search_vector',
+                table_name=table,
+                postgresql_concurrently=True,
+            )
+    for table in ('answers', 'questions'):
+        op.drop_column(table, 'search_vector')
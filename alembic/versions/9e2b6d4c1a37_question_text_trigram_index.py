@@ -0,0 +1,48 @@
+"""question text trigram index
+
+Revision ID: 9e2b6d4c1a37
+Revises: 7a3d2c9e5f10
+Create Date: 2026-10-17 18:05:12.604917
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e2b6d4c1a37'
+down_revision: Union[str, Sequence[str], None] = '7a3d2c9e5f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pg_trgm входит в contrib (есть в официальном образе postgres);
+    # создание расширения требует прав владельца БД.
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # CONCURRENTLY не блокирует запись в большую таблицу,
+    # но не может выполняться внутри транзакции.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_questions_text_trgm',
+            'questions',
+            ['text'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'text': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_questions_text_trgm',
+            table_name='questions',
+            postgresql_concurrently=True,
+        )
+    # Расширение не удаляем: им могут пользоваться другие объекты БД.
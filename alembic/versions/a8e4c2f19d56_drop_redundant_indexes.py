@@ -0,0 +1,78 @@
+"""drop redundant indexes
+
+Revision ID: a8e4c2f19d56
+Revises: d7b3f0a2c614
+Create Date: 2026-10-17 22:31:47.916204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8e4c2f19d56'
+down_revision: Union[str, Sequence[str], None] = 'd7b3f0a2c614'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# ix_questions_id и ix_answers_id повторяют первичные ключи,
+# ix_answers_question_id — префикс ix_answers_question_created
+ANSWER_INDEXES = (
+    ('ix_answers_question_id', 'question_id'),
+    ('ix_answers_id', 'id'),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись в большую таблицу,
+    # но не может выполняться внутри транзакции.
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_questions_id',
+            table_name='questions',
+            postgresql_concurrently=True,
+        )
+    # Индекс секционированной таблицы нельзя удалить CONCURRENTLY.
+    # DROP INDEX на родителе удаляет индексы всех секций без перестроения
+    # данных, но под эксклюзивной блокировкой answers; lock_timeout не
+    # даёт ему надолго встать в очередь за длинными запросами.
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    for name, _ in ANSWER_INDEXES:
+        op.drop_index(name, table_name='answers')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_questions_id',
+            'questions',
+            ['id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+    # Без блокировки записи: пустой индекс на родителе (ON ONLY),
+    # CONCURRENTLY-индексы на секциях, затем присоединение к родителю
+    partitions = op.get_bind().execute(
+        sa.text(
+            "SELECT inhrelid::regclass::text FROM pg_inherits "
+            "WHERE inhparent = 'answers'::regclass"
+        )
+    ).scalars().all()
+    for name, column in ANSWER_INDEXES:
+        op.execute(f'CREATE INDEX {name} ON ONLY answers ({column})')
+    with op.get_context().autocommit_block():
+        for name, column in ANSWER_INDEXES:
+            for partition in partitions:
+                op.execute(
+                    f'CREATE INDEX CONCURRENTLY IF NOT EXISTS '
+                    f'{partition}_{column}_idx ON {partition} ({column})'
+                )
+    for name, column in ANSWER_INDEXES:
+        for partition in partitions:
+            op.execute(
+                f'ALTER INDEX {name} ATTACH PARTITION {partition}_{column}_idx'
+            )
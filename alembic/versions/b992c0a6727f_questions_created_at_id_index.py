@@ -0,0 +1,42 @@
+"""questions created_at id index
+
+Revision ID: b992c0a6727f
+Revises: b3fbe945ca4f
+Create Date: 2026-10-17 10:12:03.418527
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b992c0a6727f'
+down_revision: Union[str, Sequence[str], None] = 'b3fbe945ca4f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись в большую таблицу,
+    # но не может выполняться внутри транзакции.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_questions_created_at_id',
+            'questions',
+            [sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_questions_created_at_id',
+            table_name='questions',
+            postgresql_concurrently=True,
+        )
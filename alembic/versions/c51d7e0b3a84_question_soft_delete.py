@@ -0,0 +1,52 @@
+"""question soft delete
+
+Revision ID: c51d7e0b3a84
+Revises: 4f8a1c6e2d93
+Create Date: 2026-10-17 20:03:51.772640
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c51d7e0b3a84'
+down_revision: Union[str, Sequence[str], None] = '4f8a1c6e2d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable-колонка без DEFAULT добавляется без перезаписи таблицы
+    op.add_column(
+        'questions',
+        sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    # CONCURRENTLY не блокирует запись в большую таблицу,
+    # но не может выполняться внутри транзакции.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_questions_deleted_at',
+            'questions',
+            ['deleted_at'],
+            unique=False,
+            postgresql_where=sa.text('deleted_at IS NOT NULL'),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_questions_deleted_at',
+            table_name='questions',
+            postgresql_where=sa.text('deleted_at IS NOT NULL'),
+            postgresql_concurrently=True,
+        )
+    # Вопросы, ожидающие очистки, удаляются сразу (каскадно с ответами)
+    op.execute('DELETE FROM questions WHERE deleted_at IS NOT NULL')
+    op.drop_column('questions', 'deleted_at')
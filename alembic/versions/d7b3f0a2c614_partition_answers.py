@@ -0,0 +1,175 @@
+"""partition answers
+
+Revision ID: d7b3f0a2c614
+Revises: c51d7e0b3a84
+Create Date: 2026-10-17 21:14:08.503917
+
+"""
+from datetime import datetime, timezone
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.db.partitions import (
+    add_months,
+    initial_partitions_ddl,
+    month_start,
+    partition_by,
+    partition_key,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7b3f0a2c614'
+down_revision: Union[str, Sequence[str], None] = 'c51d7e0b3a84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Совпадает с app.models.question.SEARCH_CONFIG на момент миграции
+SEARCH_CONFIG = 'russian'
+
+OLD_TABLE = 'answers_unpartitioned'
+
+COPY_COLUMNS = 'id, question_id, user_id, text, created_at'
+
+# Индексы answers на момент миграции (одинаковы до и после)
+INDEXES = (
+    ('ix_answers_id', ['id'], {}),
+    ('ix_answers_question_id', ['question_id'], {}),
+    ('ix_answers_question_created', ['question_id', 'created_at'], {}),
+    ('ix_answers_user_created', ['user_id', 'created_at'], {}),
+    (
+        'ix_answers_search_vector',
+        ['search_vector'],
+        {'postgresql_using': 'gin'},
+    ),
+)
+
+
+def _create_answers(partition_clause: Optional[str]) -> None:
+    """Таблица answers без ограничений и индексов (строятся после копии)."""
+    kwargs = {}
+    if partition_clause is not None:
+        kwargs['postgresql_partition_by'] = partition_clause
+    op.create_table(
+        'answers',
+        sa.Column(
+            'id',
+            sa.BigInteger(),
+            server_default=sa.text("nextval('answers_id_seq'::regclass)"),
+            nullable=False,
+        ),
+        sa.Column('question_id', sa.BigInteger(), nullable=False),
+        sa.Column('user_id', sa.UUID(as_uuid=False), nullable=False),
+        sa.Column('text', sa.String(length=1000), nullable=False),
+        sa.Column(
+            'created_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('CURRENT_TIMESTAMP'),
+            nullable=False,
+        ),
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                f"to_tsvector('{SEARCH_CONFIG}', text)", persisted=True
+            ),
+            nullable=True,
+        ),
+        **kwargs,
+    )
+
+
+def _copy_and_swap(primary_key: Sequence[str]) -> None:
+    """Перенести строки из OLD_TABLE в новую answers и достроить схему."""
+    op.execute(
+        f'INSERT INTO answers ({COPY_COLUMNS}) '
+        f'SELECT {COPY_COLUMNS} FROM {OLD_TABLE}'
+    )
+    # Последовательность id переходит к новой таблице, иначе DROP
+    # старой удалит её вместе с колонкой
+    op.execute('ALTER SEQUENCE answers_id_seq OWNED BY answers.id')
+    op.drop_table(OLD_TABLE)
+
+    # Индексы строятся после загрузки — так быстрее, чем поддерживать
+    # их при вставке
+    op.create_primary_key('answers_pkey', 'answers', list(primary_key))
+    op.create_check_constraint(
+        'ck_answers_text_not_blank', 'answers', "btrim(text) <> ''"
+    )
+    op.create_foreign_key(
+        'answers_question_id_fkey',
+        'answers',
+        'questions',
+        ['question_id'],
+        ['id'],
+        ondelete='CASCADE',
+    )
+    for name, columns, kwargs in INDEXES:
+        op.create_index(name, 'answers', columns, unique=False, **kwargs)
+
+
+def _require_opt_in() -> None:
+    """
+    Не переписывать непустую таблицу без ANSWERS_PARTITION_MIGRATE.
+
+    start.sh выполняет alembic upgrade head при каждом старте контейнера:
+    без проверки обычный деплой заблокировал бы запись ответов на всё
+    время копирования. Пустая таблица (новая база) переписывается
+    мгновенно и флага не требует.
+    """
+    if settings.answers_partition_migrate:
+        return
+    has_rows = op.get_bind().execute(
+        sa.text('SELECT EXISTS (SELECT 1 FROM answers)')
+    ).scalar()
+    if has_rows:
+        raise RuntimeError(
+            f'Migration {revision} rewrites the answers table under '
+            'an exclusive lock. Set ANSWERS_PARTITION_MIGRATE=true and '
+            'run it manually in a maintenance window'
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Таблица переписывается целиком: запись в answers блокируется сразу,
+    # чтение — с переименования и до конца миграции. На непустой таблице
+    # выполняется только вручную (_require_opt_in).
+    _require_opt_in()
+    scheme = settings.answers_partition_by
+    op.execute('LOCK TABLE answers IN EXCLUSIVE MODE')
+    op.rename_table('answers', OLD_TABLE)
+    _create_answers(partition_by(scheme))
+
+    # range: секции с месяца самого старого ответа и на
+    # ANSWERS_PARTITIONS_AHEAD месяцев вперёд
+    this_month = month_start(datetime.now(timezone.utc).date())
+    oldest = op.get_bind().execute(
+        sa.text(
+            f"SELECT min(created_at AT TIME ZONE 'UTC') FROM {OLD_TABLE}"
+        )
+    ).scalar()
+    for ddl in initial_partitions_ddl(
+        scheme,
+        table='answers',
+        hash_partitions=settings.answers_hash_partitions,
+        first_month=oldest.date() if oldest else this_month,
+        last_month=add_months(this_month, settings.answers_partitions_ahead),
+    ):
+        op.execute(ddl)
+
+    _copy_and_swap(['id', partition_key(scheme)])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _require_opt_in()
+    op.execute('LOCK TABLE answers IN EXCLUSIVE MODE')
+    op.rename_table('answers', OLD_TABLE)
+    _create_answers(None)
+    # DROP секционированной таблицы удаляет и все её секции
+    _copy_and_swap(['id'])
@@ -0,0 +1,345 @@
+"""
+In-process кэш сериализованных ответов API.
+
+Хранит готовые тела ответов (bytes) и их заголовки, а не ORM-объекты:
+попадание в кэш не требует ни обращения к БД, ни сериализации.
+
+Возможности:
+    - ограничение по числу записей с вытеснением LRU;
+    - TTL и окно stale-while-revalidate: устаревшая запись ещё
+    stale_ttl секунд отдаётся как есть, а обновляется в фоне
+    (одновременно не более одного обновления на ключ);
+    - теги для точечной инвалидации (например, все страницы вопроса);
+    - защита от гонки: результат загрузки, начатой до инвалидации,
+    в кэш не записывается;
+    - окно после инвалидации (settle): промахи читают с реплик, которые
+    могут ещё не догнать запись, поэтому settle секунд после
+    инвалидации тега загруженное с этим тегом не сохраняется;
+    - счётчики hits/misses/stale_hits/evictions/invalidations.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from app.core.config import settings
+from app.db.hooks import on_commit
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+# Тег всех страниц списка вопросов
+QUESTION_LIST_TAG = "questions:list"
+
+
+def question_tag(question_id: int) -> str:
+    """Тег всех закэшированных представлений одного вопроса."""
+    return f"question:{question_id}"
+
+
+@dataclass
+class CachedResponse:
+    """
+    Сериализованный ответ API.
+
+    Args:
+        body (bytes): Тело ответа (JSON);
+        headers (Dict[str, str]): Дополнительные заголовки ответа.
+    """
+
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+Loader = Callable[[], Awaitable[Optional[CachedResponse]]]
+
+
+@dataclass
+class _Entry:
+    value: CachedResponse
+    stored_at: float
+    tags: Tuple[str, ...]
+
+
+class ResponseCache:
+    """
+    Ограниченный LRU+TTL кэш ответов с инвалидацией по тегам.
+
+    Args:
+        max_entries (int): Максимум записей; сверх него вытесняются
+            давно не использованные;
+        ttl (float): Время свежести записи, сек.;
+        stale_ttl (float): Сколько секунд после ttl запись ещё отдаётся
+            с фоновым обновлением (0 — stale-while-revalidate выключен);
+        enabled (bool): Если False — кэш прозрачен (всегда промах);
+        settle (float): Сколько секунд после инвалидации тега не
+            сохранять загрузки с этим тегом (0 — сохранять сразу);
+        clock (Callable[[], float]): Источник времени (для тестов).
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 10_000,
+        ttl: float = 30.0,
+        stale_ttl: float = 0.0,
+        enabled: bool = True,
+        settle: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.enabled = enabled
+        self.settle = settle
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._by_tag: Dict[str, Set[Hashable]] = {}
+        self._refreshing: Set[Hashable] = set()
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self._generation = 0
+        self._invalidated_at: Dict[str, float] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        load: Loader,
+        *,
+        tags: Iterable[str] = (),
+        refresh: Optional[Loader] = None,
+        bypass: bool = False,
+    ) -> Optional[CachedResponse]:
+        """
+        Read-through: отдать ответ из кэша или загрузить и сохранить.
+
+        Args:
+            key: Ключ кэша.
+            load: Загрузка в рамках текущего запроса; None — «не найдено»
+                (не кэшируется).
+            tags: Теги для инвалидации.
+            refresh: Загрузка для фонового обновления устаревшей записи;
+                должна сама открывать ресурсы (сессия запроса к этому
+                моменту может быть закрыта). Без неё stale-while-revalidate
+                для ключа не применяется.
+            bypass: Не читать и не заполнять кэш (клиент в окне
+                read-your-writes должен видеть данные primary).
+
+        Returns:
+            Ответ или None, если load ничего не нашёл.
+        """
+        if not self.enabled or bypass:
+            return await load()
+
+        tags = tuple(tags)
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = self._clock() - entry.stored_at
+            if age <= self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry.value
+            if refresh is not None and age <= self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                self._schedule_refresh(key, refresh, tags)
+                return entry.value
+
+        self.misses += 1
+        generation = self._generation
+        value = await load()
+        if value is not None:
+            self._store(key, value, tags, generation)
+        return value
+
+    def peek(self, key: Hashable) -> Optional[CachedResponse]:
+        """
+        Отдать свежую запись без загрузки.
+
+        Args:
+            key: Ключ кэша.
+
+        Returns:
+            Ответ или None, если записи нет или она старше ttl.
+        """
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None or self._clock() - entry.stored_at > self.ttl:
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def invalidate(self, *tags: str) -> None:
+        """
+        Удалить все записи с любым из тегов.
+
+        Загрузки, начатые до вызова, свои результаты не сохранят.
+
+        Args:
+            tags: Теги записей.
+        """
+        self._generation += 1
+        if self.settle > 0:
+            self._mark_invalidated(tags)
+        for tag in tags:
+            for key in self._by_tag.pop(tag, ()):
+                if self._drop(key):
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        """Очистить кэш (счётчики сохраняются)."""
+        self._generation += 1
+        self._entries.clear()
+        self._by_tag.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Снимок счётчиков и размера кэша."""
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _store(
+        self,
+        key: Hashable,
+        value: CachedResponse,
+        tags: Tuple[str, ...],
+        generation: int,
+    ) -> None:
+        if generation != self._generation:
+            # Пока шла загрузка, что-то инвалидировали — значение могло
+            # устареть ещё до записи в кэш.
+            return
+        if self._settling(tags):
+            # Загрузка после записи могла читать с отстающей реплики
+            return
+        self._drop(key)
+        self._entries[key] = _Entry(value, self._clock(), tags)
+        for tag in tags:
+            self._by_tag.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _mark_invalidated(self, tags: Iterable[str]) -> None:
+        now = self._clock()
+        for tag in tags:
+            self._invalidated_at[tag] = now
+        if len(self._invalidated_at) > self.max_entries:
+            self._invalidated_at = {
+                tag: at
+                for tag, at in self._invalidated_at.items()
+                if now - at < self.settle
+            }
+
+    def _settling(self, tags: Tuple[str, ...]) -> bool:
+        if self.settle <= 0:
+            return False
+        now = self._clock()
+        for tag in tags:
+            at = self._invalidated_at.get(tag)
+            if at is not None and now - at < self.settle:
+                return True
+        return False
+
+    def _drop(self, key: Hashable) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        for tag in entry.tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+        return True
+
+    def _schedule_refresh(
+        self, key: Hashable, refresh: Loader, tags: Tuple[str, ...]
+    ) -> None:
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        # Держим ссылку на задачу, иначе её может собрать GC до завершения
+        task = asyncio.get_running_loop().create_task(
+            self._refresh(key, refresh, tags)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(
+        self, key: Hashable, refresh: Loader, tags: Tuple[str, ...]
+    ) -> None:
+        generation = self._generation
+        try:
+            value = await refresh()
+        except Exception:
+            logger.exception("Cache refresh failed for %r", key)
+            return
+        finally:
+            self._refreshing.discard(key)
+        if value is None:
+            self._drop(key)
+        else:
+            self._store(key, value, tags, generation)
+
+
+response_cache = ResponseCache(
+    max_entries=settings.response_cache_max_entries,
+    ttl=settings.response_cache_ttl,
+    stale_ttl=settings.response_cache_stale_ttl,
+    # Кэш и его инвалидация — в памяти процесса: при нескольких воркерах
+    # запись на одном не сбросила бы кэш (и ETag'и деталки) остальных
+    enabled=(
+        settings.response_cache_enabled and (settings.server_workers or 1) == 1
+    ),
+    # Промахи читают с реплик: окно read-your-writes должно превышать их
+    # отставание, оно же — окно после инвалидации
+    settle=(
+        settings.read_your_writes_window
+        if settings.database_replica_urls
+        else 0.0
+    ),
+)
+
+
+def invalidate_on_commit(db: "AsyncSession", *tags: str) -> None:
+    """
+    Инвалидировать теги response_cache после коммита сессии.
+
+    Args:
+        db: Сессия записи (unit of work).
+        tags: Теги записей кэша.
+    """
+    on_commit(db, lambda: response_cache.invalidate(*tags))
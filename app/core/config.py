@@ -2,19 +2,227 @@
 Модуль конфигурации приложения.
 
 - Считывает переменные окружения из '.env' и предоставляет
-объект настроек 'settings'.
+объект настроек 'settings' (get_settings()): он создаётся при первом
+обращении, а не при импорте модуля.
 - Используется для доступа к параметрам подключения к БД и
 другим конфигам проекта.
 """
 
+import functools
+import math
+import os
+import re
+from typing import Any, List, Literal, Optional
+
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 
+def to_async_url(url: str) -> str:
+    """
+    Заменить драйвер в DSN PostgreSQL на asyncpg.
+
+    Args:
+        url: DSN вида postgresql[+driver]://...
+
+    Returns:
+        DSN вида postgresql+asyncpg://...
+    """
+    return re.sub(r"^postgresql(\+\w+)?://", "postgresql+asyncpg://", url)
+
+
+def available_cpus() -> int:
+    """
+    Число CPU, доступных процессу: по affinity (cpuset) и по квоте
+    cgroup v2 (лимит CPU контейнера) — что меньше.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # не Linux
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max", encoding="ascii") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
 class Settings(BaseSettings):
     database_url: str
+    # DSN для асинхронного драйвера; по умолчанию выводится из database_url
+    async_database_url: Optional[str] = None
+
+    # Пул соединений (значения по умолчанию — как у SQLAlchemy)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    # Пересоздавать соединения старше N секунд (-1 — не пересоздавать)
+    db_pool_recycle: int = -1
+    # Проверять соединение перед выдачей из пула
+    db_pool_pre_ping: bool = False
+    # statement_timeout для каждого соединения, мс (None — серверный)
+    db_statement_timeout_ms: Optional[int] = None
+    # Бюджет соединений с каждой базой на все воркеры сервера: пул
+    # воркера урезается до DB_MAX_CONNECTIONS // SERVER_WORKERS
+    # (app.db.pool.worker_pool_limits). None — без общего бюджета.
+    db_max_connections: Optional[int] = None
+
+    # DSN реплик для read-only сессий (JSON-список); пусто — читаем с primary
+    database_replica_urls: List[str] = []
+    # Период и таймаут health-check реплик, сек.
+    replica_check_interval: float = 5.0
+    replica_check_timeout: float = 2.0
+    # Окно read-your-writes: столько секунд после записи клиент читает
+    # с primary. Должно превышать типичное отставание реплик.
+    read_your_writes_window: float = 5.0
+
+    # Сервер (python -m app.server): адрес и число процессов-воркеров.
+    # None — один процесс; app.server подставляет число CPU, доступных
+    # процессу, и передаёт его воркерам. От числа воркеров зависят пул
+    # соединений (DB_MAX_CONNECTIONS) и кэш ответов (только при одном).
+    app_host: str = "0.0.0.0"
+    app_port: int = 8000
+    server_workers: Optional[int] = None
+    # Номер воркера, выставляется app.server (None — не под app.server).
+    # Фоновые задачи базы (очистка удалённых вопросов) выполняет только
+    # воркер 0.
+    server_worker_id: Optional[int] = None
+    # Воркер перезапускается после стольких запросов плюс случайные
+    # 0..SERVER_MAX_REQUESTS_JITTER (чтобы воркеры не перезапускались
+    # разом) — ограничение роста памяти; None — не перезапускать.
+    server_max_requests: Optional[int] = 50_000
+    server_max_requests_jitter: int = 5_000
+    # Остановка по SIGTERM: ещё SERVER_DRAIN_DELAY сек. воркеры
+    # принимают запросы (балансировщик успевает исключить под), затем
+    # перестают принимать соединения и ждут текущие запросы не дольше
+    # SERVER_GRACEFUL_TIMEOUT сек.
+    server_drain_delay: float = 0.0
+    server_graceful_timeout: float = 30.0
+
+    # Прогрев при старте процесса (app.core.warmup): открыть столько
+    # соединений пула на движок (None — размер пула воркера) и выполнить на
+    # каждом горячие запросы. Ошибка или таймаут прогрева не мешают
+    # старту — только первые запросы будут медленнее.
+    startup_warmup: bool = True
+    startup_warm_connections: Optional[int] = None
+    startup_warmup_timeout: float = 10.0
+
+    # In-process кэш ответов GET /questions/ и GET /questions/{id}
+    response_cache_enabled: bool = True
+    response_cache_max_entries: int = 10_000
+    response_cache_ttl: float = 30.0
+    # Окно stale-while-revalidate после TTL, сек. (0 — выключено)
+    response_cache_stale_ttl: float = 0.0
+
+    # GET /metrics и замеры запросов (app.core.metrics)
+    metrics_enabled: bool = True
+
+    # Инспекция SQL (app.db.queries): запросы дольше порога пишутся в
+    # журнал, для доли из них снимается EXPLAIN (ANALYZE, BUFFERS)
+    slow_query_threshold_ms: Optional[float] = 500.0
+    slow_query_explain_sample_rate: float = 0.05
+    # Бюджеты запросов маршрутов (app.core.query_budget): warn — журнал,
+    # raise — исключение (тесты), off — не проверять. Одинаковый текст
+    # SQL чаще QUERY_REPEATS_LIMIT раз за HTTP-запрос — признак N+1.
+    query_budget_mode: Literal["off", "warn", "raise"] = "warn"
+    query_repeats_limit: Optional[int] = 5
+
+    # Токен служебных маршрутов /internal/* (заголовок X-Internal-Token).
+    # Не задан — маршруты недоступны (404).
+    internal_token: Optional[str] = None
+
+    # Профилирование запросов по требованию (app.core.profiling):
+    # запросы с заголовком X-Profile: <PROFILING_TOKEN> (без токена —
+    # только выборка) и доля PROFILING_SAMPLE_RATE остальных.
+    # Профили — GET /internal/profiles (с заголовком X-Profiling-Token:
+    # <PROFILING_TOKEN>) и, если задан, PROFILING_DIR.
+    profiling_enabled: bool = False
+    profiling_token: Optional[str] = None
+    profiling_sample_rate: float = 0.0
+    profiling_interval_ms: float = 5.0
+    profiling_keep: int = 50
+    profiling_dir: Optional[str] = None
+
+    # Cache-Control: max-age для GET /answers/{id}, сек. Ответы не
+    # редактируются, но могут быть удалены — поэтому не бесконечно.
+    answer_cache_max_age: int = 3600
+
+    # Запись ответов через очередь с групповым коммитом (app.db.ingest):
+    # off — каждый ответ своей транзакцией; async — 202 и tracking id
+    # сразу после приёма в очередь; sync — ответ после коммита группы.
+    answer_ingest_mode: Literal["off", "async", "sync"] = "off"
+    answer_ingest_queue_size: int = 10_000
+    answer_ingest_batch_size: int = 500
+    # Сколько писатель добирает группу после первого ответа, сек.
+    answer_ingest_max_delay: float = 0.01
+    # Сколько при остановке ждать записи принятых ответов, сек.
+    answer_ingest_drain_timeout: float = 10.0
+
+    # Фоновая очистка удалённых вопросов (app.db.purge): ответы
+    # удаляются пачками по QUESTION_PURGE_BATCH, каждая — своей
+    # транзакцией, с паузой между пачками; проход — раз в интервал
+    # и сразу после DELETE /questions/{id}.
+    question_purge_enabled: bool = True
+    question_purge_batch: int = 1000
+    question_purge_batch_pause: float = 0.0
+    question_purge_interval: float = 30.0
+
+    # Секционирование answers (app.db.partitions): hash — по question_id
+    # на ANSWERS_HASH_PARTITIONS секций, range — по месяцам created_at.
+    # Применяется при миграции; смена схемы — только пересозданием таблицы.
+    answers_partition_by: Literal["hash", "range"] = "hash"
+    answers_hash_partitions: int = 16
+    # Миграция секционирования переписывает непустую answers под
+    # блокировкой записи; без этого флага она на непустой таблице
+    # завершается ошибкой до блокировки (alembic upgrade в start.sh не
+    # запустит её при обычном деплое) — выполнять вручную в окно
+    # обслуживания: ANSWERS_PARTITION_MIGRATE=true alembic upgrade head
+    answers_partition_migrate: bool = False
+    # range: на сколько месяцев вперёд создавать секции и сколько прошлых
+    # месяцев хранить (None — не отсоединять), app.tools.answer_partitions
+    answers_partitions_ahead: int = 3
+    answers_retention_months: Optional[int] = None
+
+    # Максимум элементов в одном запросе массовой загрузки
+    bulk_max_items: int = 5000
+
+    # DELETE /users/{id}/answers удаляет ответы пачками по столько
+    # строк, каждая пачка — в своей транзакции (короткие блокировки)
+    user_answers_delete_batch: int = 1000
+
+    # Полнотекстовый поиск ранжирует не более стольких самых новых
+    # совпадений в каждой таблице (вопросы, ответы): для частых слов
+    # ts_rank по всем совпадениям стоил бы O(числа строк).
+    search_max_candidates: int = 5000
+
+    # Поиск похожих вопросов (pg_trgm): порог similarity() от 0 до 1
+    # и число возвращаемых вопросов
+    similar_questions_threshold: float = 0.3
+    similar_questions_limit: int = 5
 
     class Config:
         env_file = ".env"
 
+    @model_validator(mode="after")
+    def derive_async_database_url(self) -> "Settings":
+        """Если async-DSN не задан явно — берём database_url с asyncpg."""
+        if self.async_database_url is None:
+            self.async_database_url = to_async_url(self.database_url)
+        return self
+
+
+@functools.lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Настройки процесса (читаются из окружения один раз)."""
+    return Settings()
+
 
-settings = Settings()
+def __getattr__(name: str) -> Any:
+    # settings — при первом обращении (from app.core.config import
+    # settings), чтобы импорт модуля не читал окружение
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,48 @@
+"""
+Утилиты HTTP-валидаторов (ETag / If-None-Match).
+
+ETag строится из дешёвого признака версии ресурса (например,
+Question.version) и параметров представления, поэтому проверка
+If-None-Match не требует загрузки и сериализации самого ресурса.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Optional
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Построить сильный ETag из составляющих версии представления.
+
+    Args:
+        parts: Идентификатор, версия и параметры представления ресурса.
+
+    Returns:
+        ETag в кавычках, например '"3f2a..."'.
+    """
+    raw = "\x1f".join(str(p) for p in parts).encode()
+    return f'"{hashlib.blake2b(raw, digest_size=12).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Совпадает ли ETag с заголовком If-None-Match.
+
+    Для If-None-Match используется слабое сравнение (RFC 9110):
+    префикс W/ игнорируется; "*" совпадает с любым ETag.
+
+    Args:
+        if_none_match: Значение заголовка If-None-Match.
+        etag: Текущий ETag ресурса.
+
+    Returns:
+        True, если клиенту можно ответить 304 Not Modified.
+    """
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+    return any(c.removeprefix("W/") == etag for c in candidates)
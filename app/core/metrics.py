@@ -0,0 +1,368 @@
+"""
+Метрики приложения в текстовом формате Prometheus (GET /metrics).
+
+Содержит:
+    - Counter, Histogram, CallbackMetric — минимальные метрики с метками
+    (без внешних зависимостей);
+    - MetricsRegistry — набор метрик и их вывод в формате text 0.0.4;
+    - metrics — реестр приложения: задержки, счётчики запросов и ошибок
+    по маршрутам, число и время SQL-запросов на HTTP-запрос (из
+    app.db.queries), счётчики пула соединений API (app.db.pool);
+    - MetricsMiddleware — ASGI middleware, которое всё это замеряет.
+
+Метка route — шаблон пути маршрута (/questions/{question_id}), а не
+сам путь, чтобы число рядов не росло с числом id; запросы без
+подходящего маршрута попадают в route="<unmatched>".
+
+Метрики обновляются в потоке event loop без блокировок; значения —
+на процесс (при нескольких воркерах Prometheus собирает каждый).
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import time
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.base import async_engine, pool_stats
+from app.db.queries import query_totals, track_queries
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _format_sample(name: str, labels: Dict[str, str], value: float) -> str:
+    if not labels:
+        return f"{name} {_format_value(value)}"
+    pairs = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+    return f"{name}{{{pairs}}} {_format_value(value)}"
+
+
+class Counter:
+    """
+    Монотонный счётчик с метками.
+
+    Args:
+        name (str): Имя метрики (с суффиксом _total);
+        help (str): Описание;
+        labels (Sequence[str]): Имена меток.
+    """
+
+    type = "counter"
+
+    def __init__(
+        self, name: str, help: str, labels: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        """Увеличить ряд с указанными значениями меток."""
+        self._values[label_values] = (
+            self._values.get(label_values, 0.0) + amount
+        )
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def samples(self) -> Iterable[Sample]:
+        for values, value in sorted(self._values.items()):
+            yield self.name, dict(zip(self.labels, values)), value
+
+
+class Histogram:
+    """
+    Гистограмма с фиксированными границами корзин и метками.
+
+    Args:
+        name (str): Имя метрики;
+        help (str): Описание;
+        buckets (Sequence[float]): Верхние границы корзин по возрастанию
+            (+Inf добавляется автоматически);
+        labels (Sequence[str]): Имена меток.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        buckets: Sequence[float],
+        labels: Sequence[str] = (),
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # Ряд: [число наблюдений по корзинам (не накопительно), сумма]
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Учесть наблюдение в ряду с указанными значениями меток."""
+        series = self._series.get(label_values)
+        if series is None:
+            series = ([0] * (len(self.buckets) + 1), [0.0])
+            self._series[label_values] = series
+        counts, total = series
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return sum(series[0]) if series is not None else 0
+
+    def samples(self) -> Iterable[Sample]:
+        bounds = (*self.buckets, math.inf)
+        for values, (counts, total) in sorted(self._series.items()):
+            labels = dict(zip(self.labels, values))
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                yield (
+                    f"{self.name}_bucket",
+                    {**labels, "le": _format_value(float(bound))},
+                    cumulative,
+                )
+            yield f"{self.name}_sum", labels, total[0]
+            yield f"{self.name}_count", labels, cumulative
+
+
+class CallbackMetric:
+    """
+    Метрика без меток, значение которой читается при выводе.
+
+    Args:
+        name (str): Имя метрики;
+        help (str): Описание;
+        type (str): counter или gauge;
+        read (Callable[[], Optional[float]]): Текущее значение (None —
+            ряд не выводится).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        type: str,
+        read: Callable[[], Optional[float]],
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.type = type
+        self._read = read
+
+    def samples(self) -> Iterable[Sample]:
+        value = self._read()
+        if value is not None:
+            yield self.name, {}, value
+
+
+Metric = Union[Counter, Histogram, CallbackMetric]
+M = TypeVar("M", Counter, Histogram, CallbackMetric)
+
+
+class MetricsRegistry:
+    """Набор метрик, выводимых одним текстом."""
+
+    def __init__(self) -> None:
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: M) -> M:
+        """Добавить метрику; возвращает её же."""
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Текстовый формат Prometheus (text/plain; version=0.0.4)."""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(
+                _format_sample(*sample) for sample in metric.samples()
+            )
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+http_requests = metrics.register(
+    Counter(
+        "http_requests_total",
+        "HTTP requests by route and status code.",
+        ("method", "route", "status"),
+    )
+)
+http_errors = metrics.register(
+    Counter(
+        "http_request_errors_total",
+        "HTTP requests that failed with 5xx or an unhandled exception.",
+        ("method", "route"),
+    )
+)
+http_latency = metrics.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency, including the response body.",
+        LATENCY_BUCKETS,
+        ("method", "route"),
+    )
+)
+db_statements = metrics.register(
+    Histogram(
+        "http_request_db_statements",
+        "SQL statements executed per HTTP request.",
+        STATEMENT_BUCKETS,
+        ("method", "route"),
+    )
+)
+db_seconds = metrics.register(
+    Histogram(
+        "http_request_db_seconds",
+        "Time spent in SQL statements per HTTP request.",
+        LATENCY_BUCKETS,
+        ("method", "route"),
+    )
+)
+metrics.register(
+    CallbackMetric(
+        "db_statements_total",
+        "SQL statements executed, including background tasks.",
+        "counter",
+        lambda: query_totals.statements,
+    )
+)
+metrics.register(
+    CallbackMetric(
+        "db_statement_seconds_total",
+        "Time spent in SQL statements, including background tasks.",
+        "counter",
+        lambda: query_totals.seconds,
+    )
+)
+
+
+def _pool_value(key: str) -> Callable[[], Optional[float]]:
+    return lambda: pool_stats.snapshot(async_engine.pool)[key]
+
+
+for _name, _key, _type, _help in (
+    (
+        "db_pool_checked_out",
+        "checkedout",
+        "gauge",
+        "Connections currently checked out of the pool.",
+    ),
+    (
+        "db_pool_checkouts_total",
+        "checkouts",
+        "counter",
+        "Connections checked out of the pool.",
+    ),
+    (
+        "db_pool_timeouts_total",
+        "timeouts",
+        "counter",
+        "Pool checkouts that hit pool_timeout.",
+    ),
+    (
+        "db_pool_wait_seconds_total",
+        "wait_seconds_total",
+        "counter",
+        "Time spent waiting for a pool connection.",
+    ),
+):
+    metrics.register(CallbackMetric(_name, _help, _type, _pool_value(_key)))
+
+
+def route_template(scope: Scope) -> str:
+    """Шаблон пути маршрута, обработавшего запрос."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware: задержка, статус и SQL-запросы каждого HTTP-запроса.
+
+    Реализовано без BaseHTTPMiddleware (лишняя задача и копирование
+    тела ответа на каждый запрос).
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        failed = True
+        with track_queries() as queries:
+            try:
+                await self.app(scope, receive, send_wrapper)
+                failed = status_code >= 500
+            finally:
+                elapsed = time.perf_counter() - started
+                labels = (scope["method"], route_template(scope))
+                http_requests.inc(*labels, str(status_code))
+                if failed:
+                    http_errors.inc(*labels)
+                http_latency.observe(elapsed, *labels)
+                db_statements.observe(queries.statements, *labels)
+                db_seconds.observe(queries.seconds, *labels)
@@ -0,0 +1,138 @@
+"""
+Утилиты keyset-пагинации.
+
+Курсор — непрозрачный для клиента токен, кодирующий позицию последней
+отданной записи в виде пары (ключ сортировки, id); по умолчанию ключ —
+created_at, для других сортировок — их значение (число ответов,
+релевантность поиска). Следующая страница выбирается условием по этой
+паре, а не через OFFSET, поэтому стоимость запроса не зависит от глубины
+страницы.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import (
+    Any,
+    Callable,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+# Максимальный размер страницы для всех списковых эндпоинтов
+MAX_PAGE_SIZE = 500
+
+# Заголовок ответа с курсором следующей страницы
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class _Keyed(Protocol):
+    id: int
+    created_at: datetime
+
+
+T = TypeVar("T", bound=_Keyed)
+
+
+# Ключ сортировки в курсоре
+SortKey = Union[datetime, int, float]
+
+
+class InvalidCursorError(ValueError):
+    """Курсор повреждён или сформирован не этим сервисом."""
+
+
+def encode_cursor(key: SortKey, item_id: int) -> str:
+    """
+    Закодировать позицию записи в курсор.
+
+    Args:
+        key: Ключ сортировки последней записи страницы (created_at или
+            числовое значение другой сортировки).
+        item_id: Идентификатор последней записи страницы.
+
+    Returns:
+        Строка base64url без паддинга.
+    """
+    raw_key = key.isoformat() if isinstance(key, datetime) else key
+    raw = json.dumps([raw_key, item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).rstrip(b"=").decode()
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def decode_cursor(
+    cursor: str, *, key_type: Type[SortKey] = datetime
+) -> Tuple[Any, int]:
+    """
+    Раскодировать курсор в пару (ключ сортировки, id).
+
+    Args:
+        cursor: Курсор, ранее выданный encode_cursor.
+        key_type: Ожидаемый тип ключа: datetime (created_at), int или
+            float.
+
+    Returns:
+        Кортеж (ключ, id).
+
+    Raises:
+        InvalidCursorError: если курсор не удаётся разобрать или ключ
+            другого типа (курсор выдан для другой сортировки).
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw_key, item_id = json.loads(
+            base64.urlsafe_b64decode(padded.encode())
+        )
+        if key_type is datetime:
+            key: SortKey = datetime.fromisoformat(raw_key)
+        elif _is_int(raw_key) or (
+            key_type is float and isinstance(raw_key, float)
+        ):
+            key = key_type(raw_key)
+        else:
+            raise ValueError("cursor key type mismatch")
+    except (binascii.Error, TypeError, ValueError) as exc:
+        raise InvalidCursorError("invalid cursor") from exc
+    if not _is_int(item_id):
+        raise InvalidCursorError("invalid cursor")
+    return key, item_id
+
+
+def split_page(
+    items: Sequence[T],
+    limit: int,
+    *,
+    key: Optional[Callable[[T], SortKey]] = None,
+) -> Tuple[List[T], Optional[str]]:
+    """
+    Отрезать страницу от выборки размером limit + 1.
+
+    Лишняя запись служит признаком наличия следующей страницы и в
+    выдачу не попадает.
+
+    Args:
+        items: Записи, выбранные с лимитом limit + 1.
+        limit: Запрошенный размер страницы.
+        key: Ключ сортировки записи для курсора (по умолчанию created_at).
+
+    Returns:
+        Кортеж (записи страницы, курсор следующей страницы или None).
+    """
+    if len(items) <= limit:
+        return list(items), None
+    page = list(items[:limit])
+    last = page[-1]
+    sort_key = key(last) if key is not None else last.created_at
+    return page, encode_cursor(sort_key, last.id)
@@ -0,0 +1,440 @@
+"""
+Профилирование отдельных HTTP-запросов по требованию.
+
+Если PROFILING_ENABLED, ProfilingMiddleware выполняет под профилировщиком
+запросы с заголовком X-Profile: <PROFILING_TOKEN> и случайную долю
+PROFILING_SAMPLE_RATE остальных запросов. Ответ такого запроса получает
+заголовок X-Profile-Id, профиль доступен через
+GET /internal/profiles/{id} (последние PROFILING_KEEP профилей в памяти;
+с заголовком X-Profiling-Token: <PROFILING_TOKEN>)
+и, если задан PROFILING_DIR, пишется туда файлом speedscope.
+
+Профилировщик — сэмплирующий, без внешних зависимостей: отдельный поток
+раз в PROFILING_INTERVAL_MS читает стек потока event loop
+(sys._current_frames()). Сэмпл относится к запросу, только если в этот
+момент выполняется задача запроса; иначе запрос ждёт (ввод-вывод, база,
+другие задачи) и сэмпл записывается как WAITING. Синхронный код
+SQLAlchemy выполняется в greenlet со своим стеком — он приклеивается к
+стеку корутины, которая его запустила (greenlet.settrace). Код в пуле
+потоков и в дочерних задачах (например, тело StreamingResponse)
+виден только как WAITING. Пока поток event loop занят, сэмплер ждёт
+GIL, поэтому сэмплов не больше, чем раз в sys.getswitchinterval()
+(5 мс по умолчанию); вес сэмпла — фактическое время с предыдущего.
+
+Вместе со стеками сохраняется хронология SQL-запросов (начало от
+начала запроса, длительность, текст) из app.db.queries.
+
+Профиль выводится в форматах:
+    - collapsed — "кадр;кадр;кадр вес" по строке на стек (flamegraph.pl,
+    speedscope, inferno), вес — микросекунды;
+    - speedscope — JSON для https://www.speedscope.app: сэмплы по времени
+    и SQL-запросы отдельным профилем.
+
+Одновременно профилируется не больше одного запроса; накладные расходы
+на остальные запросы — проверка настроек.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import hmac
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import greenlet
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import route_template
+from app.db.queries import track_queries
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+# Кадр сэмпла, когда задача запроса не выполнялась
+WAITING = ("(waiting)", "", 0)
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+# Глубже стек обрезается (рекурсия)
+_MAX_DEPTH = 256
+
+Frame = Tuple[str, str, int]
+
+
+@dataclass
+class RequestProfile:
+    """
+    Профиль одного HTTP-запроса.
+
+    Args:
+        id (str): Идентификатор (заголовок X-Profile-Id);
+        method (str): HTTP-метод;
+        path (str): Путь запроса;
+        route (str): Шаблон пути маршрута;
+        status (int): Код ответа;
+        started_at (datetime): Время начала (UTC);
+        duration (float): Длительность запроса, сек;
+        interval (float): Интервал сэмплирования, сек;
+        frames (List[Frame]): Кадры (функция, файл, строка начала);
+        samples (List[Tuple[Tuple[int, ...], float]]): Сэмплы по времени:
+            стек (индексы frames от корня) и вес — время с прошлого
+            сэмпла, сек;
+        sql (List[Tuple[float, float, str]]): SQL-запросы: начало от
+            начала запроса и длительность, сек, текст.
+    """
+
+    id: str
+    method: str
+    path: str
+    route: str
+    status: int
+    started_at: datetime
+    duration: float
+    interval: float
+    frames: List[Frame] = field(default_factory=list)
+    samples: List[Tuple[Tuple[int, ...], float]] = field(default_factory=list)
+    sql: List[Tuple[float, float, str]] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        """Краткое описание профиля (список GET /internal/profiles)."""
+        waiting = tuple(
+            index
+            for index, frame in enumerate(self.frames)
+            if frame == WAITING
+        )
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_ms": self.duration * 1000,
+            "samples": len(self.samples),
+            "cpu_ms": sum(
+                weight for stack, weight in self.samples if stack != waiting
+            )
+            * 1000,
+            "sql_statements": len(self.sql),
+            "sql_ms": sum(seconds for _, seconds, _ in self.sql) * 1000,
+        }
+
+    def _frame_name(self, index: int) -> str:
+        name, filename, line = self.frames[index]
+        if not filename:
+            return name
+        return f"{name} ({os.path.basename(filename)}:{line})"
+
+    def collapsed(self) -> str:
+        """Стеки в формате collapsed, вес — микросекунды."""
+        weights: Dict[Tuple[int, ...], float] = collections.defaultdict(float)
+        for stack, weight in self.samples:
+            weights[stack] += weight
+        lines = []
+        for stack, weight in weights.items():
+            names = ";".join(
+                self._frame_name(i).replace(";", ":") for i in stack
+            )
+            lines.append(f"{names} {round(weight * 1_000_000)}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self) -> Dict[str, Any]:
+        """Профиль в формате speedscope (сэмплы и SQL-запросы)."""
+        frames = [
+            (
+                {"name": name, "file": filename, "line": line}
+                if filename
+                else {"name": name}
+            )
+            for name, filename, line in self.frames
+        ]
+        end = self.duration * 1000
+        events = []
+        for offset, seconds, statement in self.sql:
+            frames.append({"name": f"SQL: {' '.join(statement.split())}"})
+            index = len(frames) - 1
+            events.append({"type": "O", "frame": index, "at": offset * 1000})
+            events.append(
+                {"type": "C", "frame": index, "at": (offset + seconds) * 1000}
+            )
+        title = f"{self.method} {self.path}"
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": f"{title} ({self.id})",
+            "exporter": "app.core.profiling",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": title,
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": end,
+                    "samples": [list(stack) for stack, _ in self.samples],
+                    "weights": [weight * 1000 for _, weight in self.samples],
+                },
+                {
+                    "type": "evented",
+                    "name": f"{title}: SQL",
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": end,
+                    "events": events,
+                },
+            ],
+        }
+
+
+class StackSampler:
+    """
+    Сэмплы стека задачи asyncio из отдельного потока.
+
+    Создаётся и запускается в потоке event loop изнутри задачи, которую
+    нужно профилировать.
+
+    Args:
+        interval (float): Интервал сэмплирования, сек;
+        root (Optional[Any]): Объект кода, выше которого стек обрезается
+            (кадры event loop и сервера не нужны), None — не обрезать.
+    """
+
+    def __init__(self, interval: float, root: Optional[Any] = None) -> None:
+        self.interval = interval
+        self.frames: List[Frame] = []
+        self.samples: List[Tuple[Tuple[int, ...], float]] = []
+        self._root = root
+        self._index: Dict[Frame, int] = {}
+        self._task = asyncio.current_task()
+        self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._greenlet: Optional[greenlet.greenlet] = None
+        self._previous_trace: Any = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="request-profiler", daemon=True
+        )
+
+    def start(self) -> None:
+        self._previous_trace = greenlet.settrace(self._trace_greenlets)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        greenlet.settrace(self._previous_trace)
+
+    def _trace_greenlets(self, event: str, args: Any) -> None:
+        # Запоминаем выполняемый greenlet: его родитель ждёт в
+        # greenlet_spawn() корутины, к стеку которой относится сэмпл
+        if event in ("switch", "throw"):
+            self._greenlet = args[1]
+        if self._previous_trace is not None:
+            self._previous_trace(event, args)
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            self._sample(now - last)
+            last = now
+
+    def _sample(self, weight: float) -> None:
+        if asyncio.current_task(self._loop) is not self._task:
+            stack: Tuple[int, ...] = (self._frame_index(WAITING),)
+        else:
+            frame = sys._current_frames().get(self._thread_id)
+            stack = self._stack(frame)
+        self.samples.append((stack, weight))
+
+    def _stack(self, frame: Any) -> Tuple[int, ...]:
+        frames = self._walk(frame)
+        if self._root_position(frames) is None:
+            # Стек greenlet: продолжаем стеком корутины-родителя
+            parent = getattr(self._greenlet, "parent", None)
+            frames = self._walk(getattr(parent, "gr_frame", None)) + frames
+        start = self._root_position(frames) or 0
+        return tuple(
+            self._frame_index(
+                (code.co_qualname, code.co_filename, code.co_firstlineno)
+            )
+            for code in frames[start:][:_MAX_DEPTH]
+        )
+
+    def _walk(self, frame: Any) -> List[Any]:
+        codes = []
+        while frame is not None:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        codes.reverse()
+        return codes
+
+    def _root_position(self, codes: List[Any]) -> Optional[int]:
+        if self._root is None:
+            return 0
+        for position, code in enumerate(codes):
+            if code is self._root:
+                return position
+        return None
+
+    def _frame_index(self, frame: Frame) -> int:
+        index = self._index.get(frame)
+        if index is None:
+            index = self._index[frame] = len(self.frames)
+            self.frames.append(frame)
+        return index
+
+
+class ProfileStore:
+    """
+    Последние профили в памяти и, если задан каталог, в файлах.
+
+    Args:
+        keep (int): Сколько профилей хранить в памяти.
+    """
+
+    def __init__(self, keep: int) -> None:
+        self._profiles: Deque[RequestProfile] = collections.deque(maxlen=keep)
+
+    def add(self, profile: RequestProfile) -> None:
+        self._profiles.append(profile)
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        for profile in self._profiles:
+            if profile.id == profile_id:
+                return profile
+        return None
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        """Описания профилей, новые первыми."""
+        return [profile.summary() for profile in reversed(self._profiles)]
+
+    def clear(self) -> None:
+        self._profiles.clear()
+
+
+profile_store = ProfileStore(settings.profiling_keep)
+
+
+def write_profile(directory: str, profile: RequestProfile) -> str:
+    """Записать профиль в каталог файлом speedscope; возвращает путь."""
+    os.makedirs(directory, exist_ok=True)
+    stamp = profile.started_at.strftime("%Y%m%dT%H%M%S")
+    path = os.path.join(directory, f"{stamp}-{profile.id}.speedscope.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile.speedscope(), f)
+    return path
+
+
+def _header(scope: Scope, name: bytes) -> Optional[bytes]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+
+class ProfilingMiddleware:
+    """ASGI middleware: профилирование запроса по заголовку или выборке."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._active = False
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if self._active:
+            return False
+        token = settings.profiling_token
+        requested = _header(scope, PROFILE_HEADER)
+        if token and requested is not None:
+            return hmac.compare_digest(requested, token.encode())
+        rate = settings.profiling_sample_rate
+        return rate > 0 and random.random() < rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] != "http"
+            or not settings.profiling_enabled
+            or not self._should_profile(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        self._active = True
+        try:
+            await self._profile(scope, receive, send)
+        finally:
+            self._active = False
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send):
+        profile_id = uuid.uuid4().hex
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (PROFILE_ID_HEADER, profile_id.encode()),
+                ]
+            await send(message)
+
+        sampler = StackSampler(
+            settings.profiling_interval_ms / 1000,
+            root=ProfilingMiddleware._profile.__code__,
+        )
+        started_at = datetime.now(timezone.utc)
+        with track_queries() as queries:
+            timeline = queries.timeline
+            queries.timeline = []
+            started = time.perf_counter()
+            sampler.start()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                # Профиль сохраняется и для запроса, упавшего с ошибкой
+                sampler.stop()
+                duration = time.perf_counter() - started
+                sql, queries.timeline = queries.timeline, timeline
+                await self._store(
+                    RequestProfile(
+                        id=profile_id,
+                        method=scope["method"],
+                        path=scope["path"],
+                        route=route_template(scope),
+                        status=status_code,
+                        started_at=started_at,
+                        duration=duration,
+                        interval=sampler.interval,
+                        frames=sampler.frames,
+                        samples=sampler.samples,
+                        sql=[
+                            (query_started - started, seconds, statement)
+                            for query_started, seconds, statement in sql
+                        ],
+                    )
+                )
+
+    async def _store(self, profile: RequestProfile) -> None:
+        profile_store.add(profile)
+        if not settings.profiling_dir:
+            return
+        try:
+            await asyncio.to_thread(
+                write_profile, settings.profiling_dir, profile
+            )
+        except OSError:
+            logger.warning("failed to write profile", exc_info=True)
@@ -0,0 +1,150 @@
+"""
+Бюджеты SQL-запросов маршрутов и обнаружение N+1.
+
+Маршрут объявляет бюджет декоратором (под декоратором маршрута):
+
+    @router.get("/{question_id}")
+    @query_budget(statements=3)
+    async def get_question(...): ...
+
+После каждого HTTP-запроса QueryBudgetMiddleware сверяет счётчики
+app.db.queries с бюджетом маршрута:
+    - statements — не больше стольких SQL-запросов за HTTP-запрос;
+    - repeats — не больше стольких выполнений одного текста SQL (N+1);
+    по умолчанию — QUERY_REPEATS_LIMIT для всех маршрутов, None —
+    без ограничения (например, для удаления пачками в цикле).
+
+Реакция на превышение — QUERY_BUDGET_MODE: warn — предупреждение в
+журнале (production), raise — исключение QueryBudgetExceeded из
+приложения (тесты: ASGI-транспорт httpx пробрасывает его в тест),
+off — не проверять.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, TypeVar
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.db.queries import QueryStats, shorten, track_queries
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable)
+
+# Значение по умолчанию для repeats: лимит из настроек
+_DEFAULT = object()
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    """
+    Бюджет SQL-запросов одного HTTP-запроса.
+
+    Args:
+        statements (Optional[int]): Максимум запросов (None — без лимита);
+        repeats (Optional[int]): Максимум выполнений одного текста SQL
+            (None — без лимита).
+    """
+
+    statements: Optional[int] = None
+    repeats: Optional[int] = None
+
+
+def query_budget(
+    *, statements: Optional[int] = None, repeats=_DEFAULT
+) -> Callable[[F], F]:
+    """
+    Объявить бюджет запросов маршрута (см. описание модуля).
+
+    Args:
+        statements: Максимум SQL-запросов за HTTP-запрос.
+        repeats: Максимум выполнений одного текста SQL; по умолчанию —
+            QUERY_REPEATS_LIMIT, None — без лимита.
+    """
+
+    def decorator(endpoint: F) -> F:
+        endpoint.query_budget = (  # type: ignore[attr-defined]
+            statements,
+            repeats,
+        )
+        return endpoint
+
+    return decorator
+
+
+@dataclass
+class QueryBudgetExceeded(Exception):
+    """
+    HTTP-запрос превысил бюджет SQL-запросов маршрута.
+
+    Args:
+        route (str): Маршрут (METHOD /path/template);
+        violations (List[str]): Описания нарушений.
+    """
+
+    route: str
+    violations: List[str] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        return f"{self.route}: " + "; ".join(self.violations)
+
+
+def route_budget(scope: Scope) -> QueryBudget:
+    """Бюджет маршрута, обработавшего запрос (или бюджет по умолчанию)."""
+    endpoint = getattr(scope.get("route"), "endpoint", None)
+    statements, repeats = getattr(endpoint, "query_budget", (None, _DEFAULT))
+    if repeats is _DEFAULT:
+        # Лимит читается при проверке: тесты могут менять настройки
+        repeats = settings.query_repeats_limit
+    return QueryBudget(statements=statements, repeats=repeats)
+
+
+def budget_violations(stats: QueryStats, budget: QueryBudget) -> List[str]:
+    """Описания нарушений бюджета (пустой список — бюджет соблюдён)."""
+    violations = []
+    if budget.statements is not None and stats.statements > budget.statements:
+        violations.append(
+            f"{stats.statements} SQL statements, budget {budget.statements}"
+        )
+    if budget.repeats is not None:
+        statement, count = stats.most_repeated()
+        if statement is not None and count > budget.repeats:
+            violations.append(
+                f"possible N+1: statement executed {count} times "
+                f"(limit {budget.repeats}): {shorten(statement)}"
+            )
+    return violations
+
+
+class QueryBudgetMiddleware:
+    """ASGI middleware: проверка бюджета запросов после HTTP-запроса."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        mode = settings.query_budget_mode
+        if scope["type"] != "http" or mode == "off":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        with track_queries() as stats:
+            await self.app(scope, receive, send)
+        violations = budget_violations(stats, route_budget(scope))
+        if not violations:
+            return
+        route = getattr(scope.get("route"), "path", scope["path"])
+        error = QueryBudgetExceeded(f"{scope['method']} {route}", violations)
+        if mode == "raise":
+            raise error
+        logger.warning(
+            "query budget exceeded in %.1f ms request: %s",
+            (time.perf_counter() - started) * 1000,
+            error,
+        )
@@ -0,0 +1,235 @@
+"""
+Прогрев процесса при старте (lifespan приложения, STARTUP_WARMUP).
+
+Первые запросы после запуска процесса платят за то, что делается
+лениво:
+    - установку соединений с PostgreSQL (TCP, аутентификация,
+    инициализация диалекта на первом соединении);
+    - компиляцию SQL горячих запросов (кэш компиляции движка SQLAlchemy
+    заполняется при первом выполнении запроса);
+    - подготовку запросов asyncpg (prepared statements кэшируются на
+    каждом соединении отдельно);
+    - первые вызовы валидаторов и сериализаторов Pydantic (единицы
+    микросекунд — прогреваются заодно).
+
+warm_up() заранее открывает соединения пула (STARTUP_WARM_CONNECTIONS,
+не больше размера пула: лишние пул закрыл бы при возврате) и на каждом
+выполняет горячие запросы app.crud с id, которых нет, в откатываемой
+транзакции. Запросы, которые вставили бы строки (создание вопроса,
+массовая загрузка), не выполняются; create_answer для отсутствующего
+вопроса ничего не вставляет. На репликах прогреваются только чтения.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections import namedtuple
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import partial
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.crud import answer as a_crud
+from app.crud import question as q_crud
+from app.schemas.answer import AnswerCreate
+from app.schemas.question import QuestionCreate, QuestionSort
+from app.schemas.rows import (
+    dump_answer_list,
+    dump_question_detail,
+    dump_question_list,
+)
+
+logger = logging.getLogger(__name__)
+
+# Id, которых нет в базе: запросы ничего не находят и не меняют
+_MISSING_ID = -1
+_MISSING_USER_ID = "00000000-0000-0000-0000-000000000000"
+_SAMPLE_TIME = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+_QuestionRow = namedtuple(
+    "_QuestionRow",
+    "id text created_at version answers_count last_answer_at",
+)
+_AnswerRow = namedtuple("_AnswerRow", "id user_id text created_at")
+
+
+@dataclass
+class WarmupReport:
+    """
+    Итог прогрева.
+
+    Args:
+        connections (int): Открыто соединений (по всем движкам);
+        statements (int): Выполнено горячих запросов;
+        seconds (float): Длительность прогрева, сек;
+        errors (List[str]): Ошибки (прогрев продолжается без движка,
+            на котором произошла ошибка).
+    """
+
+    connections: int = 0
+    statements: int = 0
+    seconds: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+
+async def run_hot_statements(db: AsyncSession, *, write: bool) -> int:
+    """
+    Выполнить горячие запросы app.crud с отсутствующими id.
+
+    Args:
+        db: Сессия (транзакцию откатывает вызывающий).
+        write: Выполнять и запросы записи (только primary).
+
+    Returns:
+        Число выполненных запросов.
+    """
+    calls = [
+        partial(q_crud.get_question_row, db, _MISSING_ID),
+        partial(q_crud.get_question_version, db, _MISSING_ID),
+        partial(q_crud.get_question, db, _MISSING_ID),
+        partial(a_crud.get_answer, db, _MISSING_ID),
+        partial(a_crud.list_answer_rows, db, question_id=_MISSING_ID),
+        partial(
+            a_crud.list_answer_rows,
+            db,
+            question_id=_MISSING_ID,
+            after=(_SAMPLE_TIME, _MISSING_ID),
+        ),
+        partial(a_crud.list_user_answer_rows, db, user_id=_MISSING_USER_ID),
+    ]
+    for sort in QuestionSort:
+        key = 0 if sort is QuestionSort.answers_count else _SAMPLE_TIME
+        calls.append(
+            partial(q_crud.list_question_rows, db, limit=1, sort=sort)
+        )
+        calls.append(
+            partial(
+                q_crud.list_question_rows,
+                db,
+                limit=1,
+                after=(key, _MISSING_ID),
+                sort=sort,
+            )
+        )
+    if write:
+        calls.extend(
+            [
+                partial(
+                    a_crud.create_answer,
+                    db,
+                    question_id=_MISSING_ID,
+                    user_id=_MISSING_USER_ID,
+                    text="",
+                ),
+                partial(a_crud.delete_answer_returning, db, _MISSING_ID),
+                partial(q_crud.delete_question, db, _MISSING_ID),
+            ]
+        )
+    # По одному: сессия не допускает параллельных запросов
+    for call in calls:
+        await call()
+    return len(calls)
+
+
+def warm_serializers() -> None:
+    """Вызвать валидаторы тел запросов и сериализаторы быстрых ответов."""
+    QuestionCreate.model_validate({"text": "warm-up"})
+    AnswerCreate.model_validate(
+        {"user_id": _MISSING_USER_ID, "text": "warm-up"}
+    )
+    question = _QuestionRow(
+        _MISSING_ID, "warm-up", _SAMPLE_TIME, 1, 1, _SAMPLE_TIME
+    )
+    answer = _AnswerRow(_MISSING_ID, _MISSING_USER_ID, "warm-up", _SAMPLE_TIME)
+    dump_question_list([question])
+    dump_question_detail(question, [answer], None)
+    dump_answer_list([answer])
+
+
+async def warm_engine(
+    engine: AsyncEngine, connections: int, *, write: bool
+) -> Tuple[int, int]:
+    """
+    Открыть соединения пула и выполнить на каждом горячие запросы.
+
+    Args:
+        engine: Движок.
+        connections: Сколько соединений открыть (не больше размера пула).
+        write: Выполнять и запросы записи.
+
+    Returns:
+        Число открытых соединений и выполненных запросов.
+    """
+    size = getattr(engine.pool, "size", None)
+    if size is not None:
+        connections = min(connections, size())
+    async with contextlib.AsyncExitStack() as stack:
+        # Все соединения удерживаются одновременно, иначе пул выдавал
+        # бы одно и то же
+        conns = await asyncio.gather(
+            *(
+                stack.enter_async_context(engine.connect())
+                for _ in range(connections)
+            )
+        )
+
+        async def run(conn) -> int:
+            async with AsyncSession(bind=conn) as db:
+                try:
+                    return await run_hot_statements(db, write=write)
+                finally:
+                    await db.rollback()
+
+        counts = await asyncio.gather(*(run(conn) for conn in conns))
+    return len(conns), sum(counts)
+
+
+async def warm_up(
+    primary: AsyncEngine,
+    replicas: Sequence[AsyncEngine] = (),
+    *,
+    connections: int,
+    timeout: Optional[float] = None,
+) -> WarmupReport:
+    """
+    Прогреть сериализаторы и движки (см. описание модуля).
+
+    Ошибки не пробрасываются: процесс без прогрева работает, только
+    первые запросы медленнее.
+
+    Args:
+        primary: Движок primary (чтения и записи).
+        replicas: Движки реплик (только чтения).
+        connections: Соединений на движок.
+        timeout: Ограничение на прогрев каждого движка, сек.
+    """
+    report = WarmupReport()
+    started = time.perf_counter()
+    warm_serializers()
+    for engine in (primary, *replicas):
+        try:
+            opened, statements = await asyncio.wait_for(
+                warm_engine(engine, connections, write=engine is primary),
+                timeout,
+            )
+        except Exception as exc:
+            report.errors.append(f"{engine.url.host}: {exc!r}")
+            logger.warning(
+                "warm-up of %s failed", engine.url.host, exc_info=True
+            )
+            continue
+        report.connections += opened
+        report.statements += statements
+    report.seconds = time.perf_counter() - started
+    logger.info(
+        "warm-up finished in %.0f ms: %d connections, %d statements",
+        report.seconds * 1000,
+        report.connections,
+        report.statements,
+    )
+    return report
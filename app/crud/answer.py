@@ -1,27 +1,101 @@
 """
 CRUD-операции для Answer.
 
-Содержит функции для создания, получения и удаления ответов.
-Проверка существования вопроса выполняется на уровне вызывающего слоя
-(роутера/сервиса),чтобы корректно вернуть 404 при попытке добавить
-ответ к несуществующему вопросу.
+Содержит функции для создания, получения и удаления ответов (в том числе
+всех ответов пользователя — пачками).
+Каждая запись ответа в той же транзакции обновляет вопрос:
+    - Question.version — на нём построены ETag'и деталки вопроса;
+    - Question.answers_count и Question.last_answer_at — денормализованные
+    счётчики для списка вопросов и сортировок по активности.
+create_answer и create_answers_bulk сами сообщают об отсутствии вопроса
+(возвращают None), чтобы вызывающий слой вернул 404 без отдельного
+SELECT: строка вопроса обновляется (и блокируется) до вставки ответов,
+поэтому конкурентное удаление вопроса не оставит ответов удалённому
+вопросу и не приведёт к нарушению внешнего ключа.
+
+Таблица answers секционирована (app.db.partitions). Ключ секционирования
+передаётся в запросы обычным сравнением с константой, чтобы планировщик
+отбрасывал лишние секции: question_id — в выборках ответов вопроса,
+явная граница created_at — рядом с keyset-условием по
+(created_at, id) (сравнение кортежей отсечению секций не помогает).
+Поиск ответа по одному id секцию не определяет и проверяет индекс
+первичного ключа каждой секции.
 """
 
 from __future__ import annotations
 
-from typing import Optional
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from sqlalchemy import delete, select
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    Row,
+    Select,
+    Update,
+    column,
+    delete,
+    func,
+    insert,
+    literal,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.answer import Answer
+from app.models.question import Question
+
+
+def _touch_question(question_id: int, *, added: int) -> Update:
+    """
+    UPDATE вопроса после добавления (added > 0) или удаления ответов.
+
+    Вставленные ответы получают created_at = CURRENT_TIMESTAMP, то есть
+    время начала транзакции, — его же пишем в last_answer_at. При удалении
+    last_answer_at пересчитывается по ix_answers_question_created
+    (question_id — константа, а не ссылка на questions.id, чтобы
+    подзапрос читал одну секцию).
+    Удалённые (deleted_at) вопросы не обновляются — для них UPDATE не
+    вернёт строк, как для несуществующих.
+    """
+    if added > 0:
+        last_answer_at = func.now()
+    else:
+        last_answer_at = (
+            select(func.max(Answer.created_at))
+            .where(Answer.question_id == question_id)
+            .scalar_subquery()
+        )
+    return (
+        update(Question)
+        .where(Question.id == question_id, Question.deleted_at.is_(None))
+        .values(
+            version=Question.version + 1,
+            answers_count=Question.answers_count + added,
+            last_answer_at=last_answer_at,
+        )
+    )
 
 
-def create_answer(
-    db: Session, *, question_id: int, user_id: str, text: str
-) -> Answer:
+async def create_answer(
+    db: AsyncSession, *, question_id: int, user_id: str, text: str
+) -> Optional[Row]:
     """
-    Создать новый ответ.
+    Создать новый ответ за один запрос к БД.
+
+    Обновление вопроса и вставка выполняются одним оператором:
+
+        WITH q AS (UPDATE questions SET version = version + 1, ...
+                   WHERE id = :question_id RETURNING id)
+        INSERT INTO answers (...) SELECT q.id, ... FROM q
+        RETURNING id, question_id, user_id, text, created_at
+
+    Если вопроса нет, UPDATE не вернёт строк и вставки не будет — отдельная
+    проверка существования не нужна. UPDATE блокирует строку вопроса до
+    конца транзакции, поэтому конкурентное удаление не приведёт к нарушению
+    внешнего ключа.
 
     Args:
         db: Сессия БД.
@@ -30,16 +104,170 @@ def create_answer(
         text: Текст ответа.
 
     Returns:
-        Созданный объект Answer.
+        Строка (id, question_id, user_id, text, created_at) или None, если
+        вопрос не найден.
+    """
+    question = (
+        _touch_question(question_id, added=1)
+        .returning(Question.id)
+        .cte("question")
+    )
+    stmt = (
+        insert(Answer)
+        .from_select(
+            ["question_id", "user_id", "text"],
+            select(
+                question.c.id,
+                literal(user_id, Answer.user_id.type),
+                literal(text, Answer.text.type),
+            ),
+        )
+        .returning(
+            Answer.id,
+            Answer.question_id,
+            Answer.user_id,
+            Answer.text,
+            Answer.created_at,
+        )
+    )
+    result = await db.execute(stmt)
+    return result.one_or_none()
+
+
+async def create_answers_bulk(
+    db: AsyncSession, *, question_id: int, items: Sequence[Dict[str, str]]
+) -> Optional[List[Row]]:
+    """
+    Создать пачку ответов на один вопрос.
+
+    Сначала обновляется вопрос (UPDATE ... RETURNING блокирует строку до
+    конца транзакции, как в create_answer); если вопроса нет или он
+    удалён, ответы не вставляются. Вставка идёт одним многострочным
+    INSERT ... RETURNING (режим insertmanyvalues SQLAlchemy), без
+    flush/refresh на каждую строку. Для пустой пачки вопрос только
+    блокируется (FOR KEY SHARE), не обновляясь.
+
+    Args:
+        db: Сессия БД.
+        question_id: Идентификатор вопроса.
+        items: Словари с ключами user_id и text.
+
+    Returns:
+        Строки (id, question_id, user_id, text, created_at) в порядке
+        items или None, если вопрос не найден.
+    """
+    if not items:
+        found = await db.scalar(
+            select(Question.id)
+            .where(Question.id == question_id, Question.deleted_at.is_(None))
+            .with_for_update(read=True, key_share=True)
+        )
+        return None if found is None else []
+    touched = await db.scalar(
+        _touch_question(question_id, added=len(items))
+        .returning(Question.id)
+        .execution_options(synchronize_session=False)
+    )
+    if touched is None:
+        return None
+    stmt = insert(Answer).returning(
+        Answer.id,
+        Answer.question_id,
+        Answer.user_id,
+        Answer.text,
+        Answer.created_at,
+        sort_by_parameter_order=True,
+    )
+    rows = [{"question_id": question_id, **item} for item in items]
+    result = await db.execute(stmt, rows)
+    return list(result.all())
+
+
+async def create_answers_grouped(
+    db: AsyncSession, *, items: Sequence[Dict[str, Any]]
+) -> List[Optional[Row]]:
+    """
+    Создать ответы на разные вопросы в одной транзакции (групповой
+    коммит очереди app.db.ingest) двумя операторами.
+
+    Сначала одним UPDATE обновляются все затронутые вопросы (как
+    в _touch_question):
+
+        WITH locked AS (SELECT id FROM questions WHERE id IN (...)
+                        ORDER BY id FOR NO KEY UPDATE)
+        UPDATE questions SET version = version + 1,
+            answers_count = answers_count + counts.n, last_answer_at = now()
+        FROM (VALUES ...) AS counts (question_id, n), locked
+        WHERE ... RETURNING questions.id
+
+    Строки блокируются по возрастанию id — одинаковый порядок у всех
+    писателей исключает взаимоблокировки; RETURNING заодно показывает,
+    какие вопросы существуют. Затем ответы на существующие вопросы
+    вставляются одним многострочным INSERT ... RETURNING.
+
+    Args:
+        db: Сессия БД.
+        items: Словари с ключами question_id, user_id и text.
+
+    Returns:
+        Строки (id, question_id, user_id, text, created_at) в порядке
+        items; None — для ответов на несуществующие вопросы.
     """
-    obj = Answer(question_id=question_id, user_id=user_id, text=text)
-    db.add(obj)
-    db.flush()
-    db.refresh(obj)
-    return obj
+    if not items:
+        return []
+    counts = Counter(item["question_id"] for item in items)
+    locked = (
+        select(Question.id)
+        .where(Question.id.in_(list(counts)), Question.deleted_at.is_(None))
+        .order_by(Question.id)
+        .with_for_update(key_share=True)
+        .cte("locked")
+    )
+    added = (
+        values(
+            column("question_id", Question.id.type),
+            column("n", Question.answers_count.type),
+            name="counts",
+        )
+        .data(list(counts.items()))
+        .alias("counts")
+    )
+    touch = (
+        update(Question)
+        .where(
+            Question.id == locked.c.id,
+            Question.id == added.c.question_id,
+        )
+        .values(
+            version=Question.version + 1,
+            answers_count=Question.answers_count + added.c.n,
+            last_answer_at=func.now(),
+        )
+        .returning(Question.id)
+        .execution_options(synchronize_session=False)
+    )
+    existing = set(await db.scalars(touch))
 
+    accepted = [item for item in items if item["question_id"] in existing]
+    rows: List[Row] = []
+    if accepted:
+        stmt = insert(Answer).returning(
+            Answer.id,
+            Answer.question_id,
+            Answer.user_id,
+            Answer.text,
+            Answer.created_at,
+            sort_by_parameter_order=True,
+        )
+        rows = list((await db.execute(stmt, accepted)).all())
+    created = iter(rows)
+    return [
+        next(created) if item["question_id"] in existing else None
+        for item in items
+    ]
 
-def get_answer(db: Session, answer_id: int) -> Optional[Answer]:
+
+async def get_answer(db: AsyncSession, answer_id: int) -> Optional[Answer]:
     """
     Получить ответ по id.
 
@@ -48,13 +276,245 @@ def get_answer(db: Session, answer_id: int) -> Optional[Answer]:
         answer_id: Идентификатор ответа.
 
     Returns:
-        Answer или None.
+        Answer или None (в том числе если вопрос удалён).
+    """
+    stmt = (
+        select(Answer)
+        .join(Question, Question.id == Answer.question_id)
+        .where(Answer.id == answer_id, Question.deleted_at.is_(None))
+    )
+    return await db.scalar(stmt)
+
+
+def _page_stmt(
+    stmt: Select,
+    *,
+    question_id: int,
+    limit: int,
+    after: Optional[Tuple[datetime, int]],
+) -> Select:
+    """Фильтр, порядок и границы страницы ответов на вопрос."""
+    stmt = (
+        stmt.where(Answer.question_id == question_id)
+        .order_by(Answer.created_at, Answer.id)
+        .limit(limit)
+    )
+    if after is not None:
+        stmt = stmt.where(
+            tuple_(Answer.created_at, Answer.id) > after,
+            Answer.created_at >= after[0],
+        )
+    return stmt
+
+
+async def list_answers(
+    db: AsyncSession,
+    *,
+    question_id: int,
+    limit: int = 100,
+    after: Optional[Tuple[datetime, int]] = None,
+) -> List[Answer]:
+    """
+    Получить страницу ответов на вопрос (старые первыми).
+
+    Выборка идёт по индексу ix_answers_question_created, поэтому
+    стоимость не зависит ни от общего числа ответов, ни от номера страницы.
+
+    Args:
+        db: Сессия БД.
+        question_id: Идентификатор вопроса.
+        limit: Максимум записей.
+        after: Позиция (created_at, id) последнего ответа предыдущей
+            страницы; если задана — выдаются ответы строго после неё.
+
+    Returns:
+        Список Answer.
+    """
+    stmt = _page_stmt(
+        select(Answer), question_id=question_id, limit=limit, after=after
+    )
+    return list(await db.scalars(stmt))
+
+
+async def list_answer_rows(
+    db: AsyncSession,
+    *,
+    question_id: int,
+    limit: int = 100,
+    after: Optional[Tuple[datetime, int]] = None,
+) -> List[Row]:
+    """
+    То же, что list_answers, но строками колонок
+    (id, user_id, text, created_at) без ORM-объектов — для быстрой
+    сериализации (app.schemas.rows).
+    """
+    stmt = _page_stmt(
+        select(Answer.id, Answer.user_id, Answer.text, Answer.created_at),
+        question_id=question_id,
+        limit=limit,
+        after=after,
+    )
+    return list((await db.execute(stmt)).all())
+
+
+async def list_user_answer_rows(
+    db: AsyncSession,
+    *,
+    user_id: str,
+    limit: int = 100,
+    after: Optional[Tuple[datetime, int]] = None,
+) -> List[Row]:
+    """
+    Получить страницу ответов пользователя (новые первыми).
+
+    Выборка идёт по индексу ix_answers_user_created (обратным сканом),
+    поэтому стоимость не зависит от числа ответов других пользователей.
+    Ответы удалённых вопросов не выдаются.
+
+    Args:
+        db: Сессия БД.
+        user_id: UUID пользователя (нормализованный, строкой).
+        limit: Максимум записей.
+        after: Позиция (created_at, id) последнего ответа предыдущей
+            страницы; если задана — выдаются ответы строго после неё.
+
+    Returns:
+        Строки (id, question_id, user_id, text, created_at).
+    """
+    stmt = (
+        select(
+            Answer.id,
+            Answer.question_id,
+            Answer.user_id,
+            Answer.text,
+            Answer.created_at,
+        )
+        .join(Question, Question.id == Answer.question_id)
+        .where(Answer.user_id == user_id, Question.deleted_at.is_(None))
+        .order_by(Answer.created_at.desc(), Answer.id.desc())
+        .limit(limit)
+    )
+    if after is not None:
+        stmt = stmt.where(
+            tuple_(Answer.created_at, Answer.id) < after,
+            Answer.created_at <= after[0],
+        )
+    return list((await db.execute(stmt)).all())
+
+
+async def delete_user_answers_batch(
+    db: AsyncSession, *, user_id: str, batch_size: int
+) -> Dict[int, int]:
+    """
+    Удалить одну пачку ответов пользователя и обновить их вопросы.
+
+    Сначала выбирается пачка id ответов и блокируются их вопросы по
+    возрастанию id (SELECT ... ORDER BY id FOR NO KEY UPDATE) — в том же
+    порядке, что у create_answers_grouped, иначе встречные писатели
+    могли бы заблокировать друг друга. Затем удаление и обновление
+    вопросов (как в _touch_question) выполняются одним оператором:
+
+        WITH deleted AS (DELETE FROM answers
+                         WHERE id IN (:ids) AND user_id = :user_id
+                         RETURNING id, question_id),
+             counts AS (SELECT question_id, count(*) AS n FROM deleted
+                        GROUP BY question_id)
+        UPDATE questions SET version = version + 1,
+            answers_count = answers_count - counts.n, last_answer_at = ...
+        FROM counts WHERE questions.id = counts.question_id
+
+    Подзапрос last_answer_at видит таблицу до удаления, поэтому
+    удаляемые ответы исключаются из него явно.
+
+    Вызывающий слой коммитит каждую пачку отдельно, чтобы блокировки
+    строк держались недолго.
+
+    Args:
+        db: Сессия БД.
+        user_id: UUID пользователя (нормализованный, строкой).
+        batch_size: Максимум удаляемых ответов.
+
+    Returns:
+        Словарь {question_id: число удалённых ответов}; пустой, если
+        ответов пользователя не осталось.
+    """
+    batch = (
+        await db.execute(
+            select(Answer.id, Answer.question_id)
+            .where(Answer.user_id == user_id)
+            .limit(batch_size)
+        )
+    ).all()
+    if not batch:
+        return {}
+    await db.execute(
+        select(Question.id)
+        .where(Question.id.in_({question_id for _, question_id in batch}))
+        .order_by(Question.id)
+        .with_for_update(key_share=True)
+    )
+    deleted = (
+        delete(Answer)
+        .where(
+            Answer.id.in_([answer_id for answer_id, _ in batch]),
+            Answer.user_id == user_id,
+        )
+        .returning(Answer.id, Answer.question_id)
+        .cte("deleted")
+    )
+    counts = (
+        select(deleted.c.question_id, func.count().label("n"))
+        .group_by(deleted.c.question_id)
+        .cte("counts")
+    )
+    last_answer_at = (
+        select(func.max(Answer.created_at))
+        .where(
+            Answer.question_id == Question.id,
+            Answer.id.not_in(select(deleted.c.id)),
+        )
+        .scalar_subquery()
+    )
+    stmt = (
+        update(Question)
+        .where(Question.id == counts.c.question_id)
+        .values(
+            version=Question.version + 1,
+            answers_count=Question.answers_count - counts.c.n,
+            last_answer_at=last_answer_at,
+        )
+        .returning(Question.id, counts.c.n)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    return {question_id: n for question_id, n in result.all()}
+
+
+async def delete_answer_returning(
+    db: AsyncSession, answer_id: int
+) -> Optional[int]:
+    """
+    Удалить ответ по id и вернуть id его вопроса (DELETE ... RETURNING).
+
+    Args:
+        db: Сессия БД.
+        answer_id: Идентификатор ответа.
+
+    Returns:
+        question_id удалённого ответа или None, если запись не найдена.
     """
-    stmt = select(Answer).where(Answer.id == answer_id)
-    return db.scalar(stmt)
+    stmt = (
+        delete(Answer)
+        .where(Answer.id == answer_id)
+        .returning(Answer.question_id)
+    )
+    question_id = await db.scalar(stmt)
+    if question_id is not None:
+        await db.execute(_touch_question(question_id, added=-1))
+    return question_id
 
 
-def delete_answer(db: Session, answer_id: int) -> bool:
+async def delete_answer(db: AsyncSession, answer_id: int) -> bool:
     """
     Удалить ответ по id.
 
@@ -65,5 +525,4 @@ def delete_answer(db: Session, answer_id: int) -> bool:
     Returns:
         True, если что-то удалено; False — если запись не найдена.
     """
-    result = db.execute(delete(Answer).where(Answer.id == answer_id))
-    return bool(getattr(result, "rowcount", 0))
+    return await delete_answer_returning(db, answer_id) is not None
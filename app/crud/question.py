@@ -2,39 +2,83 @@
 CRUD-операции для Question.
 
 Содержит функции для создания, получения, перечисления и удаления вопросов.
-Удаление вопросов приводит к каскадному удалению ответов на уровне БД.
+
+Удаление мягкое: delete_question только проставляет deleted_at, и вопрос
+сразу пропадает из всех выборок. Ответы удалённых вопросов и сами строки
+удаляются пачками фоновой очисткой (app.db.purge) функциями
+purge_answers_batch и purge_question.
 """
 
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from sqlalchemy import delete, select
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import (
+    ColumnElement,
+    Row,
+    Select,
+    delete,
+    func,
+    insert,
+    literal,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
+from app.core.pagination import SortKey
+from app.models.answer import Answer
 from app.models.question import Question
+from app.schemas.question import QuestionSort
 
 
-def create_question(db: Session, *, text: str) -> Question:
+async def create_question(db: AsyncSession, *, text: str) -> Row:
     """
-    Создать новый вопрос.
+    Создать новый вопрос одним INSERT ... RETURNING.
 
     Args:
         db: Сессия БД.
         text: Текст вопроса.
 
     Returns:
-        Созданный объект Question.
+        Строка (id, text, created_at) созданного вопроса.
+    """
+    stmt = insert(Question).returning(
+        Question.id, Question.text, Question.created_at
+    )
+    result = await db.execute(stmt, {"text": text})
+    return result.one()
+
+
+async def create_questions_bulk(
+    db: AsyncSession, *, texts: Sequence[str]
+) -> List[Row]:
+    """
+    Создать пачку вопросов одним многострочным INSERT ... RETURNING.
+
+    Args:
+        db: Сессия БД.
+        texts: Тексты вопросов.
+
+    Returns:
+        Строки (id, text, created_at) в порядке texts.
     """
-    obj = Question(text=text)
-    db.add(obj)
-    db.flush()
-    db.refresh(obj)
-    return obj
+    if not texts:
+        return []
+    stmt = insert(Question).returning(
+        Question.id,
+        Question.text,
+        Question.created_at,
+        sort_by_parameter_order=True,
+    )
+    result = await db.execute(stmt, [{"text": t} for t in texts])
+    return list(result.all())
 
 
-def get_question(
-    db: Session, question_id: int, *, with_answers: bool = False
+async def get_question(
+    db: AsyncSession, question_id: int, *, with_answers: bool = False
 ) -> Optional[Question]:
     """
     Получить вопрос по id.
@@ -42,50 +86,338 @@ def get_question(
     Args:
         db: Сессия БД.
         question_id: Идентификатор вопроса.
-        with_answers: Если True — подгружает ответы (joinedload).
+        with_answers: Если True — подгружает все ответы (selectinload).
 
     Returns:
         Question или None.
     """
-    stmt = select(Question).where(Question.id == question_id)
+    stmt = select(Question).where(
+        Question.id == question_id, Question.deleted_at.is_(None)
+    )
     if with_answers:
-        stmt = stmt.options(joinedload(Question.answers))
-    return db.scalar(stmt)
+        stmt = stmt.options(selectinload(Question.answers))
+    return await db.scalar(stmt)
+
+
+async def get_question_row(
+    db: AsyncSession, question_id: int
+) -> Optional[Row]:
+    """
+    Получить вопрос строкой колонок, без ORM-объекта (быстрый путь чтения).
+
+    Args:
+        db: Сессия БД.
+        question_id: Идентификатор вопроса.
+
+    Returns:
+        Строка (id, text, created_at, version, answers_count,
+        last_answer_at) или None.
+    """
+    stmt = select(
+        Question.id,
+        Question.text,
+        Question.created_at,
+        Question.version,
+        Question.answers_count,
+        Question.last_answer_at,
+    ).where(Question.id == question_id, Question.deleted_at.is_(None))
+    return (await db.execute(stmt)).one_or_none()
+
+
+async def get_question_version(
+    db: AsyncSession, question_id: int
+) -> Optional[int]:
+    """
+    Получить версию вопроса (поиск по первичному ключу, без ответов).
+
+    Args:
+        db: Сессия БД.
+        question_id: Идентификатор вопроса.
+
+    Returns:
+        Question.version или None, если вопрос не найден.
+    """
+    stmt = select(Question.version).where(
+        Question.id == question_id, Question.deleted_at.is_(None)
+    )
+    return await db.scalar(stmt)
 
 
-def list_questions(
-    db: Session, *, limit: int = 100, offset: int = 0
+# Первая колонка порядка для каждой сортировки; выражения совпадают
+# с индексами ix_questions_*_id (см. app.models.question).
+_SORT_KEYS: Dict[QuestionSort, ColumnElement] = {
+    QuestionSort.created_at: Question.created_at,
+    QuestionSort.answers_count: Question.answers_count,
+    QuestionSort.last_activity: func.coalesce(
+        Question.last_answer_at, Question.created_at
+    ),
+}
+
+
+def _page_stmt(
+    stmt: Select,
+    *,
+    limit: int,
+    offset: int,
+    after: Optional[Tuple[SortKey, int]],
+    sort: QuestionSort,
+) -> Select:
+    """Порядок и границы страницы списка вопросов."""
+    sort_key = _SORT_KEYS[sort]
+    stmt = stmt.where(Question.deleted_at.is_(None)).order_by(
+        sort_key.desc(), Question.id.desc()
+    )
+    if after is not None:
+        stmt = stmt.where(tuple_(sort_key, Question.id) < after)
+    else:
+        stmt = stmt.offset(offset)
+    return stmt.limit(limit)
+
+
+async def list_questions(
+    db: AsyncSession,
+    *,
+    limit: int = 100,
+    offset: int = 0,
+    after: Optional[Tuple[SortKey, int]] = None,
+    sort: QuestionSort = QuestionSort.created_at,
 ) -> List[Question]:
     """
-    Получить список вопросов.
+    Получить список вопросов (по убыванию ключа сортировки).
+
+    Порядок (ключ DESC, id DESC) совпадает с индексом сортировки
+    (ix_questions_created_at_id и др.), поэтому страница читается
+    index scan'ом.
 
     Args:
         db: Сессия БД.
         limit: Максимум записей.
-        offset: Смещение.
+        offset: Смещение (игнорируется при keyset-пагинации).
+        after: Позиция (ключ сортировки, id) последней записи предыдущей
+            страницы; если задана — выдаются записи строго после неё.
+        sort: Порядок: created_at, answers_count или last_activity
+            (время последнего ответа, для вопросов без ответов —
+            время создания).
 
     Returns:
         Список Question.
     """
+    stmt = _page_stmt(
+        select(Question), limit=limit, offset=offset, after=after, sort=sort
+    )
+    return list(await db.scalars(stmt))
+
+
+async def list_question_rows(
+    db: AsyncSession,
+    *,
+    limit: int = 100,
+    offset: int = 0,
+    after: Optional[Tuple[SortKey, int]] = None,
+    sort: QuestionSort = QuestionSort.created_at,
+) -> List[Row]:
+    """
+    То же, что list_questions, но строками колонок (id, text, created_at,
+    answers_count, last_answer_at) без ORM-объектов — для быстрой
+    сериализации (app.schemas.rows).
+    """
+    stmt = _page_stmt(
+        select(
+            Question.id,
+            Question.text,
+            Question.created_at,
+            Question.answers_count,
+            Question.last_answer_at,
+        ),
+        limit=limit,
+        offset=offset,
+        after=after,
+        sort=sort,
+    )
+    return list((await db.execute(stmt)).all())
+
+
+async def find_similar_questions(
+    db: AsyncSession, *, query: str, limit: int, threshold: float
+) -> List[Row]:
+    """
+    Найти вопросы с текстом, похожим на query (триграммы pg_trgm).
+
+    Фильтр text % query читается по GIN-индексу ix_questions_text_trgm,
+    поэтому similarity() считается только для кандидатов из индекса.
+    Порог оператора % задаётся параметром pg_trgm.similarity_threshold
+    на время текущей транзакции.
+
+    Args:
+        db: Сессия БД.
+        query: Текст, для которого ищутся похожие вопросы.
+        limit: Максимум записей.
+        threshold: Минимальная similarity() от 0 до 1.
+
+    Returns:
+        Строки (id, text, created_at, similarity), самые похожие первыми.
+    """
+    await db.execute(
+        select(
+            func.set_config(
+                "pg_trgm.similarity_threshold", str(threshold), True
+            )
+        )
+    )
+    query_text = literal(query, Question.text.type)
+    similarity = func.similarity(Question.text, query_text)
     stmt = (
-        select(Question)
-        .order_by(Question.created_at.desc())
+        select(
+            Question.id,
+            Question.text,
+            Question.created_at,
+            similarity.label("similarity"),
+        )
+        .where(
+            Question.text.bool_op("%")(query_text),
+            Question.deleted_at.is_(None),
+        )
+        .order_by(similarity.desc(), Question.id.desc())
         .limit(limit)
-        .offset(offset)
     )
-    return list(db.scalars(stmt))
+    return list((await db.execute(stmt)).all())
+
+
+def sort_key(item: Any, sort: QuestionSort) -> SortKey:
+    """
+    Значение ключа сортировки записи (для курсора следующей страницы).
 
+    Args:
+        item: Question или строка списка вопросов.
+        sort: Порядок списка.
 
-def delete_question(db: Session, question_id: int) -> bool:
+    Returns:
+        created_at, answers_count или время последней активности.
     """
-    Удалить вопрос по id (каскадно удалит ответы на уровне БД).
+    if sort is QuestionSort.answers_count:
+        return item.answers_count
+    if sort is QuestionSort.last_activity:
+        return item.last_answer_at or item.created_at
+    return item.created_at
+
+
+async def delete_question(db: AsyncSession, question_id: int) -> bool:
+    """
+    Мягко удалить вопрос: проставить deleted_at (один UPDATE по
+    первичному ключу, время не зависит от числа ответов).
 
     Args:
         db: Сессия БД.
         question_id: Идентификатор вопроса.
 
     Returns:
-        True, если что-то удалено; False — если запись не найдена.
+        True, если вопрос удалён; False — если не найден или уже удалён.
     """
-    result = db.execute(delete(Question).where(Question.id == question_id))
+    stmt = (
+        update(Question)
+        .where(Question.id == question_id, Question.deleted_at.is_(None))
+        .values(deleted_at=func.now())
+        .returning(Question.id)
+    )
+    return await db.scalar(stmt) is not None
+
+
+async def list_deleted_question_ids(
+    db: AsyncSession, *, limit: int = 100
+) -> List[int]:
+    """
+    Вопросы, ожидающие очистки (удалённые раньше — первыми).
+
+    Args:
+        db: Сессия БД.
+        limit: Максимум записей.
+
+    Returns:
+        Список id (по частичному индексу ix_questions_deleted_at).
+    """
+    stmt = (
+        select(Question.id)
+        .where(Question.deleted_at.is_not(None))
+        .order_by(Question.deleted_at, Question.id)
+        .limit(limit)
+    )
+    return list(await db.scalars(stmt))
+
+
+async def count_deleted_questions(db: AsyncSession) -> int:
+    """Число вопросов, ожидающих очистки."""
+    stmt = select(func.count()).where(Question.deleted_at.is_not(None))
+    return await db.scalar(stmt)
+
+
+async def purge_answers_batch(
+    db: AsyncSession, question_id: int, *, batch_size: int
+) -> int:
+    """
+    Удалить пачку ответов удалённого вопроса.
+
+    Пачка выбирается с FOR UPDATE SKIP LOCKED: параллельная очистка того
+    же вопроса (проход по интервалу и wake(), очистки разных воркеров)
+    берёт следующие строки, а не ждёт чужую пачку, чтобы потом не
+    найти её. 0 значит, что свободных ответов не осталось — остальные
+    могут быть ещё в чужой незакоммиченной пачке.
+
+    Args:
+        db: Сессия БД.
+        question_id: Идентификатор удалённого вопроса.
+        batch_size: Максимум удаляемых ответов.
+
+    Returns:
+        Число удалённых ответов (0 — ответов не осталось).
+    """
+    # MATERIALIZED: подзапрос с LIMIT и блокировкой выполняется один раз
+    # (иначе планировщик может перевыполнять его для каждой строки
+    # полусоединения, и SKIP LOCKED пропустит уже удалённые строки)
+    batch = (
+        select(Answer.id)
+        .where(Answer.question_id == question_id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .cte("batch")
+        .prefix_with("MATERIALIZED")
+    )
+    result = await db.execute(
+        delete(Answer)
+        .where(
+            Answer.question_id == question_id,
+            Answer.id.in_(select(batch.c.id)),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+async def purge_question(db: AsyncSession, question_id: int) -> bool:
+    """
+    Окончательно удалить строку мягко удалённого вопроса.
+
+    Строка удаляется, только если у вопроса не осталось ответов: иначе
+    каскад внешнего ключа удалил бы их одной большой транзакцией, ради
+    избежания которой очистка и идёт пачками. Ответы, которые видны, но
+    удаляются чужой незакоммиченной пачкой, тоже считаются оставшимися —
+    вопрос удалит та очистка, что закончит последней. Новых ответов у
+    удалённого вопроса не появляется: все записи ответов сначала
+    обновляют строку вопроса с условием deleted_at IS NULL.
+
+    Args:
+        db: Сессия БД.
+        question_id: Идентификатор вопроса.
+
+    Returns:
+        True, если строка удалена.
+    """
+    result = await db.execute(
+        delete(Question).where(
+            Question.id == question_id,
+            Question.deleted_at.is_not(None),
+            ~select(Answer.id)
+            .where(Answer.question_id == question_id)
+            .exists(),
+        )
+    )
     return bool(getattr(result, "rowcount", 0))
@@ -0,0 +1,162 @@
+"""
+Полнотекстовый поиск вопросов (PostgreSQL FTS).
+
+Вопрос находится, если запрос совпал с его текстом или с текстом любого
+его ответа. Совпадения ищутся по GIN-индексам ix_questions_search_vector
+и ix_answers_search_vector; релевантность вопроса — максимальный ts_rank
+среди его совпадений. Выдача упорядочена по (rank DESC, id DESC) и
+листается keyset-пагинацией по этой паре.
+
+Ранжируются не более settings.search_max_candidates самых новых
+совпадений в каждой таблице: для редких слов это все совпадения, а для
+частых время запроса не растёт с размером таблицы (планировщик читает
+первичный ключ с конца и останавливается после max_candidates строк).
+
+ts_headline дорог (перечитывает и разбирает текст), поэтому фрагменты
+строятся только для строк страницы: по тексту лучшего совпадения —
+самого вопроса или ответа.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+from sqlalchemy import (
+    Float,
+    Row,
+    cast,
+    func,
+    literal,
+    literal_column,
+    null,
+    select,
+    tuple_,
+    union_all,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.answer import Answer
+from app.models.question import SEARCH_CONFIG, Question
+
+# Маркеры подсветки в ts_headline. Управляющие символы не встречаются
+# в тексте, поэтому после HTML-экранирования их можно безопасно заменить
+# на теги (см. app.routers.questions).
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_STOP = "\x03"
+
+# Константа модуля, не пользовательский ввод: безопасно встраивается в SQL
+_CONFIG = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+
+_HEADLINE_OPTIONS = (
+    f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, "
+    "MaxWords=35, MinWords=15, MaxFragments=2"
+)
+
+
+async def search_questions(
+    db: AsyncSession,
+    *,
+    query: str,
+    limit: int = 20,
+    after: Optional[Tuple[float, int]] = None,
+) -> List[Row]:
+    """
+    Найти вопросы по тексту вопросов и ответов.
+
+    Args:
+        db: Сессия БД.
+        query: Поисковая строка в синтаксисе websearch_to_tsquery
+            (слова, "фразы", OR, -исключения).
+        limit: Максимум записей.
+        after: Позиция (rank, id) последней записи предыдущей страницы;
+            если задана — выдаются записи строго после неё.
+
+    Returns:
+        Строки (id, text, created_at, answers_count, last_answer_at, rank,
+        snippet), лучшие совпадения первыми.
+    """
+    tsquery = func.websearch_to_tsquery(_CONFIG, query)
+
+    max_candidates = settings.search_max_candidates
+    question_hits = (
+        select(Question.id, Question.search_vector)
+        .where(Question.search_vector.bool_op("@@")(tsquery))
+        .order_by(Question.id.desc())
+        .limit(max_candidates)
+        .subquery("question_hits")
+    )
+    answer_hits = (
+        select(Answer.id, Answer.question_id, Answer.search_vector)
+        .where(Answer.search_vector.bool_op("@@")(tsquery))
+        .order_by(Answer.id.desc())
+        .limit(max_candidates)
+        .subquery("answer_hits")
+    )
+    hits = union_all(
+        select(
+            question_hits.c.id.label("question_id"),
+            func.ts_rank(question_hits.c.search_vector, tsquery).label("rank"),
+            cast(null(), Answer.id.type).label("answer_id"),
+        ),
+        select(
+            answer_hits.c.question_id,
+            func.ts_rank(answer_hits.c.search_vector, tsquery),
+            answer_hits.c.id,
+        ),
+    ).subquery("hits")
+
+    # Лучшее совпадение на вопрос; при равенстве — сам вопрос
+    best = (
+        select(hits.c.question_id, hits.c.rank, hits.c.answer_id)
+        .distinct(hits.c.question_id)
+        .order_by(
+            hits.c.question_id,
+            hits.c.rank.desc(),
+            hits.c.answer_id.asc().nulls_first(),
+        )
+        .subquery("best")
+    )
+
+    # Удалённые вопросы отсеиваются до LIMIT, чтобы страницы были полными
+    page = (
+        select(best)
+        .join(Question, Question.id == best.c.question_id)
+        .where(Question.deleted_at.is_(None))
+        .order_by(best.c.rank.desc(), best.c.question_id.desc())
+    )
+    if after is not None:
+        rank, question_id = after
+        page = page.where(
+            tuple_(cast(best.c.rank, Float), best.c.question_id)
+            < tuple_(literal(rank, Float), literal(question_id))
+        )
+    page = page.limit(limit).subquery("page")
+
+    matched_text = func.coalesce(Answer.text, Question.text)
+    stmt = (
+        select(
+            Question.id,
+            Question.text,
+            Question.created_at,
+            Question.answers_count,
+            Question.last_answer_at,
+            cast(page.c.rank, Float).label("rank"),
+            func.ts_headline(
+                _CONFIG,
+                matched_text,
+                tsquery,
+                _HEADLINE_OPTIONS,
+            ).label("snippet"),
+        )
+        .select_from(page)
+        .join(Question, Question.id == page.c.question_id)
+        # question_id в условии позволяет читать одну секцию answers
+        .outerjoin(
+            Answer,
+            (Answer.id == page.c.answer_id)
+            & (Answer.question_id == page.c.question_id),
+        )
+        .order_by(page.c.rank.desc(), page.c.question_id.desc())
+    )
+    return list((await db.execute(stmt)).all())
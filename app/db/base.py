@@ -1,19 +1,178 @@
 """
 Модуль инициализации базы данных.
 
+Движки создаются при первом обращении (get_database()), а не при
+импорте модуля; прежние имена модуля (engine, async_engine,
+AsyncSessionLocal, replica_router, ...) — атрибуты get_database().
+
 Содержит:
-    - объект 'engine' для подключения к PostgreSQL;
-    - 'SessionLocal' для создания сессий работы с БД;
+    - объект 'engine' для синхронного подключения к PostgreSQL
+    (миграции Alembic и служебные утилиты);
+    - 'SessionLocal' для создания синхронных сессий;
+    - объект 'async_engine' (asyncpg) для обработчиков API;
+    - 'AsyncSessionLocal' для создания асинхронных сессий;
+    - 'pool_stats' — статистика пула 'async_engine';
+    - учёт SQL-запросов асинхронных движков и 'slow_query_log' —
+    журнал медленных запросов (app.db.queries);
+    - 'replica_router' — выбор движка (реплика/primary) для чтения;
     - базовый класс 'Base' для описания моделей.
+
+Параметры пула берутся из настроек (DB_POOL_*, DB_MAX_OVERFLOW) и
+урезаются до доли воркера в общем бюджете DB_MAX_CONNECTIONS;
+statement_timeout (DB_STATEMENT_TIMEOUT_MS) применяется только к
+соединениям 'async_engine'.
 """
 
+import functools
+from typing import Any, Dict
+
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import Settings, get_settings, to_async_url
+from app.db.pool import (
+    PoolStats,
+    instrument_engine,
+    instrumented_pool_class,
+    worker_pool_limits,
+)
+from app.db.queries import SlowQueryLog, instrument_queries
+from app.db.replicas import ReplicaRouter
+
+
+def _pool_options(settings: Settings) -> Dict[str, Any]:
+    """Общие параметры пула для синхронного и асинхронного движков."""
+    pool_size, max_overflow = worker_pool_limits(
+        settings.db_pool_size,
+        settings.db_max_overflow,
+        max_connections=settings.db_max_connections,
+        workers=settings.server_workers or 1,
+    )
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def _asyncpg_connect_args(settings: Settings) -> Dict[str, Any]:
+    """Параметры подключения asyncpg с statement_timeout из настроек."""
+    timeout = settings.db_statement_timeout_ms
+    if timeout is None:
+        return {}
+    return {"server_settings": {"statement_timeout": str(timeout)}}
+
+
+pool_stats = PoolStats()
+
+# Атрибуты Database, доступные как имена модуля
+_DATABASE_ATTRIBUTES = frozenset(
+    {
+        "engine",
+        "SessionLocal",
+        "async_engine",
+        "replica_engines",
+        "slow_query_log",
+        "replica_router",
+        "AsyncSessionLocal",
+    }
+)
+
+
+class Database:
+    """
+    Движки и фабрики сессий процесса.
+
+    Args:
+        settings (Settings): Настройки подключения и пула.
+
+    Attributes:
+        engine: Синхронный движок (миграции Alembic и утилиты);
+        SessionLocal: Фабрика синхронных сессий;
+        async_engine: Асинхронный движок primary (обработчики API);
+        replica_engines: Движки реплик (DATABASE_REPLICA_URLS);
+        slow_query_log: Журнал медленных запросов;
+        replica_router: Выбор движка (реплика/primary) для чтения;
+        AsyncSessionLocal: Фабрика асинхронных сессий primary.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        pool_options = _pool_options(settings)
+        # statement_timeout сюда намеренно не передаётся: через этот
+        # движок идут миграции и утилиты, которым можно работать дольше
+        # запросов API.
+        self.engine = create_engine(settings.database_url, **pool_options)
+        self.SessionLocal = sessionmaker(
+            autocommit=False, autoflush=False, bind=self.engine
+        )
+
+        connect_args = _asyncpg_connect_args(settings)
+        self.async_engine = create_async_engine(
+            settings.async_database_url,
+            poolclass=instrumented_pool_class(
+                AsyncAdaptedQueuePool, pool_stats
+            ),
+            connect_args=connect_args,
+            **pool_options,
+        )
+        instrument_engine(self.async_engine.sync_engine, pool_stats)
+
+        self.replica_engines = [
+            create_async_engine(
+                to_async_url(url), connect_args=connect_args, **pool_options
+            )
+            for url in settings.database_replica_urls
+        ]
+
+        self.slow_query_log = SlowQueryLog(
+            (
+                settings.slow_query_threshold_ms / 1000
+                if settings.slow_query_threshold_ms is not None
+                else None
+            ),
+            explain_sample_rate=settings.slow_query_explain_sample_rate,
+        )
+        # Число и время SQL-запросов на HTTP-запрос (метрики /metrics,
+        # бюджеты запросов маршрутов) и журнал медленных запросов
+        for engine in (self.async_engine, *self.replica_engines):
+            instrument_queries(engine.sync_engine, self.slow_query_log)
+
+        self.replica_router = ReplicaRouter(
+            self.async_engine,
+            self.replica_engines,
+            check_timeout=settings.replica_check_timeout,
+        )
+
+        # expire_on_commit=False: после коммита атрибуты ORM-объектов
+        # остаются доступны без повторного (неявного и запрещённого в
+        # async) SELECT.
+        self.AsyncSessionLocal = async_sessionmaker(
+            bind=self.async_engine, autoflush=False, expire_on_commit=False
+        )
+
+    async def dispose(self) -> None:
+        """Закрыть пулы асинхронных движков."""
+        for engine in (self.async_engine, *self.replica_engines):
+            await engine.dispose()
+
+
+@functools.lru_cache(maxsize=None)
+def get_database() -> Database:
+    """Движки процесса (создаются при первом обращении)."""
+    return Database(get_settings())
 
-from app.core.config import settings
 
-engine = create_engine(settings.database_url)
+def __getattr__(name: str) -> Any:
+    # engine, async_engine, AsyncSessionLocal и т. д. — атрибуты
+    # get_database(): движки создаются при первом обращении, а не при
+    # импорте модуля
+    if name in _DATABASE_ATTRIBUTES:
+        return getattr(get_database(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
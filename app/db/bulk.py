@@ -0,0 +1,104 @@
+"""
+Массовая загрузка через COPY FROM STDIN (драйвер psycopg2).
+
+Строки передаются в PostgreSQL потоком по мере генерации и не
+накапливаются в памяти Python. Используется загрузкой NDJSON
+(app.tools.import_ndjson) и генератором данных для нагрузочных тестов
+(benchmarks.load.dataset).
+"""
+
+from __future__ import annotations
+
+import io
+from typing import Iterable, Iterator, Optional, Sequence
+
+from sqlalchemy import Connection, text
+
+_SYNC_SEQUENCE = """
+SELECT setval(
+    pg_get_serial_sequence('{table}', 'id'),
+    GREATEST(
+        (SELECT COALESCE(max(id), 0) FROM {table}),
+        (SELECT last_value FROM {sequence})
+    )
+)
+"""
+
+
+def copy_escape(value: Optional[object]) -> str:
+    """Экранировать значение для текстового формата COPY."""
+    if value is None:
+        return r"\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_line(values: Iterable[Optional[object]]) -> str:
+    """Строка COPY (с переводом строки) из значений колонок."""
+    return "\t".join(copy_escape(value) for value in values) + "\n"
+
+
+class CopySource(io.RawIOBase):
+    """
+    Файлоподобный источник для cursor.copy_expert: отдаёт строки COPY
+    по мере чтения, не собирая их в памяти.
+    """
+
+    def __init__(self, lines: Iterator[str]) -> None:
+        self._lines = lines
+        self._buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buffer += line.encode()
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+def copy_from(
+    conn: Connection,
+    table: str,
+    columns: Sequence[str],
+    lines: Iterator[str],
+) -> None:
+    """
+    Загрузить строки в таблицу командой COPY в текущей транзакции conn.
+
+    Args:
+        conn: Соединение SQLAlchemy с драйвером psycopg2.
+        table: Таблица (в том числе секционированная или временная).
+        columns: Колонки в порядке значений строк.
+        lines: Строки текстового формата COPY (см. copy_line).
+    """
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN",
+            CopySource(lines),
+        )
+    finally:
+        cursor.close()
+
+
+def sync_id_sequence(conn: Connection, table: str) -> None:
+    """
+    Сдвинуть последовательность колонки id за максимальный id таблицы
+    (после вставки строк с явными id).
+    """
+    sequence = conn.execute(
+        text("SELECT pg_get_serial_sequence(:t, 'id')"), {"t": table}
+    ).scalar_one()
+    conn.execute(text(_SYNC_SEQUENCE.format(table=table, sequence=sequence)))
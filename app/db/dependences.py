@@ -1,48 +1,129 @@
 """
 Зависимости для доступа к базе данных.
 
-Содержит два провайдера сессий:
+Содержит два провайдера асинхронных сессий:
     - get_db()  — read-only: отдаёт сессию без автокоммита (для GET);
+    сессия привязывается к реплике, если они настроены;
     - get_uow() — unit of work: коммитит на успехе, делает rollback при
-    исключении (для POST/PUT/PATCH/DELETE).
+    исключении (для POST/PUT/PATCH/DELETE); всегда работает с primary.
+
+Read-your-writes: get_uow ставит клиенту cookie с временем записи, и
+пока не истекло окно settings.read_your_writes_window, get_db этого
+клиента читает с primary.
 """
 
 from __future__ import annotations
 
-from typing import Iterator
+import contextlib
+import time
+from typing import Any, AsyncContextManager, AsyncIterator, Callable, Dict
+
+from fastapi import Depends, Request, Response
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.base import AsyncSessionLocal, replica_router
+from app.db.ingest import AnswerIngestQueue, answer_ingest
+from app.db.replicas import LAST_WRITE_COOKIE, within_write_window
+
+# Транзакция read_session(snapshot=True): все запросы видят один снимок
+SNAPSHOT_OPTIONS: Dict[str, Any] = {
+    "isolation_level": "REPEATABLE READ",
+    "postgresql_readonly": True,
+}
+
+
+def in_write_window(request: Request) -> bool:
+    """
+    Находится ли клиент в окне read-your-writes (недавно что-то записал).
+
+    Такие запросы читают с primary и не используют кэш ответов.
+    """
+    return within_write_window(
+        request.cookies.get(LAST_WRITE_COOKIE),
+        settings.read_your_writes_window,
+    )
+
+
+@contextlib.asynccontextmanager
+async def read_session(
+    *, prefer_primary: bool = False, snapshot: bool = False
+) -> AsyncIterator[AsyncSession]:
+    """
+    Открыть read-only сессию на реплике (или на primary).
+
+    Ошибка соединения с репликой помечает её нездоровой до следующего
+    health-check. Используется get_db и фоновыми задачами чтения.
+
+    Args:
+        prefer_primary: Читать с primary.
+        snapshot: Выполнять запросы сессии в одной транзакции
+            REPEATABLE READ, READ ONLY — в одном снимке данных (чтение
+            связанных таблиц несколькими запросами, например выгрузка).
+    """
+    engine = replica_router.pick(prefer_primary=prefer_primary)
+    async with AsyncSessionLocal(bind=engine) as db:
+        try:
+            if snapshot:
+                await db.connection(execution_options=SNAPSHOT_OPTIONS)
+            yield db
+        except (sa_exc.OperationalError, sa_exc.InterfaceError, OSError):
+            replica_router.mark(engine, False)
+            raise
 
-from sqlalchemy.orm import Session
 
-from app.db.base import SessionLocal
+def get_read_session_factory() -> (
+    Callable[..., AsyncContextManager[AsyncSession]]
+):
+    """
+    Фабрика read-only сессий для обработчиков, которым сессия нужна
+    дольше самого обработчика (например, StreamingResponse: зависимости
+    с yield закрываются до отправки тела).
+    """
+    return read_session
 
 
-def get_db() -> Iterator[Session]:
+async def get_db(
+    prefer_primary: bool = Depends(in_write_window),
+) -> AsyncIterator[AsyncSession]:
     """
     Отдаёт сессию SQLAlchemy для операций чтения.
 
     Сессия не выполняет автоматический commit. Используется в обработчиках,
     где не предполагается изменение данных (GET).
     """
-    db = SessionLocal()
-    try:
+    async with read_session(prefer_primary=prefer_primary) as db:
         yield db
-    finally:
-        db.close()
 
 
-def get_uow() -> Iterator[Session]:
+async def get_uow(response: Response) -> AsyncIterator[AsyncSession]:
     """
     Unit of Work: сессия для операций записи.
 
     Коммитит при успешном завершении запроса; при исключении откатывает
     транзакцию. Используется в write-эндпоинтах (POST/PUT/PATCH/DELETE).
+    Если настроены реплики, ставит cookie read-your-writes.
     """
-    db = SessionLocal()
-    try:
-        yield db
-        db.commit()
-    except Exception:
-        db.rollback()
-        raise
-    finally:
-        db.close()
+    if replica_router.replicas:
+        response.set_cookie(
+            LAST_WRITE_COOKIE,
+            f"{time.time():.3f}",
+            max_age=max(int(settings.read_your_writes_window) + 1, 1),
+            httponly=True,
+            samesite="lax",
+        )
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+
+def get_answer_ingest() -> AnswerIngestQueue:
+    """
+    Очередь записи ответов с групповым коммитом (app.db.ingest).
+    """
+    return answer_ingest
@@ -0,0 +1,43 @@
+"""
+Хуки жизненного цикла транзакции.
+
+Позволяют отложить побочный эффект (например, инвалидацию кэша) до
+успешного коммита сессии: если выполнить его раньше, конкурентный
+читатель успеет закэшировать ещё не изменённые данные.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, List
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+_INFO_KEY = "after_commit_callbacks"
+
+
+def on_commit(db: AsyncSession, callback: Callable[[], None]) -> None:
+    """
+    Выполнить callback после успешного коммита сессии.
+
+    При откате callback отбрасывается.
+
+    Args:
+        db: Сессия БД.
+        callback: Функция без аргументов.
+    """
+    db.info.setdefault(_INFO_KEY, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session) -> None:
+    callbacks: List[Callable[[], None]] = session.info.pop(_INFO_KEY, [])
+    for callback in callbacks:
+        callback()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_after_rollback(session: Session, previous_transaction) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop(_INFO_KEY, None)
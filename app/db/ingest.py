@@ -0,0 +1,331 @@
+"""
+Очередь записи ответов с групповым коммитом (write-behind).
+
+В обычном режиме каждый POST ответа — отдельная транзакция, и под
+нагрузкой пропускную способность ограничивают fsync'и коммитов, а не
+CPU. В режиме очереди (settings.answer_ingest_mode) провалидированный
+ответ кладётся в ограниченную in-process очередь, а фоновый писатель
+собирает ответы в группы (до batch_size штук или max_delay секунд
+ожидания) и пишет группу одной транзакцией: один многострочный INSERT и
+один коммит на группу.
+
+Режимы подтверждения:
+    - async — клиент сразу получает 202 и tracking id, статус записи
+    доступен через status() (GET /answers/ingest/{tracking_id});
+    - sync — клиент ждёт коммита своей группы и получает созданный ответ.
+
+Backpressure: если очередь заполнена (или закрыта на остановке), submit
+бросает IngestUnavailable — API отвечает 503 с Retry-After.
+При остановке приложения stop() перестаёт принимать ответы и дожидается
+записи уже принятых (не дольше drain_timeout).
+
+Очередь и статусы живут в памяти процесса: при нескольких воркерах
+статус доступен только в том процессе, который принял ответ, а при
+аварийном завершении процесса непринятые в БД ответы теряются.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncContextManager,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+)
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import (
+    QUESTION_LIST_TAG,
+    invalidate_on_commit,
+    question_tag,
+)
+from app.core.config import settings
+from app.crud import answer as a_crud
+from app.db.base import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Статусы принятых ответов
+QUEUED = "queued"
+COMMITTED = "committed"
+QUESTION_NOT_FOUND = "question_not_found"
+FAILED = "failed"
+
+
+class IngestUnavailable(Exception):
+    """Очередь заполнена или закрыта: ответ не принят."""
+
+
+@dataclass
+class IngestStatus:
+    """
+    Статус ответа, принятого в очередь.
+
+    Args:
+        tracking_id (str): Идентификатор, выданный при приёме;
+        question_id (int): Идентификатор вопроса;
+        status (str): queued, committed, question_not_found или failed;
+        answer_id (Optional[int]): id созданного ответа (после коммита).
+    """
+
+    tracking_id: str
+    question_id: int
+    status: str = QUEUED
+    answer_id: Optional[int] = None
+
+
+@dataclass
+class IngestTicket:
+    """
+    Квитанция о приёме ответа в очередь.
+
+    Args:
+        status (IngestStatus): Статус записи (обновляется писателем);
+        item (Dict[str, Any]): Данные ответа;
+        done (asyncio.Future): Строка созданного ответа после коммита
+            группы (None — вопрос не найден) или исключение записи.
+    """
+
+    status: IngestStatus
+    item: Dict[str, Any]
+    done: "asyncio.Future[Optional[Row]]" = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+
+    async def wait(self) -> Optional[Row]:
+        """Дождаться коммита группы (режим sync)."""
+        return await self.done
+
+    def resolve(self, row: Optional[Row]) -> None:
+        if row is None:
+            self.status.status = QUESTION_NOT_FOUND
+        else:
+            self.status.status = COMMITTED
+            self.status.answer_id = row.id
+        # Клиент в режиме sync мог отключиться и отменить ожидание
+        if not self.done.done():
+            self.done.set_result(row)
+
+    def fail(self, exc: BaseException) -> None:
+        self.status.status = FAILED
+        if not self.done.done():
+            self.done.set_exception(exc)
+            # Исключение могут не забрать (режим async) — не логировать
+            # его повторно как «never retrieved»
+            self.done.exception()
+
+
+class AnswerIngestQueue:
+    """
+    Ограниченная очередь ответов с фоновым писателем.
+
+    Args:
+        session_factory: Фабрика сессий записи (primary);
+        max_size (int): Ёмкость очереди;
+        batch_size (int): Максимум ответов в одной транзакции;
+        max_delay (float): Сколько секунд писатель добирает группу после
+            первого ответа;
+        max_tracked (int): Сколько последних статусов хранить для
+            status().
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncContextManager[AsyncSession]],
+        *,
+        max_size: int = 10_000,
+        batch_size: int = 500,
+        max_delay: float = 0.01,
+        max_tracked: int = 100_000,
+    ) -> None:
+        self._session_factory = session_factory
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.max_tracked = max_tracked
+        self._queue: "asyncio.Queue[IngestTicket]" = asyncio.Queue(max_size)
+        self._statuses: "OrderedDict[str, IngestStatus]" = OrderedDict()
+        self._writer: Optional["asyncio.Task[None]"] = None
+        self._closed = True
+        self.accepted = 0
+        self.rejected = 0
+        self.committed = 0
+        self.failed = 0
+        self.groups = 0
+
+    @property
+    def running(self) -> bool:
+        """Принимает ли очередь ответы."""
+        return not self._closed
+
+    def start(self) -> None:
+        """Запустить фонового писателя (в работающем event loop)."""
+        if self._writer is None:
+            self._closed = False
+            self._writer = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float) -> None:
+        """
+        Остановить приём и дождаться записи уже принятых ответов.
+
+        Args:
+            timeout: Сколько секунд ждать; оставшиеся после этого ответы
+                помечаются failed.
+        """
+        self._closed = True
+        if self._writer is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "answer ingest: %d answers not written before shutdown",
+                self._queue.qsize(),
+            )
+        self._writer.cancel()
+        try:
+            await self._writer
+        except asyncio.CancelledError:
+            pass
+        self._writer = None
+        while not self._queue.empty():
+            ticket = self._queue.get_nowait()
+            ticket.fail(IngestUnavailable("shutdown"))
+            self.failed += 1
+
+    def submit(
+        self, *, question_id: int, user_id: str, text: str
+    ) -> IngestTicket:
+        """
+        Принять ответ в очередь.
+
+        Args:
+            question_id: Идентификатор вопроса.
+            user_id: UUID пользователя (нормализованный).
+            text: Текст ответа.
+
+        Returns:
+            Квитанция с tracking id и ожиданием коммита.
+
+        Raises:
+            IngestUnavailable: очередь заполнена или остановлена.
+        """
+        if self._closed:
+            self.rejected += 1
+            raise IngestUnavailable("answer ingest is not running")
+        status = IngestStatus(uuid.uuid4().hex, question_id)
+        ticket = IngestTicket(
+            status,
+            {"question_id": question_id, "user_id": user_id, "text": text},
+        )
+        try:
+            self._queue.put_nowait(ticket)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise IngestUnavailable("answer ingest queue is full") from None
+        self.accepted += 1
+        self._track(status)
+        return ticket
+
+    def status(self, tracking_id: str) -> Optional[IngestStatus]:
+        """Статус принятого ответа или None, если он неизвестен/вытеснен."""
+        return self._statuses.get(tracking_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Снимок состояния и накопительных счётчиков очереди."""
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize(),
+            "max_size": self.max_size,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "committed": self.committed,
+            "failed": self.failed,
+            "groups": self.groups,
+        }
+
+    def _track(self, status: IngestStatus) -> None:
+        self._statuses[status.tracking_id] = status
+        while len(self._statuses) > self.max_tracked:
+            self._statuses.popitem(last=False)
+
+    async def _next_group(self) -> List[IngestTicket]:
+        """Дождаться первого ответа и добрать группу."""
+        group = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_delay
+        while len(group) < self.batch_size:
+            if not self._queue.empty():
+                group.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                group.append(
+                    await asyncio.wait_for(self._queue.get(), timeout)
+                )
+            except asyncio.TimeoutError:
+                break
+        return group
+
+    async def _run(self) -> None:
+        while True:
+            group = await self._next_group()
+            try:
+                await self._write(group)
+            except asyncio.CancelledError:
+                # Остановка по таймауту посреди записи группы
+                for ticket in group:
+                    ticket.fail(IngestUnavailable("shutdown"))
+                self.failed += len(group)
+                raise
+            finally:
+                for _ in group:
+                    self._queue.task_done()
+
+    async def _write(self, group: List[IngestTicket]) -> None:
+        """Записать группу одной транзакцией и разбудить ожидающих."""
+        try:
+            async with self._session_factory() as db:
+                rows = await a_crud.create_answers_grouped(
+                    db, items=[ticket.item for ticket in group]
+                )
+                touched: Set[int] = {row.question_id for row in rows if row}
+                if touched:
+                    invalidate_on_commit(
+                        db,
+                        QUESTION_LIST_TAG,
+                        *(question_tag(q) for q in touched),
+                    )
+                await db.commit()
+        except Exception as exc:
+            # Группа пишется целиком или не пишется вовсе
+            logger.exception("answer ingest: group of %d failed", len(group))
+            for ticket in group:
+                ticket.fail(exc)
+            self.failed += len(group)
+            return
+        self.groups += 1
+        for ticket, row in zip(group, rows):
+            ticket.resolve(row)
+            if row is not None:
+                self.committed += 1
+
+
+answer_ingest = AnswerIngestQueue(
+    AsyncSessionLocal,
+    max_size=settings.answer_ingest_queue_size,
+    batch_size=settings.answer_ingest_batch_size,
+    max_delay=settings.answer_ingest_max_delay,
+)
@@ -0,0 +1,255 @@
+"""
+Секционирование таблицы answers.
+
+Схема выбирается настройкой ANSWERS_PARTITION_BY при миграции (или при
+create_all в тестах) и дальше меняется только пересозданием таблицы:
+    - hash — HASH (question_id) на ANSWERS_HASH_PARTITIONS секций. Все
+    выборки ответов вопроса (страницы, last_answer_at, очистка удалённых
+    вопросов) фильтруют по question_id и читают одну секцию; VACUUM и
+    индексы работают с секциями в N раз меньше всей таблицы;
+    - range — RANGE (created_at) по календарным месяцам (UTC) и секция
+    DEFAULT для строк вне созданных диапазонов. Секции создаются наперёд,
+    а старые месяцы отсоединяются целиком вместо DELETE
+    (app.tools.answer_partitions).
+
+Первичный ключ секционированной таблицы обязан содержать ключ
+секционирования, поэтому он составной: (id, question_id) или
+(id, created_at). id по-прежнему выдаётся одной последовательностью и
+уникален; ORM идентифицирует ответ только по id.
+
+Имена секций: answers_p00..answers_pNN (hash), answers_y2026m01 (range)
+и answers_default.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import date
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import Connection, text
+
+HASH = "hash"
+RANGE = "range"
+
+PARTITION_KEYS = {HASH: "question_id", RANGE: "created_at"}
+
+_MONTH_SUFFIX = re.compile(r"_y(\d{4})m(\d{2})$")
+
+
+def partition_key(scheme: str) -> str:
+    """Колонка-ключ секционирования для схемы hash/range."""
+    return PARTITION_KEYS[scheme]
+
+
+def partition_by(scheme: str) -> str:
+    """Выражение PARTITION BY для схемы hash/range."""
+    return f"{scheme.upper()} ({partition_key(scheme)})"
+
+
+def month_start(day: date) -> date:
+    """Первое число месяца."""
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    """Первое число месяца через months месяцев (months может быть < 0)."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def range_partition_name(table: str, month: date) -> str:
+    """Имя месячной секции: answers_y2026m01."""
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def parse_range_partition(table: str, name: str) -> Optional[date]:
+    """Месяц секции по её имени или None для чужих имён."""
+    match = _MONTH_SUFFIX.search(name)
+    if match is None or name[: match.start()] != table:
+        return None
+    return date(int(match[1]), int(match[2]), 1)
+
+
+def is_partition_name(table: str, name: str) -> bool:
+    """
+    Имя секции таблицы (в том числе отсоединённой) или индекса секции:
+    answers_p00, answers_y2026m01_pkey, answers_default_id_idx.
+    """
+    suffix = r"_(p\d+|y\d{4}m\d{2}|default)(_\w+)?"
+    return re.fullmatch(re.escape(table) + suffix, name) is not None
+
+
+def hash_partitions_ddl(table: str, modulus: int) -> List[str]:
+    """CREATE TABLE для всех hash-секций."""
+    return [
+        f"CREATE TABLE IF NOT EXISTS {table}_p{remainder:02d} "
+        f"PARTITION OF {table} "
+        f"FOR VALUES WITH (MODULUS {modulus}, REMAINDER {remainder})"
+        for remainder in range(modulus)
+    ]
+
+
+def range_partition_ddl(table: str, month: date) -> str:
+    """CREATE TABLE для месячной секции (границы — полночь UTC)."""
+    return (
+        f"CREATE TABLE IF NOT EXISTS {range_partition_name(table, month)} "
+        f"PARTITION OF {table} FOR VALUES "
+        f"FROM ('{month.isoformat()} 00:00:00+00') "
+        f"TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+    )
+
+
+def default_partition_ddl(table: str) -> str:
+    """CREATE TABLE для секции DEFAULT (range)."""
+    return (
+        f"CREATE TABLE IF NOT EXISTS {table}_default "
+        f"PARTITION OF {table} DEFAULT"
+    )
+
+
+def initial_partitions_ddl(
+    scheme: str,
+    *,
+    table: str,
+    hash_partitions: int,
+    first_month: date,
+    last_month: date,
+) -> List[str]:
+    """
+    DDL секций новой таблицы.
+
+    Args:
+        scheme: hash или range.
+        table: Имя секционированной таблицы.
+        hash_partitions: Число секций (hash).
+        first_month: Первый месяц (range) — месяц самой старой строки.
+        last_month: Последний создаваемый месяц (range).
+
+    Returns:
+        Список операторов CREATE TABLE ... PARTITION OF.
+    """
+    if scheme == HASH:
+        return hash_partitions_ddl(table, hash_partitions)
+    ddl = [default_partition_ddl(table)]
+    month = month_start(first_month)
+    while month <= last_month:
+        ddl.append(range_partition_ddl(table, month))
+        month = add_months(month, 1)
+    return ddl
+
+
+def partition_strategy(conn: Connection, table: str) -> Optional[str]:
+    """Схема секционирования таблицы в БД (hash/range) или None."""
+    strategy = conn.execute(
+        text(
+            "SELECT partstrat FROM pg_partitioned_table "
+            "WHERE partrelid = to_regclass(:table)"
+        ),
+        {"table": table},
+    ).scalar()
+    return {"h": HASH, "r": RANGE}.get(strategy)
+
+
+def range_partitions(conn: Connection, table: str) -> List[Tuple[date, str]]:
+    """Месячные секции таблицы (по возрастанию месяца)."""
+    names = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits AS i "
+            "JOIN pg_class AS c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table)"
+        ),
+        {"table": table},
+    ).scalars()
+    months = ((parse_range_partition(table, name), name) for name in names)
+    return sorted((month, name) for month, name in months if month)
+
+
+def create_future_partitions(
+    conn: Connection, *, table: str, today: date, ahead: int
+) -> List[str]:
+    """
+    Создать недостающие месячные секции с текущего месяца на ahead
+    месяцев вперёд.
+
+    Создание секции при наличии DEFAULT проверяет, что в DEFAULT нет
+    строк нового диапазона (сканирует её), поэтому секции создаются
+    заранее, пока DEFAULT пуста.
+
+    Returns:
+        Имена созданных секций.
+    """
+    existing = {month for month, _ in range_partitions(conn, table)}
+    created = []
+    first = month_start(today)
+    for offset in range(ahead + 1):
+        month = add_months(first, offset)
+        if month not in existing:
+            conn.execute(text(range_partition_ddl(table, month)))
+            created.append(range_partition_name(table, month))
+    return created
+
+
+# Ответы отсоединённой секции больше не видны — счётчики их вопросов
+# пересчитываются по оставшимся ответам
+_RECOUNT_DETACHED = """
+UPDATE questions AS q
+SET answers_count = q.answers_count - d.n,
+    version = q.version + 1,
+    last_answer_at = (
+        SELECT max(a.created_at) FROM {table} AS a
+        WHERE a.question_id = q.id
+    )
+FROM (
+    SELECT question_id, count(*) AS n FROM {partition} GROUP BY question_id
+) AS d
+WHERE q.id = d.question_id
+"""
+
+
+def detach_partition(
+    conn: Connection, *, table: str, partition: str, drop: bool
+) -> int:
+    """
+    Отсоединить секцию и пересчитать счётчики вопросов её ответов
+    (в транзакции вызывающего).
+
+    DETACH ... CONCURRENTLY недоступен при наличии секции DEFAULT,
+    поэтому DETACH берёт короткую эксклюзивную блокировку таблицы —
+    вызывающему стоит выставить lock_timeout.
+
+    Args:
+        conn: Соединение (внутри транзакции).
+        table: Секционированная таблица.
+        partition: Имя секции.
+        drop: Удалить секцию после отсоединения (иначе она остаётся
+            отдельной таблицей-архивом).
+
+    Returns:
+        Число вопросов, у которых пересчитаны счётчики.
+    """
+    conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition}"))
+    touched = conn.execute(
+        text(_RECOUNT_DETACHED.format(table=table, partition=partition))
+    ).rowcount
+    if drop:
+        conn.execute(text(f"DROP TABLE {partition}"))
+    return touched
+
+
+def expired_partitions(
+    partitions: Sequence[Tuple[date, str]], *, today: date, retain: int
+) -> List[str]:
+    """
+    Месячные секции старше retain полных месяцев до текущего.
+
+    Args:
+        partitions: Результат range_partitions.
+        today: Текущая дата (UTC).
+        retain: Сколько прошлых месяцев хранить.
+
+    Returns:
+        Имена секций для отсоединения (старые первыми).
+    """
+    oldest_kept = add_months(month_start(today), -retain)
+    return [name for month, name in partitions if month < oldest_kept]
@@ -0,0 +1,203 @@
+"""
+Инструментирование пула соединений SQLAlchemy.
+
+Содержит:
+    - PoolStats — накопительные счётчики работы пула (выдачи, возвраты,
+    новые соединения, инвалидации, таймауты, время ожидания соединения);
+    - instrumented_pool_class() — подкласс пула, замеряющий ожидание
+    соединения;
+    - instrument_engine() — подписка PoolStats на события пула движка;
+    - worker_pool_limits() — размер пула воркера при общем бюджете
+    соединений на все воркеры сервера.
+
+Снимок статистики отдаётся внутренним эндпоинтом GET /internal/pool и
+нужен для подбора pool_size/max_overflow на воркер по реальным данным.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple, Type
+
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+
+class PoolStats:
+    """
+    Потокобезопасные счётчики пула соединений.
+
+    Args:
+        checkouts (int): Сколько раз соединение выдано из пула;
+        checkins (int): Сколько раз соединение возвращено в пул;
+        connects (int): Сколько физических соединений открыто;
+        invalidations (int): Сколько соединений инвалидировано;
+        timeouts (int): Сколько раз истёк pool_timeout;
+        checked_out_max (int): Максимум одновременно выданных соединений;
+        wait_seconds_total (float): Суммарное время получения соединения;
+        wait_seconds_max (float): Максимальное время получения соединения.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.checked_out = 0
+        self.checked_out_max = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def on_checkout(self) -> None:
+        """Учесть выдачу соединения из пула."""
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.checked_out_max = max(self.checked_out_max, self.checked_out)
+
+    def on_checkin(self) -> None:
+        """Учесть возврат соединения в пул."""
+        with self._lock:
+            self.checkins += 1
+            self.checked_out = max(self.checked_out - 1, 0)
+
+    def on_connect(self) -> None:
+        """Учесть открытие физического соединения."""
+        with self._lock:
+            self.connects += 1
+
+    def on_invalidate(self) -> None:
+        """Учесть инвалидацию соединения."""
+        with self._lock:
+            self.invalidations += 1
+
+    def on_wait(self, seconds: float, *, timed_out: bool = False) -> None:
+        """Учесть время получения соединения (и таймаут, если был)."""
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self, pool: Pool) -> Dict[str, Any]:
+        """
+        Снимок счётчиков вместе с текущим состоянием пула.
+
+        Args:
+            pool: Пул движка (для мгновенных значений size/overflow).
+
+        Returns:
+            Словарь со статистикой.
+        """
+        with self._lock:
+            data: Dict[str, Any] = {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "checked_out_max": self.checked_out_max,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+        # QueuePool и его async-вариант; у NullPool/StaticPool этих
+        # методов нет.
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            method = getattr(pool, name, None)
+            data[name] = method() if callable(method) else None
+        data["pool_class"] = type(pool).__name__
+        return data
+
+
+def instrumented_pool_class(base: Type[Pool], stats: PoolStats) -> Type[Pool]:
+    """
+    Построить подкласс пула, который замеряет время получения соединения.
+
+    Событий «до выдачи» у пула нет, поэтому ожидание (включая
+    открытие overflow-соединения и pre-ping) измеряется вокруг
+    Pool.connect(). Класс создаётся на каждый stats, чтобы пул,
+    пересозданный через recreate(), писал в те же счётчики.
+
+    Args:
+        base: Базовый класс пула (QueuePool, AsyncAdaptedQueuePool, ...).
+        stats: Счётчики, в которые пишет пул.
+
+    Returns:
+        Класс пула для параметра poolclass движка.
+    """
+
+    class InstrumentedPool(base):  # type: ignore[valid-type, misc]
+        def connect(self) -> Any:
+            started = time.perf_counter()
+            try:
+                conn = super().connect()
+            except sa_exc.TimeoutError:
+                stats.on_wait(time.perf_counter() - started, timed_out=True)
+                raise
+            stats.on_wait(time.perf_counter() - started)
+            return conn
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    InstrumentedPool.__qualname__ = InstrumentedPool.__name__
+    return InstrumentedPool
+
+
+def instrument_engine(engine: Engine, stats: PoolStats) -> None:
+    """
+    Подписать счётчики на события пула движка.
+
+    Args:
+        engine: Синхронный движок (для AsyncEngine — его sync_engine).
+        stats: Счётчики пула.
+    """
+    event.listen(engine, "checkout", lambda *_: stats.on_checkout())
+    event.listen(engine, "checkin", lambda *_: stats.on_checkin())
+    event.listen(engine, "connect", lambda *_: stats.on_connect())
+    event.listen(engine, "invalidate", lambda *_: stats.on_invalidate())
+
+
+def worker_pool_limits(
+    pool_size: int,
+    max_overflow: int,
+    *,
+    max_connections: Optional[int],
+    workers: int,
+) -> Tuple[int, int]:
+    """
+    pool_size и max_overflow пула одного воркера.
+
+    У каждого процесса-воркера свой пул, поэтому без общего бюджета
+    база получает до workers * (pool_size + max_overflow) соединений.
+    С бюджетом на воркер приходится max_connections // workers
+    соединений: сначала урезается max_overflow, затем pool_size.
+
+    Args:
+        pool_size: Размер пула из настроек.
+        max_overflow: Сверх пула из настроек (-1 — без ограничения).
+        max_connections: Бюджет на все воркеры (None — без бюджета).
+        workers: Число воркеров.
+
+    Returns:
+        (pool_size, max_overflow) для движка воркера.
+
+    Raises:
+        ValueError: Бюджета не хватает на соединение для каждого воркера.
+    """
+    if max_connections is None:
+        return pool_size, max_overflow
+    per_worker = max_connections // workers
+    if per_worker < 1:
+        raise ValueError(
+            f"DB_MAX_CONNECTIONS={max_connections} is less than "
+            f"the number of workers ({workers})"
+        )
+    size = min(pool_size, per_worker)
+    overflow = per_worker - size
+    if max_overflow >= 0:
+        overflow = min(overflow, max_overflow)
+    return size, overflow
@@ -0,0 +1,174 @@
+"""
+Фоновая очистка мягко удалённых вопросов.
+
+DELETE /questions/{id} только проставляет deleted_at (app.crud.question):
+вопрос сразу скрыт, а запрос выполняется за постоянное время. Ответы
+удалённых вопросов удаляются здесь пачками по batch_size, каждая пачка —
+в своей короткой транзакции (без долгих блокировок и гигантской
+транзакции в WAL); между пачками можно делать паузу, чтобы не забивать
+диск и реплики. Когда ответов не осталось, удаляется строка вопроса.
+
+Прогресс (текущий вопрос, удалено ответов, вопросов в очереди) доступен
+через stats() — GET /internal/purge — и пишется в лог.
+
+Очистка идемпотентна: если процесс остановится посреди вопроса,
+следующий проход продолжит с оставшихся ответов. Параллельные очистки
+одного вопроса (проход по интервалу и wake()) берут разные пачки
+(app.crud.question.purge_answers_batch), строку вопроса удаляет та, что
+закончит последней.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, AsyncContextManager, Callable, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud import question as q_crud
+from app.db.base import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class QuestionPurger:
+    """
+    Очистка ответов и строк мягко удалённых вопросов.
+
+    Args:
+        session_factory: Фабрика сессий записи (primary);
+        batch_size (int): Ответов в одной транзакции;
+        batch_pause (float): Пауза между пачками, сек.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncContextManager[AsyncSession]],
+        *,
+        batch_size: int = 1000,
+        batch_pause: float = 0.0,
+    ) -> None:
+        self._session_factory = session_factory
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self._wakeup = asyncio.Event()
+        self.pending_questions = 0
+        self.current_question_id: Optional[int] = None
+        self.current_answers_purged = 0
+        self.questions_purged = 0
+        self.answers_purged = 0
+        self.batches = 0
+        self.errors = 0
+
+    def wake(self) -> None:
+        """Начать очередной проход, не дожидаясь интервала."""
+        self._wakeup.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Снимок прогресса и накопительных счётчиков."""
+        return {
+            "pending_questions": self.pending_questions,
+            "current_question_id": self.current_question_id,
+            "current_answers_purged": self.current_answers_purged,
+            "questions_purged": self.questions_purged,
+            "answers_purged": self.answers_purged,
+            "batches": self.batches,
+            "errors": self.errors,
+        }
+
+    async def purge_question(self, question_id: int) -> int:
+        """
+        Удалить ответы вопроса пачками, затем сам вопрос.
+
+        Args:
+            question_id: Идентификатор мягко удалённого вопроса.
+
+        Returns:
+            Число удалённых ответов.
+        """
+        self.current_question_id = question_id
+        self.current_answers_purged = 0
+        purged = False
+        while True:
+            async with self._session_factory() as db:
+                deleted = await q_crud.purge_answers_batch(
+                    db, question_id, batch_size=self.batch_size
+                )
+                if not deleted:
+                    purged = await q_crud.purge_question(db, question_id)
+                await db.commit()
+            if not deleted:
+                break
+            self.batches += 1
+            self.current_answers_purged += deleted
+            self.answers_purged += deleted
+            logger.debug(
+                "purge: question %d, %d answers deleted so far",
+                question_id,
+                self.current_answers_purged,
+            )
+            if self.batch_pause:
+                await asyncio.sleep(self.batch_pause)
+        if purged:
+            self.questions_purged += 1
+            logger.info(
+                "purge: question %d removed with %d answers",
+                question_id,
+                self.current_answers_purged,
+            )
+        else:
+            # Вопрос удалён раньше или его дочищает другая очистка
+            logger.info(
+                "purge: question %d, %d answers deleted, row left",
+                question_id,
+                self.current_answers_purged,
+            )
+        self.current_question_id = None
+        return self.current_answers_purged
+
+    async def purge_pending(self, *, limit: int = 100) -> int:
+        """
+        Очистить вопросы, ожидающие очистки (не больше limit за проход).
+
+        Returns:
+            Число обработанных вопросов.
+        """
+        async with self._session_factory() as db:
+            question_ids = await q_crud.list_deleted_question_ids(
+                db, limit=limit
+            )
+            self.pending_questions = await q_crud.count_deleted_questions(db)
+        for question_id in question_ids:
+            await self.purge_question(question_id)
+            self.pending_questions = max(self.pending_questions - 1, 0)
+        return len(question_ids)
+
+    async def run(self, interval: float) -> None:
+        """
+        Бесконечный цикл очистки (фоновая задача приложения).
+
+        Args:
+            interval: Пауза между проходами, сек. (wake() прерывает её).
+        """
+        while True:
+            self._wakeup.clear()
+            try:
+                while await self.purge_pending():
+                    pass
+            except Exception:
+                self.errors += 1
+                self.current_question_id = None
+                logger.exception("purge: pass failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+question_purger = QuestionPurger(
+    AsyncSessionLocal,
+    batch_size=settings.question_purge_batch,
+    batch_pause=settings.question_purge_batch_pause,
+)
@@ -0,0 +1,308 @@
+"""
+Учёт и инспекция SQL-запросов.
+
+Содержит:
+    - QueryStats — счётчики запросов (число, суммарное время и повторы
+    одинаковых запросов — признак N+1);
+    - track_queries() — собирать счётчики запросов текущего HTTP-запроса
+    (или любого другого участка кода) через contextvar;
+    - query_totals — счётчики всех запросов инструментированных движков,
+    включая фоновые задачи;
+    - SlowQueryLog — журнал медленных запросов с выборочным
+    EXPLAIN (ANALYZE, BUFFERS);
+    - instrument_queries() — подписка на события курсора движка.
+
+Время запроса — от before_cursor_execute до after_cursor_execute:
+выполнение на сервере и передача результата драйверу, без построения
+ORM-объектов и сериализации. Накладные расходы — два вызова
+perf_counter() и инкремент словаря на запрос.
+
+Одинаковыми считаются запросы с одним текстом SQL и любыми параметрами:
+цикл, выполняющий SELECT ... WHERE id = $1 на каждую строку, даёт один
+текст с большим числом повторов.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import logging
+import random
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Длина текста запроса в журнале
+_LOG_STATEMENT_CHARS = 1000
+
+
+@dataclass
+class QueryStats:
+    """
+    Счётчики SQL-запросов.
+
+    Args:
+        statements (int): Выполнено запросов (executemany — один);
+        seconds (float): Суммарное время запросов, сек;
+        repeats (Dict[str, int]): Число выполнений каждого текста SQL;
+        timeline (Optional[List[Tuple[float, float, str]]]): Если не
+            None — сюда пишутся (начало по perf_counter(), длительность,
+            текст SQL) каждого запроса (профилирование, app.core.profiling).
+    """
+
+    statements: int = 0
+    seconds: float = 0.0
+    repeats: Dict[str, int] = field(default_factory=dict)
+    timeline: Optional[List[Tuple[float, float, str]]] = None
+
+    def add(
+        self,
+        seconds: float,
+        statement: Optional[str] = None,
+        started: Optional[float] = None,
+    ) -> None:
+        self.statements += 1
+        self.seconds += seconds
+        if statement is not None:
+            self.repeats[statement] = self.repeats.get(statement, 0) + 1
+            if self.timeline is not None and started is not None:
+                self.timeline.append((started, seconds, statement))
+
+    def most_repeated(self) -> Tuple[Optional[str], int]:
+        """Самый частый текст SQL и число его выполнений."""
+        if not self.repeats:
+            return None, 0
+        statement = max(self.repeats, key=self.repeats.__getitem__)
+        return statement, self.repeats[statement]
+
+
+query_totals = QueryStats()
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar(
+    "query_stats", default=None
+)
+_in_explain: ContextVar[bool] = ContextVar("in_explain", default=False)
+
+
+@contextlib.contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Считать запросы, выполненные внутри блока.
+
+    Контекст наследуют задачи и потоки, запущенные из блока (например,
+    тело StreamingResponse), поэтому их запросы тоже учитываются.
+    Вложенный блок пополняет счётчики внешнего, так что несколько
+    middleware видят одни и те же счётчики запроса.
+
+    Yields:
+        QueryStats, который пополняется по мере выполнения запросов.
+    """
+    outer = _current.get()
+    if outer is not None:
+        yield outer
+        return
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Счётчики текущего блока track_queries() или None."""
+    return _current.get()
+
+
+def shorten(statement: str) -> str:
+    """Текст запроса для журнала: в одну строку и не длиннее лимита."""
+    text = " ".join(statement.split())
+    if len(text) > _LOG_STATEMENT_CHARS:
+        text = text[:_LOG_STATEMENT_CHARS] + "..."
+    return text
+
+
+class SlowQueryLog:
+    """
+    Журнал медленных запросов.
+
+    Запрос дольше порога пишется в журнал (WARNING). Для доли таких
+    запросов (explain_sample_rate) план снимается командой
+    EXPLAIN (ANALYZE, BUFFERS) в фоновой задаче на отдельном соединении
+    и в откатываемой транзакции: запрос пользователя не ждёт повторного
+    выполнения, а транзакция запроса не может оборваться из-за ошибки
+    EXPLAIN. Чтобы не нагружать базу, план снимается:
+        - только для SELECT без FOR UPDATE/SHARE (ANALYZE выполняет
+        запрос по-настоящему);
+        - только для асинхронных движков (нужен работающий event loop);
+        - не более чем для max_concurrent запросов одновременно и не
+        чаще раза в explain_cooldown секунд для одного текста SQL.
+
+    Args:
+        threshold (Optional[float]): Порог, сек. (None — выключено);
+        explain_sample_rate (float): Доля медленных запросов с планом;
+        explain_cooldown (float): Минимальный интервал между планами
+            одного текста SQL, сек;
+        max_concurrent (int): Одновременно снимаемых планов.
+    """
+
+    def __init__(
+        self,
+        threshold: Optional[float],
+        *,
+        explain_sample_rate: float = 0.0,
+        explain_cooldown: float = 60.0,
+        max_concurrent: int = 1,
+    ) -> None:
+        self.threshold = threshold
+        self.explain_sample_rate = explain_sample_rate
+        self.explain_cooldown = explain_cooldown
+        self.max_concurrent = max_concurrent
+        self.slow_queries = 0
+        self.explained = 0
+        # Ссылки на задачи, чтобы их не собрал сборщик мусора до конца
+        self.pending: Set[asyncio.Task] = set()
+        self._last_explained: Dict[str, float] = {}
+
+    def record(
+        self,
+        engine: Engine,
+        statement: str,
+        parameters: Any,
+        executemany: bool,
+        seconds: float,
+    ) -> None:
+        """Учесть выполненный запрос (вызывается из after_cursor_execute)."""
+        if self.threshold is None or seconds < self.threshold:
+            return
+        if _in_explain.get():
+            # Запросы, которыми журнал снимает план
+            return
+        self.slow_queries += 1
+        logger.warning(
+            "slow query %.1f ms: %s", seconds * 1000, shorten(statement)
+        )
+        if not executemany and self._should_explain(statement):
+            self._schedule_explain(engine, statement, parameters, seconds)
+
+    def _should_explain(self, statement: str) -> bool:
+        if random.random() >= self.explain_sample_rate:
+            return False
+        if len(self.pending) >= self.max_concurrent:
+            return False
+        head = statement.lstrip().upper()
+        if not head.startswith("SELECT") or " FOR " in head:
+            return False
+        last = self._last_explained.get(statement)
+        return last is None or (
+            time.monotonic() - last >= self.explain_cooldown
+        )
+
+    def _schedule_explain(
+        self, engine: Engine, statement: str, parameters: Any, seconds: float
+    ) -> None:
+        if not engine.dialect.is_async:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._last_explained[statement] = time.monotonic()
+        # Пустой контекст: запросы EXPLAIN не учитываются в счётчиках
+        # HTTP-запроса, который их породил
+        task = loop.create_task(
+            self._explain(AsyncEngine(engine), statement, parameters, seconds),
+            context=contextvars.Context(),
+        )
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+
+    async def _explain(
+        self,
+        engine: AsyncEngine,
+        statement: str,
+        parameters: Any,
+        seconds: float,
+    ) -> None:
+        _in_explain.set(True)
+        # Повторное выполнение ограничено втрое большим временем
+        timeout_ms = max(1000, int(seconds * 3000))
+        try:
+            async with engine.connect() as conn:
+                await conn.exec_driver_sql(
+                    f"SET LOCAL statement_timeout = {timeout_ms}"
+                )
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters
+                )
+                plan = "\n".join(row[0] for row in result)
+                await conn.rollback()
+        except Exception:
+            logger.warning(
+                "EXPLAIN of slow query failed: %s",
+                shorten(statement),
+                exc_info=True,
+            )
+            return
+        self.explained += 1
+        logger.warning(
+            "plan of slow query (%.1f ms): %s\n%s",
+            seconds * 1000,
+            shorten(statement),
+            plan,
+        )
+
+
+def instrument_queries(
+    engine: Engine, slow_log: Optional[SlowQueryLog] = None
+) -> None:
+    """
+    Учитывать запросы движка в query_totals и track_queries().
+
+    Args:
+        engine: Синхронный движок (для AsyncEngine — его sync_engine).
+        slow_log: Журнал медленных запросов (None — без журнала).
+    """
+
+    def before_cursor_execute(
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        if context is not None:
+            context._query_started = time.perf_counter()
+
+    def after_cursor_execute(
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        started = getattr(context, "_query_started", None)
+        if started is None:
+            return
+        seconds = time.perf_counter() - started
+        query_totals.add(seconds)
+        stats = _current.get()
+        if stats is not None:
+            stats.add(seconds, statement, started)
+        if slow_log is not None:
+            slow_log.record(
+                conn.engine, statement, parameters, executemany, seconds
+            )
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
@@ -0,0 +1,163 @@
+"""
+Маршрутизация read-only сессий на реплики.
+
+Содержит:
+    - ReplicaRouter — round-robin выбор здоровой реплики с откатом на
+    primary, если здоровых реплик нет;
+    - health-check реплик (SELECT 1 с таймаутом), который выполняется
+    фоновой задачей приложения;
+    - read-your-writes: после записи клиент получает cookie с временем
+    последней записи, и в течение окна его чтения идут на primary,
+    чтобы не увидеть данные реплики, ещё не догнавшей запись.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Cookie с unix-временем последней записи клиента
+LAST_WRITE_COOKIE = "qa_last_write"
+# Допустимое расхождение часов между подами, сек.: запись «из будущего»
+# не дальше этого ещё считается свежей
+MAX_CLOCK_SKEW = 2.0
+
+
+class ReplicaRouter:
+    """
+    Выбор движка для read-only сессий.
+
+    Args:
+        primary (AsyncEngine): Движок primary (используется как fallback);
+        replicas (Sequence[AsyncEngine]): Движки реплик;
+        check_timeout (float): Таймаут health-check одной реплики, сек.
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: Sequence[AsyncEngine],
+        *,
+        check_timeout: float = 2.0,
+    ) -> None:
+        self.primary = primary
+        self.replicas: List[AsyncEngine] = list(replicas)
+        self.check_timeout = check_timeout
+        self._healthy: Dict[int, bool] = {id(e): True for e in self.replicas}
+        self._rr = itertools.cycle(self.replicas) if self.replicas else None
+
+    def is_healthy(self, engine: AsyncEngine) -> bool:
+        """Считается ли реплика здоровой по результатам проверок."""
+        return self._healthy.get(id(engine), False)
+
+    def mark(self, engine: AsyncEngine, healthy: bool) -> None:
+        """
+        Обновить состояние реплики.
+
+        Args:
+            engine: Движок реплики.
+            healthy: Новое состояние.
+        """
+        if id(engine) not in self._healthy:
+            return
+        if self._healthy[id(engine)] != healthy:
+            logger.warning(
+                "Replica %s is now %s",
+                engine.url.render_as_string(hide_password=True),
+                "healthy" if healthy else "unhealthy",
+            )
+        self._healthy[id(engine)] = healthy
+
+    def pick(self, *, prefer_primary: bool = False) -> AsyncEngine:
+        """
+        Выбрать движок для чтения.
+
+        Args:
+            prefer_primary: Читать с primary (окно read-your-writes).
+
+        Returns:
+            Следующая по кругу здоровая реплика или primary.
+        """
+        if prefer_primary or self._rr is None:
+            return self.primary
+        for _ in range(len(self.replicas)):
+            engine = next(self._rr)
+            if self.is_healthy(engine):
+                return engine
+        return self.primary
+
+    async def check(self, engine: AsyncEngine) -> bool:
+        """
+        Проверить доступность реплики и обновить её состояние.
+
+        Args:
+            engine: Движок реплики.
+
+        Returns:
+            True, если реплика ответила за check_timeout.
+        """
+        try:
+            async with asyncio.timeout(self.check_timeout):
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+        except Exception:
+            self.mark(engine, False)
+            return False
+        self.mark(engine, True)
+        return True
+
+    async def check_all(self) -> None:
+        """Проверить все реплики параллельно."""
+        await asyncio.gather(*(self.check(e) for e in self.replicas))
+
+    async def run_health_checks(self, interval: float) -> None:
+        """
+        Бесконечный цикл health-check'ов (фоновая задача приложения).
+
+        Args:
+            interval: Пауза между проверками, сек.
+        """
+        while True:
+            await self.check_all()
+            await asyncio.sleep(interval)
+
+
+def within_write_window(
+    cookie_value: Optional[str],
+    window: float,
+    *,
+    max_skew: float = MAX_CLOCK_SKEW,
+    now: Optional[float] = None,
+) -> bool:
+    """
+    Попадает ли запрос в окно read-your-writes.
+
+    Args:
+        cookie_value: Значение cookie LAST_WRITE_COOKIE (unix-время).
+        window: Длина окна, сек.
+        max_skew: Насколько время записи может опережать текущее, сек.
+        now: Текущее время (для тестов).
+
+    Returns:
+        True, если последняя запись клиента была не раньше window секунд
+        назад и читать нужно с primary.
+    """
+    if not cookie_value or window <= 0:
+        return False
+    try:
+        last_write = float(cookie_value)
+    except ValueError:
+        return False
+    current = time.time() if now is None else now
+    # Cookie не подписана: время «из будущего» дальше расхождения часов
+    # между подами (в том числе inf) закрепило бы клиента за primary и
+    # в обход кэша ответов навсегда. NaN не проходит ни одно сравнение.
+    return -max_skew <= current - last_write <= window
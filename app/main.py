@@ -1,17 +1,160 @@
 """
 Точка входа FastAPI-приложения.
 
-Инициализирует приложение и подключает роутеры для вопросов и ответов.
+create_app() собирает приложение: роутеры вопросов, ответов, ответов
+пользователя и внутренних (служебных) эндпоинтов, метрики (GET /metrics,
+если не выключены METRICS_ENABLED), проверку бюджетов SQL-запросов
+маршрутов и профилирование запросов по требованию (PROFILING_ENABLED).
+
+Импорт модуля ничего не создаёт. Настройки (get_settings) и движки
+(get_database) создаются при сборке приложения и сохраняются в
+app.state; модули приложения (роутеры, модели, кэш ответов) читают
+настройки при импорте, поэтому импортируются в create_app(). Запуск —
+uvicorn app.main:create_app --factory (так работает app.server);
+атрибут app (uvicorn app.main:app, тесты) собирает приложение при первом
+обращении.
+
+При старте процесса lifespan прогревает пул соединений, кэш компиляции
+SQL и сериализаторы (STARTUP_WARMUP, app.core.warmup): сервер начинает
+принимать соединения уже прогретым.
 """
 
 from __future__ import annotations
 
-from fastapi import FastAPI
+import asyncio
+import contextlib
+import functools
+from typing import Any, AsyncIterator
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+
+from app.core.config import get_settings
+from app.core.pagination import InvalidCursorError
+from app.db.base import get_database
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Жизненный цикл приложения: прогрев при старте, фоновые health-check'и
+    реплик, очистка удалённых вопросов (в одном воркере) и писатель
+    очереди ответов на время работы; при остановке — запись принятых в
+    очередь ответов и закрытие пулов соединений.
+    """
+    from app.core.warmup import warm_up
+
+    settings = app.state.settings
+    database = app.state.database
+    answer_ingest = app.state.answer_ingest
+    if settings.startup_warmup:
+        connections = settings.startup_warm_connections
+        await warm_up(
+            database.async_engine,
+            database.replica_engines,
+            connections=(
+                connections
+                if connections is not None
+                else database.async_engine.pool.size()
+            ),
+            timeout=settings.startup_warmup_timeout,
+        )
+    tasks = []
+    if database.replica_router.replicas:
+        tasks.append(
+            asyncio.create_task(
+                database.replica_router.run_health_checks(
+                    settings.replica_check_interval
+                )
+            )
+        )
+    # Очистка — задача на всю базу: под app.server её выполняет один
+    # воркер (wake() на остальных ничего не делает — вопрос дочистится
+    # проходом по интервалу)
+    if settings.question_purge_enabled and not settings.server_worker_id:
+        tasks.append(
+            asyncio.create_task(
+                app.state.question_purger.run(settings.question_purge_interval)
+            )
+        )
+    if settings.answer_ingest_mode != "off":
+        answer_ingest.start()
+    try:
+        yield
+    finally:
+        await answer_ingest.stop(settings.answer_ingest_drain_timeout)
+        # Очистка прерывается посреди пачки безопасно: транзакция
+        # откатится, следующий запуск продолжит
+        for task in tasks:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        await database.dispose()
+
+
+def invalid_cursor_handler(
+    request: Request, exc: InvalidCursorError
+) -> JSONResponse:
+    """
+    Повреждённый курсор пагинации — ошибка клиента (400).
+    """
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": "Invalid cursor"},
+    )
+
+
+def create_app() -> FastAPI:
+    """
+    Собрать приложение (фабрика для uvicorn --factory).
+
+    Returns:
+        FastAPI-приложение со всеми роутерами, middleware и lifespan.
+    """
+    # Модули, читающие настройки при импорте (см. описание модуля)
+    from app.core.metrics import MetricsMiddleware
+    from app.core.profiling import ProfilingMiddleware
+    from app.core.query_budget import QueryBudgetMiddleware
+    from app.db.ingest import answer_ingest
+    from app.db.purge import question_purger
+    from app.routers import answers as answers_router
+    from app.routers import internal as internal_router
+    from app.routers import metrics as metrics_router
+    from app.routers import questions as questions_router
+    from app.routers import users as users_router
+
+    settings = get_settings()
+    app = FastAPI(title="Q&A Service", version="1.0.0", lifespan=lifespan)
+    app.state.settings = settings
+    app.state.database = get_database()
+    app.state.answer_ingest = answer_ingest
+    app.state.question_purger = question_purger
+
+    app.include_router(questions_router.router)
+    app.include_router(answers_router.router)
+    app.include_router(users_router.router)
+    app.include_router(internal_router.router)
+
+    app.add_middleware(QueryBudgetMiddleware)
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
+        app.include_router(metrics_router.router)
+    # Снаружи остальных: профиль включает и их; PROFILING_ENABLED
+    # проверяется на каждый запрос
+    app.add_middleware(ProfilingMiddleware)
+
+    app.add_exception_handler(InvalidCursorError, invalid_cursor_handler)
+    return app
+
 
-from app.routers import answers as answers_router
-from app.routers import questions as questions_router
+@functools.lru_cache(maxsize=None)
+def _module_app() -> FastAPI:
+    return create_app()
 
-app = FastAPI(title="Q&A Service", version="1.0.0")
 
-app.include_router(questions_router.router)
-app.include_router(answers_router.router)
+def __getattr__(name: str) -> Any:
+    # app — при первом обращении (uvicorn app.main:app, тесты), чтобы
+    # импорт модуля (и uvicorn --factory) не собирал приложение
+    if name == "app":
+        return _module_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,18 +4,29 @@
 Содержит SQLAlchemy-модель для таблицы ответов.
 Используется для хранения ответов пользователей на конкретные вопросы,
 а также для связи с таблицей вопросов (отношение многие-к-одному).
+Таблица секционирована (app.db.partitions): схема — по настройке
+ANSWERS_PARTITION_BY, секции создаются вместе с таблицей.
 """
 
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timezone
 
 import sqlalchemy as sa
-from sqlalchemy import CheckConstraint
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import CheckConstraint, event
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.core.config import settings
 from app.db.base import Base
+from app.db.partitions import (
+    add_months,
+    initial_partitions_ddl,
+    month_start,
+    partition_by,
+    partition_key,
+)
+from app.models.question import SEARCH_CONFIG
 
 
 class Answer(Base):
@@ -28,23 +39,42 @@ class Answer(Base):
         user_id (str): Идентификатор пользователя, оставившего ответ;
         text (str): Текст ответа (не может быть пустым);
         created_at (datetime): Дата и время создания ответа;
+        search_vector (str): tsvector текста для полнотекстового поиска
+            (генерируется БД, по умолчанию не загружается);
         question (Question): Объект связанного вопроса.
     """
 
     __tablename__ = "answers"
     __table_args__ = (
+        # Ключ секционирования обязан входить в первичный ключ. Первичный
+        # ключ индексирует id (ведущая колонка) — отдельный индекс по id
+        # не нужен.
+        sa.PrimaryKeyConstraint(
+            "id",
+            partition_key(settings.answers_partition_by),
+            name="answers_pkey",
+        ),
         CheckConstraint("btrim(text) <> ''", name="ck_answers_text_not_blank"),
+        # Страницы ответов вопроса; покрывает и внешний ключ question_id
+        # (каскадное удаление), поэтому индекса только по question_id нет
         sa.Index("ix_answers_question_created", "question_id", "created_at"),
+        # Выборки по пользователю: список его ответов и удаление
+        sa.Index("ix_answers_user_created", "user_id", "created_at"),
+        sa.Index(
+            "ix_answers_search_vector", "search_vector", postgresql_using="gin"
+        ),
+        {
+            "postgresql_partition_by": partition_by(
+                settings.answers_partition_by
+            )
+        },
     )
 
-    id: Mapped[int] = mapped_column(
-        sa.BigInteger, primary_key=True, index=True
-    )
+    id: Mapped[int] = mapped_column(sa.BigInteger, autoincrement=True)
 
     question_id: Mapped[int] = mapped_column(
         sa.ForeignKey("questions.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     user_id: Mapped[str] = mapped_column(
         UUID(as_uuid=False),
@@ -60,5 +90,27 @@ class Answer(Base):
         server_default=sa.text("CURRENT_TIMESTAMP"),
         nullable=False,
     )
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        sa.Computed(f"to_tsvector('{SEARCH_CONFIG}', text)", persisted=True),
+        deferred=True,
+    )
 
     question: Mapped["Question"] = relationship(back_populates="answers")
+
+    # id уникален сам по себе (одна последовательность на все секции)
+    __mapper_args__ = {"primary_key": [id]}
+
+
+@event.listens_for(Answer.__table__, "after_create")
+def _create_partitions(target: sa.Table, connection, **kw) -> None:
+    """Создать секции вместе с таблицей (create_all в тестах)."""
+    this_month = month_start(datetime.now(timezone.utc).date())
+    for ddl in initial_partitions_ddl(
+        settings.answers_partition_by,
+        table=target.fullname,
+        hash_partitions=settings.answers_hash_partitions,
+        first_month=this_month,
+        last_month=add_months(this_month, settings.answers_partitions_ahead),
+    ):
+        connection.execute(sa.text(ddl))
@@ -9,13 +9,21 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Optional
 
 import sqlalchemy as sa
 from sqlalchemy import CheckConstraint
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
 
+# Конфигурация полнотекстового поиска для tsvector-колонок и запросов.
+# В russian латинские слова стеммируются английским словарём, поэтому
+# конфигурация подходит и для смешанных текстов. Изменение требует
+# миграции: выражение зашито в генерируемые колонки.
+SEARCH_CONFIG = "russian"
+
 
 class Question(Base):
     """
@@ -25,6 +33,15 @@ class Question(Base):
         id (int): Уникальный идентификатор вопроса;
         text (str): Текст вопроса;
         created_at (datetime): Дата и время создания;
+        version (int): Счётчик изменений ответов вопроса (для ETag);
+        answers_count (int): Число ответов (денормализовано, ведётся
+            в app.crud.answer в той же транзакции, что и запись ответа);
+        last_answer_at (datetime | None): Время последнего ответа;
+        search_vector (str): tsvector текста для полнотекстового поиска
+            (генерируется БД, по умолчанию не загружается);
+        deleted_at (datetime | None): Время удаления; удалённый вопрос
+            скрыт из всех выборок, а его ответы и сама строка удаляются
+            фоновой очисткой (app.db.purge);
         answers (list[Answer]): Связанные ответы на вопрос.
     """
 
@@ -34,17 +51,74 @@ class Question(Base):
         CheckConstraint(
             "btrim(text) <> ''", name="ck_questions_text_not_blank"
         ),
+        # Индекс под сортировку списка и keyset-пагинацию
+        sa.Index(
+            "ix_questions_created_at_id",
+            sa.text("created_at DESC"),
+            sa.text("id DESC"),
+        ),
+        # Индексы под сортировки sort=answers_count и sort=last_activity
+        sa.Index(
+            "ix_questions_answers_count_id",
+            sa.text("answers_count DESC"),
+            sa.text("id DESC"),
+        ),
+        sa.Index(
+            "ix_questions_last_activity_id",
+            sa.text("coalesce(last_answer_at, created_at) DESC"),
+            sa.text("id DESC"),
+        ),
+        sa.Index(
+            "ix_questions_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+        # Очередь фоновой очистки: маленький частичный индекс
+        sa.Index(
+            "ix_questions_deleted_at",
+            "deleted_at",
+            postgresql_where=sa.text("deleted_at IS NOT NULL"),
+        ),
+        # Триграммный индекс (pg_trgm) под поиск похожих вопросов
+        sa.Index(
+            "ix_questions_text_trgm",
+            "text",
+            postgresql_using="gin",
+            postgresql_ops={"text": "gin_trgm_ops"},
+        ),
     )
 
-    id: Mapped[int] = mapped_column(
-        sa.BigInteger, primary_key=True, index=True
-    )
+    # Первичный ключ сам индексирует id
+    id: Mapped[int] = mapped_column(sa.BigInteger, primary_key=True)
     text: Mapped[str] = mapped_column(sa.String(500), nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         sa.DateTime(timezone=True),
         server_default=sa.text("CURRENT_TIMESTAMP"),
         nullable=False,
     )
+    version: Mapped[int] = mapped_column(
+        sa.BigInteger,
+        server_default=sa.text("1"),
+        nullable=False,
+    )
+    answers_count: Mapped[int] = mapped_column(
+        sa.Integer,
+        server_default=sa.text("0"),
+        nullable=False,
+    )
+    last_answer_at: Mapped[Optional[datetime]] = mapped_column(
+        sa.DateTime(timezone=True),
+        nullable=True,
+    )
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(
+        sa.DateTime(timezone=True),
+        nullable=True,
+    )
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        sa.Computed(f"to_tsvector('{SEARCH_CONFIG}', text)", persisted=True),
+        deferred=True,
+    )
 
     answers: Mapped[list["Answer"]] = relationship(
         back_populates="question",
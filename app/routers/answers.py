@@ -3,19 +3,63 @@
 
 Реализует эндпоинты:
     - POST /questions/{id}/answers/ — добавить ответ к вопросу;
-    - GET /answers/{id} — получить конкретный ответ;
+    - POST /questions/{id}/answers/bulk — добавить пачку ответов;
+    - GET /questions/{id}/answers — страница ответов на вопрос;
+    - GET /answers/ingest/{tracking_id} — статус ответа, принятого в
+    очередь записи;
+    - GET /answers/{id} — получить конкретный ответ (ETag, Cache-Control);
     - DELETE /answers/{id} — удалить ответ.
+
+Запись ответа инвалидирует в кэше и деталку вопроса, и списки вопросов:
+в них отдаются answers_count и last_answer_at.
+
+При ANSWER_INGEST_MODE=async|sync одиночные ответы пишутся через очередь
+с групповым коммитом (app.db.ingest).
 """
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Any, List, Optional
 
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    status,
+)
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import (
+    QUESTION_LIST_TAG,
+    invalidate_on_commit,
+    question_tag,
+)
+from app.core.config import settings
+from app.core.etag import etag_matches, make_etag
+from app.core.pagination import (
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    split_page,
+)
+from app.core.query_budget import query_budget
 from app.crud import answer as a_crud
 from app.crud import question as q_crud
-from app.db.dependences import get_db, get_uow
-from app.schemas.answer import AnswerCreate, AnswerOut
+from app.db.dependences import get_answer_ingest, get_db, get_uow
+from app.db.ingest import AnswerIngestQueue, IngestUnavailable
+from app.schemas.answer import (
+    AnswerCreate,
+    AnswerIngestStatusOut,
+    AnswerOut,
+    AnswerShortOut,
+)
+from app.schemas.bulk import AnswerBulkOut, validate_items
+from app.schemas.rows import dump_answer_list
 
 router = APIRouter(tags=["Answers"])
 
@@ -24,47 +68,237 @@ router = APIRouter(tags=["Answers"])
     "/questions/{question_id}/answers/",
     response_model=AnswerOut,
     status_code=status.HTTP_201_CREATED,
+    responses={
+        status.HTTP_202_ACCEPTED: {
+            "model": AnswerIngestStatusOut,
+            "description": "Ответ принят в очередь (ANSWER_INGEST_MODE=async)",
+        },
+        status.HTTP_503_SERVICE_UNAVAILABLE: {
+            "description": "Очередь записи заполнена, повторите позже",
+        },
+    },
 )
-def create_answer_for_question(
+@query_budget(statements=1)
+async def create_answer_for_question(
     question_id: int,
     payload: AnswerCreate,
-    db: Session = Depends(get_uow),
+    response: Response,
+    ingest: AnswerIngestQueue = Depends(get_answer_ingest),
+    db: AsyncSession = Depends(get_uow),
 ):
     """
     Добавить ответ к вопросу. Если вопрос не существует — вернуть 404.
+
+    Проверка существования, увеличение версии вопроса и вставка
+    выполняются одним запросом к БД.
+
+    Если включена очередь записи (ANSWER_INGEST_MODE), ответ пишется
+    фоновым писателем в группе с другими:
+        - async — сразу 202 с tracking_id; результат — в
+        GET /answers/ingest/{tracking_id} (в т. ч. question_not_found);
+        - sync — 201 (или 404) после коммита группы.
+    Если очередь заполнена — 503 с Retry-After.
     """
-    if not q_crud.get_question(db, question_id):
+    if settings.answer_ingest_mode != "off":
+        # Сессия get_uow в этом случае не открывает соединение
+        return await _create_answer_queued(
+            ingest, question_id, payload, response
+        )
+
+    row = await a_crud.create_answer(
+        db, question_id=question_id, user_id=payload.user_id, text=payload.text
+    )
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Question not found"
         )
+    invalidate_on_commit(db, QUESTION_LIST_TAG, question_tag(question_id))
+    return row
 
-    obj = obj = a_crud.create_answer(
-        db, question_id=question_id, user_id=payload.user_id, text=payload.text
+
+async def _create_answer_queued(
+    ingest: AnswerIngestQueue,
+    question_id: int,
+    payload: AnswerCreate,
+    response: Response,
+):
+    """
+    Принять ответ в очередь записи (режимы async и sync).
+
+    response — ответ, внедрённый FastAPI: на нём get_uow ставит cookie
+    read-your-writes.
+    """
+    try:
+        ticket = ingest.submit(
+            question_id=question_id,
+            user_id=payload.user_id,
+            text=payload.text,
+        )
+    except IngestUnavailable:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Answer queue is full",
+            headers={"Retry-After": "1"},
+        ) from None
+    if settings.answer_ingest_mode == "async":
+        accepted = JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=AnswerIngestStatusOut.model_validate(
+                ticket.status
+            ).model_dump(),
+        )
+        # Возвращённый Response заменяет внедрённый: без cookie клиент
+        # сразу после записи читал бы с реплики и мог не увидеть ответ
+        for cookie in response.headers.getlist("set-cookie"):
+            accepted.headers.append("set-cookie", cookie)
+        return accepted
+    try:
+        row = await ticket.wait()
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Answer was not written",
+            headers={"Retry-After": "1"},
+        ) from None
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Question not found"
+        )
+    return row
+
+
+@router.post(
+    "/questions/{question_id}/answers/bulk", response_model=AnswerBulkOut
+)
+# insertmanyvalues делит большую пачку на несколько одинаковых INSERT
+@query_budget(repeats=None)
+async def create_answers_bulk_for_question(
+    question_id: int,
+    payload: List[Any] = Body(..., max_length=settings.bulk_max_items),
+    db: AsyncSession = Depends(get_uow),
+):
+    """
+    Добавить к вопросу пачку ответов в одной транзакции.
+
+    Каждый элемент валидируется схемой AnswerCreate; невалидные элементы
+    возвращаются в errors с индексом, валидные вставляются одним
+    многострочным INSERT ... RETURNING. Если вопрос не существует —
+    вернуть 404.
+    """
+    valid, errors = validate_items(AnswerCreate, payload)
+    created = await a_crud.create_answers_bulk(
+        db,
+        question_id=question_id,
+        items=[item.model_dump() for item in valid],
     )
-    return obj
+    if created is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Question not found"
+        )
+    if created:
+        invalidate_on_commit(db, QUESTION_LIST_TAG, question_tag(question_id))
+    return AnswerBulkOut(created=created, errors=errors)
+
+
+@router.get(
+    "/questions/{question_id}/answers", response_model=List[AnswerShortOut]
+)
+@query_budget(statements=2)
+async def list_answers_for_question(
+    question_id: int,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Страница ответов на вопрос (старые первыми), keyset-пагинация.
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor.
+    Если вопрос не существует — вернуть 404.
+    """
+    # Строки сериализуются напрямую в bytes (app.schemas.rows),
+    # response_model задаёт только схему OpenAPI.
+    after = decode_cursor(cursor) if cursor is not None else None
+    if await q_crud.get_question_version(db, question_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Question not found"
+        )
+
+    rows = await a_crud.list_answer_rows(
+        db, question_id=question_id, limit=limit + 1, after=after
+    )
+    rows, next_cursor = split_page(rows, limit)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    return Response(
+        content=dump_answer_list(rows),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+@router.get(
+    "/answers/ingest/{tracking_id}", response_model=AnswerIngestStatusOut
+)
+async def get_answer_ingest_status(
+    tracking_id: str,
+    ingest: AnswerIngestQueue = Depends(get_answer_ingest),
+):
+    """
+    Статус ответа, принятого в очередь записи (ANSWER_INGEST_MODE=async).
+
+    Статусы хранятся в памяти процесса, принявшего ответ, и вытесняются
+    старые первыми; неизвестный tracking_id — 404.
+    """
+    ingest_status = ingest.status(tracking_id)
+    if ingest_status is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tracking id not found",
+        )
+    return ingest_status
 
 
 @router.get("/answers/{answer_id}", response_model=AnswerOut)
-def get_answer(answer_id: int, db: Session = Depends(get_db)):
+@query_budget(statements=1)
+async def get_answer(
+    answer_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
     """
     Получить ответ по id.
+
+    Ответы после создания не меняются, поэтому ETag зависит только от id,
+    а Cache-Control разрешает кэширование посредникам.
     """
-    obj = a_crud.get_answer(db, answer_id)
+    obj = await a_crud.get_answer(db, answer_id)
     if not obj:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Answer not found"
         )
+
+    headers = {
+        "ETag": make_etag("answer", answer_id),
+        "Cache-Control": f"public, max-age={settings.answer_cache_max_age}",
+    }
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
+        )
+    response.headers.update(headers)
     return obj
 
 
 @router.delete("/answers/{answer_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_answer(answer_id: int, db: Session = Depends(get_uow)):
+@query_budget(statements=2)
+async def delete_answer(answer_id: int, db: AsyncSession = Depends(get_uow)):
     """
     Удалить ответ по id.
     """
-    deleted = a_crud.delete_answer(db, answer_id)
-    if not deleted:
+    question_id = await a_crud.delete_answer_returning(db, answer_id)
+    if question_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Answer not found"
         )
+    invalidate_on_commit(db, QUESTION_LIST_TAG, question_tag(question_id))
     return None
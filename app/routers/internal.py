@@ -0,0 +1,201 @@
+"""
+Внутренние (служебные) маршруты.
+
+Реализует эндпоинты:
+    - GET /internal/pool — статистика пула соединений API;
+    - GET /internal/cache — статистика кэша ответов;
+    - GET /internal/ingest — статистика очереди записи ответов;
+    - GET /internal/purge — прогресс очистки удалённых вопросов;
+    - GET /internal/profiles — последние профили запросов;
+    - GET /internal/profiles/{id} — профиль (speedscope или collapsed);
+    - GET /internal/export — потоковая выгрузка данных в NDJSON.
+
+Не публикуются в OpenAPI-схеме и доступны только с заголовком
+X-Internal-Token: <INTERNAL_TOKEN>; без токена (или если INTERNAL_TOKEN не
+задан) — 404. Профили, кроме того, — только при PROFILING_ENABLED и с
+заголовком X-Profiling-Token: <PROFILING_TOKEN>.
+"""
+
+from __future__ import annotations
+
+import hmac
+from typing import (
+    AsyncContextManager,
+    AsyncIterator,
+    Callable,
+    List,
+    Literal,
+    Optional,
+)
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.profiling import profile_store
+from app.db.base import async_engine, pool_stats
+from app.db.dependences import get_read_session_factory
+from app.db.ingest import answer_ingest
+from app.db.purge import question_purger
+from app.schemas.internal import (
+    CacheStatsOut,
+    IngestStatsOut,
+    PoolStatsOut,
+    ProfileOut,
+    PurgeStatsOut,
+)
+from app.tools.export_ndjson import gzip_chunks, iter_ndjson
+
+
+def _token_matches(value: Optional[str], token: Optional[str]) -> bool:
+    """Задан ли токен и совпадает ли с ним значение заголовка."""
+    return (
+        bool(token)
+        and value is not None
+        and hmac.compare_digest(value.encode(), token.encode())
+    )
+
+
+def _not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND, detail="Not Found"
+    )
+
+
+async def require_internal_token(
+    x_internal_token: Optional[str] = Header(None),
+) -> None:
+    """
+    Проверить токен служебных маршрутов (заголовок X-Internal-Token).
+
+    Raises:
+        HTTPException: 404, если INTERNAL_TOKEN не задан, заголовка нет
+            или токен не совпадает (маршруты не выдают своего
+            существования).
+    """
+    if not _token_matches(x_internal_token, settings.internal_token):
+        raise _not_found()
+
+
+async def require_profiling_token(
+    x_profiling_token: Optional[str] = Header(None),
+) -> None:
+    """
+    Проверить доступ к профилям: в них тексты SQL-запросов, пути кода и
+    тайминги. Токен — PROFILING_TOKEN, но в заголовке X-Profiling-Token:
+    X-Profile профилировал бы и сам запрос профиля.
+
+    Raises:
+        HTTPException: 404, если профилирование выключено
+            (PROFILING_ENABLED), PROFILING_TOKEN не задан или не
+            совпадает.
+    """
+    if not settings.profiling_enabled or not _token_matches(
+        x_profiling_token, settings.profiling_token
+    ):
+        raise _not_found()
+
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["Internal"],
+    include_in_schema=False,
+    dependencies=[Depends(require_internal_token)],
+)
+
+
+@router.get("/pool", response_model=PoolStatsOut)
+async def get_pool_stats():
+    """
+    Статистика пула соединений: текущая загрузка и накопительные счётчики.
+    """
+    return pool_stats.snapshot(async_engine.pool)
+
+
+@router.get("/cache", response_model=CacheStatsOut)
+async def get_cache_stats():
+    """
+    Статистика кэша ответов: размер, попадания, промахи, вытеснения.
+    """
+    return response_cache.stats()
+
+
+@router.get("/ingest", response_model=IngestStatsOut)
+async def get_ingest_stats():
+    """
+    Статистика очереди записи ответов: заполненность и счётчики групп.
+    """
+    return answer_ingest.stats()
+
+
+@router.get("/purge", response_model=PurgeStatsOut)
+async def get_purge_stats():
+    """
+    Прогресс фоновой очистки удалённых вопросов.
+    """
+    return question_purger.stats()
+
+
+@router.get(
+    "/profiles",
+    response_model=List[ProfileOut],
+    dependencies=[Depends(require_profiling_token)],
+)
+async def list_profiles():
+    """
+    Последние профили запросов (PROFILING_ENABLED), новые первыми.
+    """
+    return profile_store.summaries()
+
+
+@router.get(
+    "/profiles/{profile_id}", dependencies=[Depends(require_profiling_token)]
+)
+async def get_profile(
+    profile_id: str, format: Literal["speedscope", "collapsed"] = "speedscope"
+):
+    """
+    Профиль запроса: JSON для speedscope (стеки и SQL-запросы) или
+    стеки в формате collapsed (flamegraph).
+    """
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found",
+        )
+    if format == "collapsed":
+        return PlainTextResponse(profile.collapsed())
+    return profile.speedscope()
+
+
+@router.get("/export")
+async def export_ndjson(
+    gzip: bool = False,
+    session_factory: Callable[
+        ..., AsyncContextManager[AsyncSession]
+    ] = Depends(get_read_session_factory),
+):
+    """
+    Потоковая выгрузка всех вопросов и ответов в NDJSON (опционально gzip).
+
+    Данные читаются серверным курсором в одном снимке (REPEATABLE READ)
+    и отдаются чанками, поэтому память не зависит от объёма таблиц.
+    """
+
+    async def body() -> AsyncIterator[bytes]:
+        async with session_factory(snapshot=True) as db:
+            chunks = iter_ndjson(db)
+            if gzip:
+                chunks = gzip_chunks(chunks)
+            async for chunk in chunks:
+                yield chunk
+
+    filename = "qa-export.ndjson" + (".gz" if gzip else "")
+    return StreamingResponse(
+        body(),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,27 @@
+"""
+Маршрут метрик для Prometheus.
+
+Реализует эндпоинт:
+    - GET /metrics — метрики app.core.metrics в текстовом формате.
+
+Не публикуется в OpenAPI-схеме; как и /internal/*, доступ должен
+ограничиваться на уровне инфраструктуры.
+"""
+
+from __future__ import annotations
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.core.metrics import CONTENT_TYPE, metrics
+
+router = APIRouter(tags=["Internal"], include_in_schema=False)
+
+
+@router.get("/metrics")
+async def get_metrics() -> Response:
+    """
+    Метрики процесса: задержки и статусы по маршрутам, SQL-запросы на
+    HTTP-запрос, пул соединений.
+    """
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
@@ -2,73 +2,416 @@
 Маршруты для работы с вопросами.
 
 Реализует эндпоинты:
-    - GET /questions/ — список вопросов;
-    - POST /questions/ — создать вопрос;
-    - GET /questions/{id} — получить вопрос с ответами;
-    - DELETE /questions/{id} — удалить вопрос (каскадно удалит ответы).
+    - GET /questions/ — список вопросов (offset или keyset-пагинация);
+    - GET /questions/search — полнотекстовый поиск по вопросам и ответам;
+    - GET /questions/similar — вопросы, похожие на текст (pg_trgm);
+    - POST /questions/ — создать вопрос (опционально — только если нет
+    похожих);
+    - POST /questions/bulk — создать пачку вопросов;
+    - GET /questions/{id} — получить вопрос с первой страницей ответов
+    (ETag / If-None-Match);
+    - DELETE /questions/{id} — удалить вопрос (мягко: ответы удаляются
+    в фоне, app.db.purge).
+
+Ответы GET-эндпоинтов собираются из строк колонок и сериализуются
+напрямую в bytes (app.schemas.rows); response_model задаёт только схему
+OpenAPI. Готовые тела кэшируются (response_cache) и инвалидируются после
+коммита соответствующих записей.
 """
 
 from __future__ import annotations
 
-from typing import List
+import html
+from datetime import datetime
+from functools import partial
+from typing import Any, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    status,
+)
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import (
+    QUESTION_LIST_TAG,
+    CachedResponse,
+    invalidate_on_commit,
+    question_tag,
+    response_cache,
+)
+from app.core.config import settings
+from app.core.etag import etag_matches, make_etag
+from app.core.pagination import (
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    SortKey,
+    decode_cursor,
+    split_page,
+)
+from app.core.query_budget import query_budget
+from app.crud import answer as a_crud
 from app.crud import question as q_crud
-from app.db.dependences import get_db, get_uow
+from app.crud import search as s_crud
+from app.crud.search import HIGHLIGHT_START, HIGHLIGHT_STOP
+from app.db.dependences import (
+    get_db,
+    get_uow,
+    in_write_window,
+    read_session,
+)
+from app.db.hooks import on_commit
+from app.db.purge import question_purger
+from app.schemas.bulk import QuestionBulkOut, validate_items
 from app.schemas.question import (
     QuestionCreate,
     QuestionDetail,
     QuestionListItem,
+    QuestionSearchItem,
+    QuestionSort,
+    SimilarQuestion,
+    SimilarQuestionsConflict,
+)
+from app.schemas.rows import (
+    dump_question_detail,
+    dump_question_list,
+    dump_question_search,
 )
 
 router = APIRouter(prefix="/questions", tags=["Questions"])
 
+Position = Optional[Tuple[datetime, int]]
+
+# Деталка меняется с каждым ответом: кэшировать можно, но только
+# с ревалидацией по ETag.
+_DETAIL_CACHE_CONTROL = "no-cache"
+
+
+def _question_etag(
+    question_id: int, version: int, answers_limit: int, after: Position
+) -> str:
+    """ETag деталки: версия вопроса и параметры страницы ответов."""
+    return make_etag("question", question_id, version, answers_limit, after)
+
+
+async def _load_questions_page(
+    db: AsyncSession,
+    limit: int,
+    offset: int,
+    after: Optional[Tuple[SortKey, int]],
+    sort: QuestionSort,
+) -> CachedResponse:
+    """Выбрать и сериализовать страницу списка вопросов (быстрый путь)."""
+    # Берём на одну запись больше, чтобы понять, есть ли следующая страница
+    rows = await q_crud.list_question_rows(
+        db, limit=limit + 1, offset=offset, after=after, sort=sort
+    )
+    rows, next_cursor = split_page(
+        rows, limit, key=lambda row: q_crud.sort_key(row, sort)
+    )
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    return CachedResponse(body=dump_question_list(rows), headers=headers)
+
+
+async def _load_question_detail(
+    db: AsyncSession, question_id: int, answers_limit: int, after: Position
+) -> Optional[CachedResponse]:
+    """Выбрать и сериализовать вопрос со страницей ответов (быстрый путь)."""
+    question = await q_crud.get_question_row(db, question_id)
+    if question is None:
+        return None
+
+    answers = await a_crud.list_answer_rows(
+        db, question_id=question_id, limit=answers_limit + 1, after=after
+    )
+    answers, next_cursor = split_page(answers, answers_limit)
+    etag = _question_etag(question_id, question.version, answers_limit, after)
+    return CachedResponse(
+        body=dump_question_detail(question, answers, next_cursor),
+        headers={"ETag": etag, "Cache-Control": _DETAIL_CACHE_CONTROL},
+    )
+
+
+async def _refresh_in_own_session(load, *args) -> Optional[CachedResponse]:
+    """
+    Фоновое обновление кэша (stale-while-revalidate).
+
+    Открывает собственную read-сессию: сессия исходного запроса к этому
+    моменту уже закрыта.
+    """
+    async with read_session() as db:
+        return await load(db, *args)
+
+
+def _json_response(cached: CachedResponse) -> Response:
+    """Отдать закэшированное тело как есть, без повторной сериализации."""
+    return Response(
+        content=cached.body,
+        media_type="application/json",
+        headers=cached.headers,
+    )
+
 
 @router.get("/", response_model=List[QuestionListItem])
-def list_questions(
-    limit: int = 100, offset: int = 0, db: Session = Depends(get_db)
+@query_budget(statements=1)
+async def list_questions(
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    sort: QuestionSort = QuestionSort.created_at,
+    fresh: bool = Depends(in_write_window),
+    db: AsyncSession = Depends(get_db),
 ):
     """
-    Список вопросов. Поддерживает простую пагинацию.
+    Список вопросов с числом ответов и временем последнего ответа.
+
+    Порядок (sort, по убыванию):
+        - created_at — новые первыми (по умолчанию);
+        - answers_count — больше всего ответов;
+        - last_activity — недавний ответ (или создание, если ответов нет).
+
+    Поддерживает два режима пагинации:
+        - offset — через limit/offset;
+        - keyset — через непрозрачный cursor (offset игнорируется).
+    Если есть следующая страница, её курсор возвращается в заголовке
+    X-Next-Cursor; курсор действителен только для той же сортировки.
     """
-    items = q_crud.list_questions(db, limit=limit, offset=offset)
-    return items
+    after = None
+    if cursor is not None:
+        key_type = int if sort is QuestionSort.answers_count else datetime
+        after = decode_cursor(cursor, key_type=key_type)
+        offset = 0
+
+    args = (limit, offset, after, sort)
+    cached = await response_cache.get_or_load(
+        ("questions", *args),
+        partial(_load_questions_page, db, *args),
+        tags=(QUESTION_LIST_TAG,),
+        refresh=partial(_refresh_in_own_session, _load_questions_page, *args),
+        bypass=fresh,
+    )
+    return _json_response(cached)
+
+
+def _render_snippet(snippet: str) -> str:
+    """Экранировать фрагмент ts_headline и подсветить совпадения <mark>."""
+    return (
+        html.escape(snippet, quote=False)
+        .replace(HIGHLIGHT_START, "<mark>")
+        .replace(HIGHLIGHT_STOP, "</mark>")
+    )
+
+
+@router.get("/search", response_model=List[QuestionSearchItem])
+@query_budget(statements=1)
+async def search_questions(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Полнотекстовый поиск вопросов по их тексту и текстам ответов.
+
+    Запрос q — в синтаксисе websearch: слова, "фраза", OR, -исключение.
+    Результаты упорядочены по релевантности; snippet — фрагмент с
+    подсвеченными (<mark>) совпадениями. Курсор следующей страницы
+    возвращается в заголовке X-Next-Cursor.
+    """
+    after = (
+        decode_cursor(cursor, key_type=float) if cursor is not None else None
+    )
+    rows = await s_crud.search_questions(
+        db, query=q, limit=limit + 1, after=after
+    )
+    rows, next_cursor = split_page(rows, limit, key=lambda row: row.rank)
+    items = [
+        {**row._asdict(), "snippet": _render_snippet(row.snippet)}
+        for row in rows
+    ]
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    return Response(
+        content=dump_question_search(items),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+@router.get("/similar", response_model=List[SimilarQuestion])
+@query_budget(statements=2)
+async def similar_questions(
+    text: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(
+        settings.similar_questions_limit, ge=1, le=MAX_PAGE_SIZE
+    ),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Существующие вопросы, похожие на text (триграммное сходство pg_trgm
+    не ниже SIMILAR_QUESTIONS_THRESHOLD), самые похожие первыми.
+
+    Клиент может показать их до отправки нового вопроса, чтобы не
+    плодить дубликаты.
+    """
+    return await q_crud.find_similar_questions(
+        db,
+        query=text.strip(),
+        limit=limit,
+        threshold=settings.similar_questions_threshold,
+    )
 
 
 @router.post(
-    "/", response_model=QuestionDetail, status_code=status.HTTP_201_CREATED
+    "/",
+    response_model=QuestionDetail,
+    status_code=status.HTTP_201_CREATED,
+    responses={
+        status.HTTP_409_CONFLICT: {
+            "model": SimilarQuestionsConflict,
+            "description": "Есть похожие вопросы (suggest_similar=true)",
+        }
+    },
 )
-def create_question(payload: QuestionCreate, db: Session = Depends(get_uow)):
+@query_budget(statements=3)
+async def create_question(
+    payload: QuestionCreate,
+    suggest_similar: bool = False,
+    db: AsyncSession = Depends(get_uow),
+):
     """
-    Создать новый вопрос.
+    Создать новый вопрос (один INSERT ... RETURNING; ответов у нового
+    вопроса нет).
+
+    С suggest_similar=true вопрос создаётся, только если похожих
+    (как в GET /questions/similar) нет; иначе возвращается 409 со
+    списком похожих — клиент может предложить пользователю перейти к
+    ним или повторить запрос без suggest_similar.
     """
-    obj = q_crud.create_question(db, text=payload.text)
-    return obj
+    if suggest_similar:
+        similar = await q_crud.find_similar_questions(
+            db,
+            query=payload.text,
+            limit=settings.similar_questions_limit,
+            threshold=settings.similar_questions_threshold,
+        )
+        if similar:
+            conflict = SimilarQuestionsConflict(
+                detail="Similar questions exist",
+                similar=[SimilarQuestion.model_validate(r) for r in similar],
+            )
+            return JSONResponse(
+                status_code=status.HTTP_409_CONFLICT,
+                content=conflict.model_dump(mode="json"),
+            )
+    row = await q_crud.create_question(db, text=payload.text)
+    invalidate_on_commit(db, QUESTION_LIST_TAG)
+    return QuestionDetail(id=row.id, text=row.text, created_at=row.created_at)
+
+
+@router.post("/bulk", response_model=QuestionBulkOut)
+# insertmanyvalues делит большую пачку на несколько одинаковых INSERT
+@query_budget(repeats=None)
+async def create_questions_bulk(
+    payload: List[Any] = Body(..., max_length=settings.bulk_max_items),
+    db: AsyncSession = Depends(get_uow),
+):
+    """
+    Создать пачку вопросов в одной транзакции.
+
+    Каждый элемент валидируется схемой QuestionCreate; невалидные элементы
+    возвращаются в errors с индексом, валидные вставляются одним
+    многострочным INSERT ... RETURNING.
+    """
+    valid, errors = validate_items(QuestionCreate, payload)
+    created = await q_crud.create_questions_bulk(
+        db, texts=[item.text for item in valid]
+    )
+    if created:
+        invalidate_on_commit(db, QUESTION_LIST_TAG)
+    return QuestionBulkOut(created=created, errors=errors)
 
 
 @router.get("/{question_id}", response_model=QuestionDetail)
-def get_question(question_id: int, db: Session = Depends(get_db)):
+@query_budget(statements=3)
+async def get_question(
+    question_id: int,
+    answers_limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    answers_cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    fresh: bool = Depends(in_write_window),
+    db: AsyncSession = Depends(get_db),
+):
     """
-    Получить вопрос по id вместе с ответами.
+    Получить вопрос по id вместе со страницей ответов (старые первыми).
+
+    Курсор следующей страницы ответов возвращается в answers_next_cursor;
+    остальные страницы удобно читать через GET /questions/{id}/answers.
+
+    Ответ содержит ETag. Если он совпадает с If-None-Match, возвращается
+    304 без загрузки ответов и сериализации: версия берётся из кэша или
+    одним поиском по первичному ключу.
     """
-    obj = q_crud.get_question(db, question_id, with_answers=True)
-    if not obj:
+    after = (
+        decode_cursor(answers_cursor) if answers_cursor is not None else None
+    )
+
+    args = (question_id, answers_limit, after)
+    key = ("question", *args)
+    if if_none_match:
+        cached = None if fresh else response_cache.peek(key)
+        if cached is not None:
+            etag = cached.headers["ETag"]
+        else:
+            version = await q_crud.get_question_version(db, question_id)
+            if version is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Question not found",
+                )
+            etag = _question_etag(question_id, version, answers_limit, after)
+        if etag_matches(if_none_match, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag, "Cache-Control": _DETAIL_CACHE_CONTROL},
+            )
+
+    cached = await response_cache.get_or_load(
+        key,
+        partial(_load_question_detail, db, *args),
+        tags=(question_tag(question_id),),
+        refresh=partial(_refresh_in_own_session, _load_question_detail, *args),
+        bypass=fresh,
+    )
+    if cached is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Question not found"
         )
-    return obj
+    return _json_response(cached)
 
 
 @router.delete("/{question_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_question(question_id: int, db: Session = Depends(get_uow)):
+@query_budget(statements=1)
+async def delete_question(
+    question_id: int, db: AsyncSession = Depends(get_uow)
+):
     """
-    Удалить вопрос по id. Связанные ответы будут удалены каскадно на уровне БД.
+    Удалить вопрос по id.
+
+    Вопрос помечается удалённым и сразу пропадает из выдачи, поэтому
+    запрос выполняется за постоянное время при любом числе ответов.
+    Ответы удаляются фоновой очисткой пачками короткими транзакциями.
     """
-    deleted = q_crud.delete_question(db, question_id)
+    deleted = await q_crud.delete_question(db, question_id)
     if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Question not found"
         )
+    invalidate_on_commit(db, QUESTION_LIST_TAG, question_tag(question_id))
+    on_commit(db, question_purger.wake)
     return None
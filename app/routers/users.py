@@ -0,0 +1,108 @@
+"""
+Маршруты для работы с ответами пользователя.
+
+Реализует эндпоинты:
+    - GET /users/{user_id}/answers — ответы пользователя постранично
+    (новые первыми);
+    - DELETE /users/{user_id}/answers — удалить все ответы пользователя.
+
+user_id в пути нормализуется так же, как в теле AnswerCreate: UUID
+приводится к нижнему регистру, произвольная строка — к UUID5.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import (
+    QUESTION_LIST_TAG,
+    invalidate_on_commit,
+    question_tag,
+)
+from app.core.config import settings
+from app.core.pagination import (
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    split_page,
+)
+from app.core.query_budget import query_budget
+from app.crud import answer as a_crud
+from app.db.dependences import get_db, get_uow
+from app.schemas.answer import AnswerCreate, AnswerOut, UserAnswersDeleted
+from app.schemas.rows import dump_user_answer_list
+
+router = APIRouter(prefix="/users", tags=["Users"])
+
+
+def normalized_user_id(user_id: str) -> str:
+    """
+    Нормализовать user_id из пути (AnswerCreate.normalize_or_generate_uuid).
+    """
+    try:
+        return AnswerCreate.normalize_or_generate_uuid(user_id)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)
+        ) from exc
+
+
+@router.get("/{user_id}/answers", response_model=List[AnswerOut])
+@query_budget(statements=1)
+async def list_user_answers(
+    user_id: str = Depends(normalized_user_id),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Ответы пользователя (новые первыми), keyset-пагинация.
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor.
+    """
+    # Строки сериализуются напрямую в bytes (app.schemas.rows),
+    # response_model задаёт только схему OpenAPI.
+    after = decode_cursor(cursor) if cursor is not None else None
+    rows = await a_crud.list_user_answer_rows(
+        db, user_id=user_id, limit=limit + 1, after=after
+    )
+    rows, next_cursor = split_page(rows, limit)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    return Response(
+        content=dump_user_answer_list(rows),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+@router.delete("/{user_id}/answers", response_model=UserAnswersDeleted)
+# Пачки удаляются в цикле одним и тем же DELETE
+@query_budget(repeats=None)
+async def delete_user_answers(
+    user_id: str = Depends(normalized_user_id),
+    db: AsyncSession = Depends(get_uow),
+):
+    """
+    Удалить все ответы пользователя (например, по запросу на удаление
+    аккаунта).
+
+    Ответы удаляются пачками по USER_ANSWERS_DELETE_BATCH, каждая пачка
+    коммитится отдельно: блокировки строк ответов и их вопросов держатся
+    недолго даже для пользователя с большим числом ответов. При сбое
+    уже удалённые пачки остаются удалёнными — запрос можно повторить.
+    """
+    deleted = 0
+    while True:
+        touched = await a_crud.delete_user_answers_batch(
+            db, user_id=user_id, batch_size=settings.user_answers_delete_batch
+        )
+        if not touched:
+            break
+        deleted += sum(touched.values())
+        invalidate_on_commit(
+            db, QUESTION_LIST_TAG, *(question_tag(q) for q in touched)
+        )
+        await db.commit()
+    return UserAnswersDeleted(deleted=deleted)
@@ -15,7 +15,7 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime
-from typing import Any
+from typing import Optional
 
 from pydantic import BaseModel, Field, field_validator
 from pydantic.config import ConfigDict
@@ -97,3 +97,34 @@ class AnswerShortOut(BaseModel):
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class UserAnswersDeleted(BaseModel):
+    """
+    Результат удаления всех ответов пользователя.
+
+    Args:
+        deleted (int): Число удалённых ответов.
+    """
+
+    deleted: int
+
+
+class AnswerIngestStatusOut(BaseModel):
+    """
+    Статус ответа, принятого в очередь записи (ANSWER_INGEST_MODE=async).
+
+    Args:
+        tracking_id (str): Идентификатор, выданный при приёме;
+        question_id (int): Идентификатор вопроса;
+        status (str): queued — ждёт записи, committed — записан,
+            question_not_found — вопроса нет, failed — ошибка записи;
+        answer_id (Optional[int]): id созданного ответа (после записи).
+    """
+
+    tracking_id: str
+    question_id: int
+    status: str
+    answer_id: Optional[int] = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,92 @@
+"""
+Pydantic-схемы массовой загрузки (bulk) вопросов и ответов.
+
+Элементы пакета валидируются по отдельности теми же схемами, что и
+одиночные запросы (QuestionCreate/AnswerCreate): невалидные элементы не
+отклоняют весь пакет, а попадают в errors с индексом, валидные —
+вставляются одним многострочным INSERT ... RETURNING.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Sequence, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from app.schemas.answer import AnswerOut
+from app.schemas.question import QuestionListItem
+
+M = TypeVar("M", bound=BaseModel)
+
+
+class BulkItemError(BaseModel):
+    """
+    Ошибка валидации одного элемента пакета.
+
+    Args:
+        index (int): Позиция элемента во входном массиве;
+        errors (List[Dict[str, Any]]): Ошибки в формате Pydantic
+            (loc, msg, type).
+    """
+
+    index: int
+    errors: List[Dict[str, Any]]
+
+
+class AnswerBulkOut(BaseModel):
+    """
+    Результат массовой загрузки ответов.
+
+    Args:
+        created (List[AnswerOut]): Созданные ответы (в порядке входа);
+        errors (List[BulkItemError]): Отклонённые элементы.
+    """
+
+    created: List[AnswerOut]
+    errors: List[BulkItemError]
+
+
+class QuestionBulkOut(BaseModel):
+    """
+    Результат массовой загрузки вопросов.
+
+    Args:
+        created (List[QuestionListItem]): Созданные вопросы (в порядке
+            входа);
+        errors (List[BulkItemError]): Отклонённые элементы.
+    """
+
+    created: List[QuestionListItem]
+    errors: List[BulkItemError]
+
+
+def validate_items(
+    model: Type[M], items: Sequence[Any]
+) -> Tuple[List[M], List[BulkItemError]]:
+    """
+    Провалидировать элементы пакета по одному.
+
+    Args:
+        model: Схема элемента (например, AnswerCreate).
+        items: Сырые элементы из тела запроса.
+
+    Returns:
+        Кортеж (валидные элементы, ошибки невалидных).
+    """
+    valid: List[M] = []
+    errors: List[BulkItemError] = []
+    for index, item in enumerate(items):
+        try:
+            valid.append(model.model_validate(item))
+        except ValidationError as exc:
+            errors.append(
+                BulkItemError(
+                    index=index,
+                    errors=exc.errors(
+                        include_url=False,
+                        include_context=False,
+                        include_input=False,
+                    ),
+                )
+            )
+    return valid, errors
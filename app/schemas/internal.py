@@ -0,0 +1,161 @@
+"""
+Pydantic-схемы внутренних (служебных) эндпоинтов.
+
+Содержит модели статистики для служебных эндпоинтов:
+    - пула соединений (GET /internal/pool);
+    - кэша ответов (GET /internal/cache);
+    - очереди записи ответов (GET /internal/ingest);
+    - очистки удалённых вопросов (GET /internal/purge);
+    - профилей запросов (GET /internal/profiles).
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class PoolStatsOut(BaseModel):
+    """
+    Статистика пула соединений API.
+
+    Args:
+        pool_class (str): Класс пула;
+        size (Optional[int]): Настроенный размер пула (pool_size);
+        checkedin (Optional[int]): Свободных соединений в пуле сейчас;
+        checkedout (Optional[int]): Выданных соединений сейчас;
+        overflow (Optional[int]): Текущее превышение pool_size
+            (отрицательное — пул ещё не заполнен);
+        checked_out_max (int): Максимум одновременно выданных соединений;
+        checkouts (int): Всего выдач соединений;
+        checkins (int): Всего возвратов соединений;
+        connects (int): Всего открыто физических соединений;
+        invalidations (int): Всего инвалидаций;
+        timeouts (int): Сколько раз истёк pool_timeout;
+        wait_seconds_total (float): Суммарное время получения соединения;
+        wait_seconds_max (float): Максимальное время получения соединения.
+    """
+
+    pool_class: str
+    size: Optional[int] = None
+    checkedin: Optional[int] = None
+    checkedout: Optional[int] = None
+    overflow: Optional[int] = None
+    checked_out_max: int
+    checkouts: int
+    checkins: int
+    connects: int
+    invalidations: int
+    timeouts: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+
+
+class CacheStatsOut(BaseModel):
+    """
+    Статистика in-process кэша ответов.
+
+    Args:
+        enabled (bool): Включён ли кэш;
+        entries (int): Записей в кэше сейчас;
+        max_entries (int): Предельное число записей;
+        hits (int): Попадания в свежие записи;
+        stale_hits (int): Попадания в устаревшие записи (с фоновым
+            обновлением);
+        misses (int): Промахи (загрузка из БД);
+        evictions (int): Вытеснения по LRU;
+        invalidations (int): Записи, удалённые инвалидацией.
+    """
+
+    enabled: bool
+    entries: int
+    max_entries: int
+    hits: int
+    stale_hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+
+
+class IngestStatsOut(BaseModel):
+    """
+    Статистика очереди записи ответов с групповым коммитом.
+
+    Args:
+        running (bool): Принимает ли очередь ответы;
+        queued (int): Ответов в очереди сейчас;
+        max_size (int): Ёмкость очереди;
+        accepted (int): Принято в очередь;
+        rejected (int): Отклонено (очередь заполнена или остановлена);
+        committed (int): Записано в БД;
+        failed (int): Не записано из-за ошибки или остановки;
+        groups (int): Записано групп (транзакций).
+    """
+
+    running: bool
+    queued: int
+    max_size: int
+    accepted: int
+    rejected: int
+    committed: int
+    failed: int
+    groups: int
+
+
+class PurgeStatsOut(BaseModel):
+    """
+    Прогресс фоновой очистки удалённых вопросов.
+
+    Args:
+        pending_questions (int): Вопросов в очереди на очистку (по
+            данным последнего прохода);
+        current_question_id (Optional[int]): Вопрос, который чистится
+            сейчас;
+        current_answers_purged (int): Удалено ответов текущего (или
+            последнего) вопроса;
+        questions_purged (int): Всего удалено вопросов;
+        answers_purged (int): Всего удалено ответов;
+        batches (int): Всего пачек (транзакций);
+        errors (int): Проходов, прерванных ошибкой.
+    """
+
+    pending_questions: int
+    current_question_id: Optional[int] = None
+    current_answers_purged: int
+    questions_purged: int
+    answers_purged: int
+    batches: int
+    errors: int
+
+
+class ProfileOut(BaseModel):
+    """
+    Краткое описание профиля запроса.
+
+    Args:
+        id (str): Идентификатор профиля (заголовок X-Profile-Id);
+        method (str): HTTP-метод;
+        path (str): Путь запроса;
+        route (str): Шаблон пути маршрута;
+        status (int): Код ответа;
+        started_at (datetime): Время начала запроса;
+        duration_ms (float): Длительность запроса;
+        samples (int): Число сэмплов стека;
+        cpu_ms (float): Время выполнения кода запроса (без ожидания);
+        sql_statements (int): Число SQL-запросов;
+        sql_ms (float): Суммарное время SQL-запросов.
+    """
+
+    id: str
+    method: str
+    path: str
+    route: str
+    status: int
+    started_at: datetime
+    duration_ms: float
+    samples: int
+    cpu_ms: float
+    sql_statements: int
+    sql_ms: float
@@ -10,7 +10,8 @@ Pydantic-схемы для работы с Question.
 from __future__ import annotations
 
 from datetime import datetime
-from typing import List
+from enum import Enum
+from typing import List, Optional
 
 from pydantic import BaseModel, Field, field_validator
 from pydantic.config import ConfigDict
@@ -38,18 +39,90 @@ class QuestionCreate(BaseModel):
         return vv
 
 
+class QuestionSort(str, Enum):
+    """
+    Порядок списка вопросов (всегда по убыванию, затем по id).
+
+    Каждому порядку соответствует индекс, поэтому страница читается
+    index scan'ом, а не агрегатом по ответам.
+    """
+
+    created_at = "created_at"
+    answers_count = "answers_count"
+    last_activity = "last_activity"
+
+
 class QuestionListItem(BaseModel):
     """
     Элемент списка вопросов.
+
+    Args:
+        id (int): Идентификатор вопроса.
+        text (str): Текст вопроса.
+        created_at (datetime): Время создания.
+        answers_count (int): Число ответов.
+        last_answer_at (Optional[datetime]): Время последнего ответа или
+            None, если ответов нет.
+    """
+
+    id: int
+    text: str
+    created_at: datetime
+    answers_count: int = 0
+    last_answer_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class QuestionSearchItem(QuestionListItem):
+    """
+    Результат полнотекстового поиска вопросов.
+
+    Args:
+        rank (float): Релевантность (ts_rank лучшего совпадения).
+        snippet (str): Фрагмент текста вопроса или ответа, в котором
+            найдено совпадение. HTML-экранирован, найденные слова
+            обёрнуты в <mark>...</mark>.
+    """
+
+    rank: float
+    snippet: str
+
+
+class SimilarQuestion(BaseModel):
+    """
+    Существующий вопрос, похожий на заданный текст.
+
+    Args:
+        id (int): Идентификатор вопроса.
+        text (str): Текст вопроса.
+        created_at (datetime): Время создания.
+        similarity (float): Триграммное сходство текстов (0..1).
     """
 
     id: int
     text: str
     created_at: datetime
+    similarity: float
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class SimilarQuestionsConflict(BaseModel):
+    """
+    Ответ 409 на создание вопроса с suggest_similar=true: вопрос не
+    создан, потому что уже есть похожие.
+
+    Args:
+        detail (str): Описание ошибки.
+        similar (List[SimilarQuestion]): Похожие вопросы, самые похожие
+            первыми.
+    """
+
+    detail: str
+    similar: List[SimilarQuestion]
+
+
 class QuestionDetail(BaseModel):
     """
     Детальное представление вопроса c вложенными ответами.
@@ -58,12 +131,16 @@ class QuestionDetail(BaseModel):
         id (int): Идентификатор вопроса.
         text (str): Текст вопроса.
         created_at (datetime): Время создания.
-        answers (List[AnswerShortOut]): Список связанных ответов.
+        answers (List[AnswerShortOut]): Страница связанных ответов
+            (старые первыми).
+        answers_next_cursor (Optional[str]): Курсор следующей страницы
+            ответов или None, если страница последняя.
     """
 
     id: int
     text: str
     created_at: datetime
     answers: List[AnswerShortOut] = []
+    answers_next_cursor: Optional[str] = None
 
     model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,158 @@
+"""
+Быстрая сериализация строк БД в JSON для горячих GET-эндпоинтов.
+
+Вместо цепочки «ORM-объект → Pydantic-модель (from_attributes) → JSON»
+строки выборки по колонкам (Core select) сразу сериализуются в bytes
+заранее скомпилированными TypeAdapter'ами над TypedDict: без identity
+map, без создания моделей и без повторной валидации данных из БД.
+
+TypedDict'ы повторяют поля схем ответа (QuestionListItem,
+QuestionSearchItem, QuestionDetail, AnswerShortOut, AnswerOut) — JSON
+побайтно совпадает, а OpenAPI по-прежнему строится по response_model
+эндпоинтов. Совпадение полей проверяется тестами.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from pydantic import TypeAdapter
+from sqlalchemy import Row
+from typing_extensions import TypedDict
+
+
+class QuestionRow(TypedDict):
+    """Строка списка вопросов (поля QuestionListItem)."""
+
+    id: int
+    text: str
+    created_at: datetime
+    answers_count: int
+    last_answer_at: Optional[datetime]
+
+
+class QuestionSearchRow(QuestionRow):
+    """Результат поиска вопросов (поля QuestionSearchItem)."""
+
+    rank: float
+    snippet: str
+
+
+class AnswerShortRow(TypedDict):
+    """Строка ответа во вложенных списках (поля AnswerShortOut)."""
+
+    id: int
+    user_id: str
+    text: str
+    created_at: datetime
+
+
+class AnswerRow(TypedDict):
+    """Ответ с id вопроса (поля AnswerOut)."""
+
+    id: int
+    question_id: int
+    user_id: str
+    text: str
+    created_at: datetime
+
+
+class QuestionDetailRow(TypedDict):
+    """Деталка вопроса со страницей ответов (поля QuestionDetail)."""
+
+    id: int
+    text: str
+    created_at: datetime
+    answers: List[AnswerShortRow]
+    answers_next_cursor: Optional[str]
+
+
+_question_list_adapter = TypeAdapter(List[QuestionRow])
+_question_search_adapter = TypeAdapter(List[QuestionSearchRow])
+_answer_list_adapter = TypeAdapter(List[AnswerShortRow])
+_user_answer_list_adapter = TypeAdapter(List[AnswerRow])
+_question_detail_adapter = TypeAdapter(QuestionDetailRow)
+
+
+def _dicts(rows: Sequence[Row]) -> List[Dict[str, Any]]:
+    return [row._asdict() for row in rows]
+
+
+def dump_question_list(rows: Sequence[Row]) -> bytes:
+    """
+    Сериализовать страницу вопросов.
+
+    Args:
+        rows: Строки (id, text, created_at, answers_count, last_answer_at).
+
+    Returns:
+        JSON-массив в формате List[QuestionListItem].
+    """
+    return _question_list_adapter.dump_json(_dicts(rows))
+
+
+def dump_question_search(items: Sequence[Dict[str, Any]]) -> bytes:
+    """
+    Сериализовать страницу результатов поиска.
+
+    Args:
+        items: Словари с полями QuestionSearchItem (snippet уже
+            подготовлен для выдачи).
+
+    Returns:
+        JSON-массив в формате List[QuestionSearchItem].
+    """
+    return _question_search_adapter.dump_json(items)
+
+
+def dump_answer_list(rows: Sequence[Row]) -> bytes:
+    """
+    Сериализовать страницу ответов.
+
+    Args:
+        rows: Строки (id, user_id, text, created_at).
+
+    Returns:
+        JSON-массив в формате List[AnswerShortOut].
+    """
+    return _answer_list_adapter.dump_json(_dicts(rows))
+
+
+def dump_user_answer_list(rows: Sequence[Row]) -> bytes:
+    """
+    Сериализовать страницу ответов пользователя.
+
+    Args:
+        rows: Строки (id, question_id, user_id, text, created_at).
+
+    Returns:
+        JSON-массив в формате List[AnswerOut].
+    """
+    return _user_answer_list_adapter.dump_json(_dicts(rows))
+
+
+def dump_question_detail(
+    question: Row, answers: Sequence[Row], answers_next_cursor: Optional[str]
+) -> bytes:
+    """
+    Сериализовать деталку вопроса.
+
+    Args:
+        question: Строка вопроса (id, text, created_at, ...); лишние
+            колонки в JSON не попадают.
+        answers: Строки ответов (id, user_id, text, created_at).
+        answers_next_cursor: Курсор следующей страницы ответов.
+
+    Returns:
+        JSON-объект в формате QuestionDetail.
+    """
+    return _question_detail_adapter.dump_json(
+        {
+            "id": question.id,
+            "text": question.text,
+            "created_at": question.created_at,
+            "answers": _dicts(answers),
+            "answers_next_cursor": answers_next_cursor,
+        }
+    )
@@ -0,0 +1,298 @@
+"""
+Production-сервер: несколько процессов-воркеров uvicorn.
+
+Родительский процесс открывает сокет и запускает SERVER_WORKERS
+воркеров (по умолчанию — по числу доступных CPU; uvloop + httptools),
+каждый со своим приложением (app.main:create_app) и своим пулом
+соединений — урезанным до доли воркера в DB_MAX_CONNECTIONS
+(app.db.base). Родитель:
+    - перезапускает упавшие и зависшие воркеры;
+    - перезапускает воркер после SERVER_MAX_REQUESTS запросов (плюс
+    случайные 0..SERVER_MAX_REQUESTS_JITTER): воркер дообслуживает
+    текущие запросы и выходит, остальные тем временем принимают
+    соединения на том же сокете;
+    - по SIGTERM ждёт SERVER_DRAIN_DELAY сек. (воркеры ещё принимают
+    запросы, пока балансировщик исключает под), затем останавливает
+    воркеры: они перестают принимать соединения, дожидаются текущих
+    запросов (не дольше SERVER_GRACEFUL_TIMEOUT) и выполняют остановку
+    lifespan (запись очереди ответов, закрытие пулов); не успевшие
+    воркеры завершаются принудительно;
+    - по SIGINT останавливает воркеры сразу, по SIGHUP — перезапускает
+    их по одному.
+
+Состояние в памяти процесса у каждого воркера своё, и при нескольких
+воркерах это ограничивает корректность, а не только расход памяти:
+    - кэш ответов и ETag'и из него инвалидируются только в воркере,
+    выполнившем запись, поэтому при SERVER_WORKERS > 1 кэш выключен
+    (app.core.cache);
+    - статусы приёма ответов (ANSWER_INGEST_MODE=async,
+    GET /answers/ingest/{id}) знает только принявший воркер — режим
+    async требует одного воркера, иначе сервер не запускается;
+    - очистку удалённых вопросов выполняет только воркер 0
+    (SERVER_WORKER_ID; номер сохраняется при перезапуске воркера);
+    - метрики, статистика пула и кэша, профили запросов
+    (GET /metrics, /internal/*) — данные воркера, ответившего на запрос.
+
+Запуск:
+    python -m app.server [--host 0.0.0.0] [--port 8000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+from multiprocessing.connection import wait
+from typing import Callable, List, Optional
+
+import uvicorn
+from uvicorn.supervisors.multiprocess import Multiprocess, Process
+
+from app.core.config import available_cpus, settings
+
+logger = logging.getLogger("uvicorn.error")
+
+# Сверх SERVER_GRACEFUL_TIMEOUT и записи очереди ответов на остановку
+# lifespan (закрытие пулов), сек.
+_SHUTDOWN_MARGIN = 5.0
+# Сколько ждать ответа воркера на проверку, сек. (как в uvicorn)
+_PING_TIMEOUT = 5.0
+# Пауза между закрытием сокета и остановкой соединений, сек.: только что
+# принятые соединения успевают передать запрос
+_ACCEPT_GRACE = 0.2
+# Переменная окружения с номером воркера (settings.server_worker_id)
+WORKER_ID_ENV = "SERVER_WORKER_ID"
+
+
+class WorkerServer(uvicorn.Server):
+    """
+    Сервер воркера: лимит запросов до перезапуска — свой у каждого.
+
+    Args:
+        config (uvicorn.Config): Конфигурация uvicorn;
+        max_requests_jitter (int): Максимальная случайная прибавка к
+            config.limit_max_requests.
+    """
+
+    def __init__(self, config: uvicorn.Config, max_requests_jitter: int):
+        super().__init__(config)
+        self.max_requests_jitter = max_requests_jitter
+
+    def run(self, sockets: Optional[List[socket.socket]] = None) -> None:
+        # Выполняется в процессе воркера
+        limit = self.config.limit_max_requests
+        if limit is not None and self.max_requests_jitter > 0:
+            self.config.limit_max_requests = limit + random.randint(
+                0, self.max_requests_jitter
+            )
+        super().run(sockets=sockets)
+
+    async def shutdown(
+        self, sockets: Optional[List[socket.socket]] = None
+    ) -> None:
+        # uvicorn закрывает соединения без начатого запроса сразу после
+        # закрытия сокета — в том числе принятые мгновением раньше, чей
+        # запрос ещё не прочитан: клиент получает разрыв соединения
+        for server in self.servers:
+            server.close()
+        await asyncio.sleep(_ACCEPT_GRACE)
+        await super().shutdown(sockets=sockets)
+
+
+def _responds(process: Process) -> bool:
+    """
+    Жив ли воркер и отвечает ли он на проверку.
+
+    В отличие от Process.is_alive не ждёт весь таймаут, если воркер
+    завершается во время проверки (после перезапуска по числу запросов):
+    ожидание прерывается по выходу процесса.
+    """
+    if not process.process.is_alive():
+        return False
+    process.parent_conn.send(b"ping")
+    ready = wait(
+        [process.parent_conn, process.process.sentinel], _PING_TIMEOUT
+    )
+    if process.parent_conn not in ready:
+        return False
+    process.parent_conn.recv()
+    return True
+
+
+class Supervisor(Multiprocess):
+    """
+    Родительский процесс: воркеры, их перезапуск и остановка с
+    ожиданием (см. описание модуля).
+
+    Args:
+        config (uvicorn.Config): Конфигурация uvicorn (config.workers);
+        target (Callable): Точка входа воркера (WorkerServer.run);
+        sockets (List[socket.socket]): Слушающие сокеты;
+        drain_delay (float): Пауза между SIGTERM и остановкой воркеров;
+        stop_timeout (float): Сколько ждать остановки воркеров.
+    """
+
+    def __init__(
+        self,
+        config: uvicorn.Config,
+        target: Callable[[Optional[List[socket.socket]]], None],
+        sockets: List[socket.socket],
+        *,
+        drain_delay: float,
+        stop_timeout: float,
+    ) -> None:
+        super().__init__(config, target, sockets)
+        self.drain_delay = drain_delay
+        self.stop_timeout = stop_timeout
+        self._stop_at: Optional[float] = None
+
+    def spawn(self, idx: int) -> Process:
+        """
+        Запустить воркер с номером idx (в окружении WORKER_ID_ENV).
+
+        Воркеры запускаются через spawn и получают окружение родителя на
+        момент запуска; номер сохраняется за местом в self.processes.
+        """
+        os.environ[WORKER_ID_ENV] = str(idx)
+        process = Process(self.config, self.target, self.sockets)
+        process.start()
+        return process
+
+    def init_processes(self) -> None:
+        for idx in range(self.processes_num):
+            self.processes.append(self.spawn(idx))
+
+    def restart_all(self) -> None:
+        for idx, process in enumerate(self.processes):
+            process.terminate()
+            process.join()
+            self.processes[idx] = self.spawn(idx)
+
+    def handle_ttin(self) -> None:
+        logger.info("Received SIGTTIN, increasing the number of processes.")
+        self.processes_num += 1
+        self.processes.append(self.spawn(len(self.processes)))
+
+    def handle_term(self) -> None:
+        if self._stop_at is None:
+            logger.info(
+                "Received SIGTERM, stopping workers in %.1f s",
+                self.drain_delay,
+            )
+            self._stop_at = time.monotonic() + self.drain_delay
+
+    def keep_subprocess_alive(self) -> None:
+        # Вызывается главным циклом раз в 0,5 с
+        if self._stop_at is not None and time.monotonic() >= self._stop_at:
+            self.should_exit.set()
+            return
+        if self.should_exit.is_set():
+            return
+        for idx, process in enumerate(self.processes):
+            if _responds(process):
+                continue
+            process.kill()  # завис
+            process.join()
+            logger.info("Child process [%s] died", process.pid)
+            self.processes[idx] = self.spawn(idx)
+
+    def terminate_all(self) -> None:
+        # Иначе сокет родителя остаётся открытым и ядро ставит новые
+        # соединения в очередь, которую уже никто не разберёт; клиенты
+        # должны получить отказ и уйти на другой под
+        for sock in self.sockets:
+            sock.close()
+        super().terminate_all()
+
+    def join_all(self) -> None:
+        deadline = time.monotonic() + self.stop_timeout
+        for process in self.processes:
+            process.process.join(max(0.0, deadline - time.monotonic()))
+            if process.process.is_alive():
+                logger.warning(
+                    "Worker [%s] did not stop in %.0f s, killing",
+                    process.pid,
+                    self.stop_timeout,
+                )
+                process.kill()
+                process.join()
+
+
+def resolve_workers() -> int:
+    """
+    Число воркеров: SERVER_WORKERS или число доступных CPU.
+
+    Raises:
+        ValueError: ANSWER_INGEST_MODE=async при нескольких воркерах.
+    """
+    workers = settings.server_workers or available_cpus()
+    if workers > 1 and settings.answer_ingest_mode == "async":
+        raise ValueError(
+            "ANSWER_INGEST_MODE=async needs SERVER_WORKERS=1: ingest "
+            "statuses are kept in the memory of the accepting worker"
+        )
+    return workers
+
+
+def build_config(host: str, port: int, workers: int) -> uvicorn.Config:
+    """Конфигурация uvicorn для воркеров из настроек."""
+    return uvicorn.Config(
+        "app.main:create_app",
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        limit_max_requests=settings.server_max_requests,
+        timeout_graceful_shutdown=round(settings.server_graceful_timeout),
+    )
+
+
+def main() -> None:
+    """Точка входа CLI."""
+    parser = argparse.ArgumentParser(
+        description="Запустить API в нескольких процессах-воркерах."
+    )
+    parser.add_argument("--host", default=settings.app_host)
+    parser.add_argument("--port", type=int, default=settings.app_port)
+    args = parser.parse_args()
+    try:
+        workers = resolve_workers()
+    except ValueError as exc:
+        parser.error(str(exc))
+    # Воркеры читают настройки заново: число воркеров определяет их пул
+    # соединений и кэш ответов
+    os.environ["SERVER_WORKERS"] = str(workers)
+
+    config = build_config(args.host, args.port, workers)
+    server = WorkerServer(config, settings.server_max_requests_jitter)
+    sock = config.bind_socket()
+    logger.info(
+        "Starting %d workers, DB connections per worker: %s",
+        config.workers,
+        (
+            settings.db_max_connections // config.workers
+            if settings.db_max_connections is not None
+            else "DB_POOL_SIZE + DB_MAX_OVERFLOW"
+        ),
+    )
+    Supervisor(
+        config,
+        target=server.run,
+        sockets=[sock],
+        drain_delay=settings.server_drain_delay,
+        stop_timeout=(
+            settings.server_graceful_timeout
+            + settings.answer_ingest_drain_timeout
+            + _SHUTDOWN_MARGIN
+        ),
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Обслуживание месячных секций answers (схема range, app.db.partitions).
+
+Порядок работы:
+    1. Создаются недостающие секции с текущего месяца на --ahead месяцев
+    вперёд, чтобы новые ответы не попадали в секцию DEFAULT.
+    2. Если задан --retain-months, секции старше стольких прошлых месяцев
+    отсоединяются (каждая — отдельной транзакцией с lock_timeout), а
+    счётчики вопросов их ответов пересчитываются. Отсоединённая секция
+    остаётся отдельной таблицей-архивом или удаляется (--drop).
+
+Запускать регулярно (например, раз в сутки из cron). Для схемы hash
+обслуживать нечего — число секций фиксируется при миграции.
+
+Запуск из командной строки:
+    python -m app.tools.answer_partitions --ahead 3 --retain-months 24
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.base import engine
+from app.db.partitions import (
+    RANGE,
+    create_future_partitions,
+    detach_partition,
+    expired_partitions,
+    partition_strategy,
+    range_partitions,
+)
+
+TABLE = "answers"
+
+
+def maintain(
+    *,
+    today: date,
+    ahead: int,
+    retain: Optional[int],
+    drop: bool,
+    lock_timeout: str,
+) -> None:
+    """
+    Создать будущие секции и отсоединить устаревшие.
+
+    Args:
+        today: Текущая дата (UTC).
+        ahead: На сколько месяцев вперёд должны существовать секции.
+        retain: Сколько прошлых месяцев хранить (None — не отсоединять).
+        drop: Удалять отсоединённые секции.
+        lock_timeout: lock_timeout для DDL (например, "5s"): DDL ждёт
+            конца запросов к answers и блокирует новые, пока ждёт.
+    """
+    with engine.connect() as conn:
+        strategy = partition_strategy(conn, TABLE)
+        if strategy != RANGE:
+            print(f"{TABLE}: partitioned by {strategy}, nothing to do")
+            return
+
+        conn.execute(
+            text("SELECT set_config('lock_timeout', :t, false)"),
+            {"t": lock_timeout},
+        )
+        created = create_future_partitions(
+            conn, table=TABLE, today=today, ahead=ahead
+        )
+        conn.commit()
+        for name in created:
+            print(f"created {name}")
+
+        if retain is None:
+            return
+        expired = expired_partitions(
+            range_partitions(conn, TABLE), today=today, retain=retain
+        )
+        conn.commit()
+        for name in expired:
+            touched = detach_partition(
+                conn, table=TABLE, partition=name, drop=drop
+            )
+            conn.commit()
+            action = "dropped" if drop else "detached"
+            print(f"{action} {name}, recounted {touched} questions")
+
+
+def main() -> None:
+    """Точка входа CLI."""
+    parser = argparse.ArgumentParser(
+        description="Создать будущие и отсоединить старые секции answers."
+    )
+    parser.add_argument(
+        "--ahead", type=int, default=settings.answers_partitions_ahead
+    )
+    parser.add_argument(
+        "--retain-months",
+        type=int,
+        default=settings.answers_retention_months,
+        help="Хранить столько прошлых месяцев (по умолчанию — все)",
+    )
+    parser.add_argument(
+        "--drop",
+        action="store_true",
+        help="Удалять отсоединённые секции, а не оставлять архивом",
+    )
+    parser.add_argument("--lock-timeout", default="5s")
+    args = parser.parse_args()
+    maintain(
+        today=datetime.now(timezone.utc).date(),
+        ahead=args.ahead,
+        retain=args.retain_months,
+        drop=args.drop,
+        lock_timeout=args.lock_timeout,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Потоковая выгрузка вопросов и ответов в NDJSON.
+
+Формат — по одному JSON-объекту на строку; сначала все вопросы, затем
+все ответы (порядок по id), что позволяет загружать файл обратно без
+нарушения внешнего ключа:
+
+    {"type": "question", "id": 1, "text": "...", "created_at": "..."}
+    {"type": "answer", "id": 1, "question_id": 1, "user_id": "...",
+     "text": "...", "created_at": "..."}
+
+Удалённые вопросы, ожидающие фоновой очистки, и их ответы не
+выгружаются. Таблицы читаются серверным курсором (AsyncSession.stream +
+yield_per), поэтому память не зависит от объёма данных, и в одном снимке
+(REPEATABLE READ): иначе ответы, записанные за время выгрузки, ссылались
+бы на не выгруженные вопросы, а ответы вопроса, удалённого между
+выборками, попали бы в файл.
+
+Запуск из командной строки:
+    python -m app.tools.export_ndjson -o dump.ndjson.gz
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import json
+import sys
+import zlib
+from typing import Any, AsyncIterator, BinaryIO, Dict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.base import async_engine
+from app.db.dependences import read_session
+from app.models.answer import Answer
+from app.models.question import Question
+
+# Строк на одну выборку серверного курсора и на один отдаваемый чанк
+BATCH_SIZE = 2000
+
+
+def _line(record: Dict[str, Any]) -> bytes:
+    return json.dumps(record, ensure_ascii=False).encode() + b"\n"
+
+
+async def iter_ndjson(
+    db: AsyncSession, *, batch_size: int = BATCH_SIZE
+) -> AsyncIterator[bytes]:
+    """
+    Выгрузить вопросы и ответы чанками NDJSON.
+
+    Args:
+        db: Сессия БД в одном снимке данных (read_session(snapshot=True));
+            должна жить, пока итерируется генератор.
+        batch_size: Строк на одну выборку курсора и на чанк.
+
+    Yields:
+        Чанки NDJSON (по batch_size строк).
+    """
+    questions = await db.stream(
+        select(Question.id, Question.text, Question.created_at)
+        .where(Question.deleted_at.is_(None))
+        .order_by(Question.id)
+        .execution_options(yield_per=batch_size)
+    )
+    async for part in questions.partitions():
+        yield b"".join(
+            _line(
+                {
+                    "type": "question",
+                    "id": row.id,
+                    "text": row.text,
+                    "created_at": row.created_at.isoformat(),
+                }
+            )
+            for row in part
+        )
+
+    # Удалённых вопросов, ожидающих очистки, мало (частичный индекс)
+    deleted = select(Question.id).where(Question.deleted_at.is_not(None))
+    answers = await db.stream(
+        select(
+            Answer.id,
+            Answer.question_id,
+            Answer.user_id,
+            Answer.text,
+            Answer.created_at,
+        )
+        .where(Answer.question_id.not_in(deleted))
+        .order_by(Answer.id)
+        .execution_options(yield_per=batch_size)
+    )
+    async for part in answers.partitions():
+        yield b"".join(
+            _line(
+                {
+                    "type": "answer",
+                    "id": row.id,
+                    "question_id": row.question_id,
+                    "user_id": str(row.user_id),
+                    "text": row.text,
+                    "created_at": row.created_at.isoformat(),
+                }
+            )
+            for row in part
+        )
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Потоково сжать чанки в формат gzip.
+
+    Args:
+        chunks: Исходные чанки.
+
+    Yields:
+        Сжатые чанки (вместе образуют корректный .gz).
+    """
+    compressor = zlib.compressobj(wbits=31)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def export_to(out: BinaryIO, *, batch_size: int = BATCH_SIZE) -> None:
+    """
+    Выгрузить данные в открытый бинарный поток.
+
+    Args:
+        out: Файл или stdout.buffer.
+        batch_size: Строк на одну выборку курсора.
+    """
+    try:
+        async with read_session(prefer_primary=True, snapshot=True) as db:
+            async for chunk in iter_ndjson(db, batch_size=batch_size):
+                out.write(chunk)
+    finally:
+        await async_engine.dispose()
+
+
+def main() -> None:
+    """Точка входа CLI."""
+    parser = argparse.ArgumentParser(
+        description="Выгрузить вопросы и ответы в NDJSON."
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help="Файл результата ('-' — stdout); *.gz сжимается gzip",
+    )
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    if args.output == "-":
+        asyncio.run(export_to(sys.stdout.buffer, batch_size=args.batch_size))
+        return
+    opener = gzip.open if args.output.endswith(".gz") else open
+    with opener(args.output, "wb") as out:
+        asyncio.run(export_to(out, batch_size=args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Загрузка NDJSON-выгрузки (см. app.tools.export_ndjson) через COPY.
+
+Порядок работы:
+    1. Создаются временные staging-таблицы (удаляются при коммите).
+    2. Файл читается построчно дважды — вопросы, затем ответы — и
+    передаётся в PostgreSQL командой COPY FROM STDIN (app.db.bulk);
+    строки не накапливаются в памяти Python.
+    3. Данные переносятся в рабочие таблицы одним INSERT ... SELECT:
+    записи с уже существующими id пропускаются, ответы на отсутствующие
+    вопросы отбрасываются (их число — в итогах загрузки, CLI
+    предупреждает о них). Уникальность id ответов проверяется через
+    NOT EXISTS: первичный ключ секционированной answers составной, и
+    ON CONFLICT (id) для неё невозможен.
+    4. У вопросов, получивших ответы, пересчитываются answers_count и
+    last_answer_at.
+    5. Последовательности id сдвигаются за максимальный загруженный id.
+
+Всё выполняется в одной транзакции.
+
+Запуск из командной строки:
+    python -m app.tools.import_ndjson dump.ndjson.gz
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import sys
+from dataclasses import dataclass
+from typing import IO, Callable, Iterator, List, Sequence
+
+from sqlalchemy import Connection, text
+
+from app.db.base import engine
+from app.db.bulk import copy_from, copy_line, sync_id_sequence
+
+QUESTION_COLUMNS = ("id", "text", "created_at")
+ANSWER_COLUMNS = ("id", "question_id", "user_id", "text", "created_at")
+
+# Повторная загрузка в той же транзакции начинает с пустых таблиц
+_STAGE_DDL = """
+DROP TABLE IF EXISTS pg_temp.stage_questions, pg_temp.stage_answers;
+CREATE TEMP TABLE stage_questions (
+    id bigint, text text, created_at timestamptz
+) ON COMMIT DROP;
+CREATE TEMP TABLE stage_answers (
+    id bigint, question_id bigint, user_id uuid, text text,
+    created_at timestamptz
+) ON COMMIT DROP;
+"""
+
+_MERGE_QUESTIONS = """
+INSERT INTO questions (id, text, created_at)
+SELECT id, text, created_at FROM stage_questions
+ON CONFLICT (id) DO NOTHING
+"""
+
+_MERGE_ANSWERS = """
+INSERT INTO answers (id, question_id, user_id, text, created_at)
+SELECT s.id, s.question_id, s.user_id, s.text, s.created_at
+FROM stage_answers AS s
+JOIN questions AS q ON q.id = s.question_id
+WHERE NOT EXISTS (SELECT 1 FROM answers AS a WHERE a.id = s.id)
+ON CONFLICT DO NOTHING
+"""
+
+_COUNT_ORPHAN_ANSWERS = """
+SELECT count(*) FROM stage_answers AS s
+WHERE NOT EXISTS (SELECT 1 FROM questions AS q WHERE q.id = s.question_id)
+"""
+
+# Денормализованные счётчики вопросов, получивших новые ответы
+_RECOUNT_QUESTIONS = """
+UPDATE questions AS q
+SET answers_count = s.cnt, last_answer_at = s.last_at,
+    version = q.version + 1
+FROM (
+    SELECT a.question_id, count(*) AS cnt, max(a.created_at) AS last_at
+    FROM answers AS a
+    WHERE a.question_id IN (SELECT question_id FROM stage_answers)
+    GROUP BY a.question_id
+) AS s
+WHERE q.id = s.question_id
+"""
+
+
+@dataclass
+class ImportStats:
+    """
+    Итоги загрузки.
+
+    Args:
+        questions_read (int): Вопросов в файле;
+        answers_read (int): Ответов в файле;
+        questions_inserted (int): Вставлено вопросов;
+        answers_inserted (int): Вставлено ответов;
+        answers_orphaned (int): Пропущено ответов на вопросы, которых
+            нет ни в файле, ни в базе.
+    """
+
+    questions_read: int = 0
+    answers_read: int = 0
+    questions_inserted: int = 0
+    answers_inserted: int = 0
+    answers_orphaned: int = 0
+
+
+def _copy_lines(
+    open_source: Callable[[], IO[str]],
+    record_type: str,
+    columns: Sequence[str],
+    counter: List[int],
+) -> Iterator[str]:
+    """Строки COPY для записей одного типа из NDJSON."""
+    with open_source() as source:
+        for raw in source:
+            if not raw.strip():
+                continue
+            record = json.loads(raw)
+            if record.get("type") != record_type:
+                continue
+            counter[0] += 1
+            yield copy_line(record.get(c) for c in columns)
+
+
+def load_ndjson(
+    conn: Connection, open_source: Callable[[], IO[str]]
+) -> ImportStats:
+    """
+    Загрузить NDJSON в рабочие таблицы в текущей транзакции conn.
+
+    Args:
+        conn: Соединение SQLAlchemy (драйвер psycopg2) с открытой
+            транзакцией; коммит — на вызывающей стороне.
+        open_source: Открывает источник заново на каждый проход
+            (текстовый режим).
+
+    Returns:
+        ImportStats.
+    """
+    stats = ImportStats()
+    conn.exec_driver_sql(_STAGE_DDL)
+
+    counter = [0]
+    copy_from(
+        conn,
+        "stage_questions",
+        QUESTION_COLUMNS,
+        _copy_lines(open_source, "question", QUESTION_COLUMNS, counter),
+    )
+    stats.questions_read = counter[0]
+
+    counter = [0]
+    copy_from(
+        conn,
+        "stage_answers",
+        ANSWER_COLUMNS,
+        _copy_lines(open_source, "answer", ANSWER_COLUMNS, counter),
+    )
+    stats.answers_read = counter[0]
+
+    stats.questions_inserted = conn.execute(text(_MERGE_QUESTIONS)).rowcount
+    stats.answers_orphaned = conn.execute(
+        text(_COUNT_ORPHAN_ANSWERS)
+    ).scalar_one()
+    stats.answers_inserted = conn.execute(text(_MERGE_ANSWERS)).rowcount
+    if stats.answers_inserted:
+        conn.execute(text(_RECOUNT_QUESTIONS))
+    for table in ("questions", "answers"):
+        sync_id_sequence(conn, table)
+    return stats
+
+
+def main() -> None:
+    """Точка входа CLI."""
+    parser = argparse.ArgumentParser(
+        description="Загрузить NDJSON-выгрузку вопросов и ответов."
+    )
+    parser.add_argument("path", help="Файл NDJSON (*.gz — сжатый gzip)")
+    args = parser.parse_args()
+
+    def open_source() -> IO[str]:
+        if args.path.endswith(".gz"):
+            return gzip.open(args.path, "rt", encoding="utf-8")
+        return open(args.path, "r", encoding="utf-8")
+
+    with engine.begin() as conn:
+        stats = load_ndjson(conn, open_source)
+    print(
+        f"questions: read {stats.questions_read}, "
+        f"inserted {stats.questions_inserted}; "
+        f"answers: read {stats.answers_read}, "
+        f"inserted {stats.answers_inserted}"
+    )
+    if stats.answers_orphaned:
+        print(
+            f"warning: skipped {stats.answers_orphaned} answers whose "
+            "question is missing",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+Бенчмарки производительности (запускаются вручную, в pytest не входят).
+"""
@@ -0,0 +1,231 @@
+"""
+Бенчмарк стоимости индексов при записи (write amplification).
+
+Таблицы questions и answers из моделей создаются в отдельной схеме БД
+дважды:
+    - before — с избыточными индексами, удалёнными миграцией a8e4c2f19d56
+    (ix_questions_id и ix_answers_id повторяют первичные ключи,
+    ix_answers_question_id — префикс ix_answers_question_created);
+    - after — с индексами из моделей.
+В обе вставляются одинаковые данные: вопросы, затем ответы пачками
+многострочным INSERT ... RETURNING (как create_answers_bulk), транзакция
+на пачку. Печатаются скорость вставки ответов и размеры индексов.
+
+Рабочие таблицы не затрагиваются: всё создаётся в схеме bench_indexes,
+которая удаляется в конце.
+
+Запуск (нужна БД из DATABASE_URL):
+    python -m benchmarks.indexes --questions 10000 --answers 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.db.base import async_engine
+from app.db.partitions import add_months, initial_partitions_ddl, month_start
+from app.models.answer import Answer
+from app.models.question import Question
+
+SCHEMA = "bench_indexes"
+
+USER_IDS = [f"00000000-0000-0000-0000-{i:012d}" for i in range(1, 1001)]
+
+# Индексы, удалённые миграцией a8e4c2f19d56: (таблица, имя, колонка)
+REDUNDANT = (
+    ("questions", "ix_questions_id", "id"),
+    ("answers", "ix_answers_id", "id"),
+    ("answers", "ix_answers_question_id", "question_id"),
+)
+
+# Размер индекса секционированной таблицы — сумма по секциям
+_INDEX_SIZES = sa.text("""
+    SELECT i.tablename, i.indexname,
+           COALESCE(
+               (SELECT sum(pg_relation_size(t.relid))
+                FROM pg_partition_tree(x.oid) AS t WHERE t.isleaf),
+               pg_relation_size(x.oid)
+           ) AS bytes
+    FROM pg_indexes AS i
+    CROSS JOIN LATERAL (
+        SELECT format('%I.%I', i.schemaname, i.indexname)::regclass AS oid
+    ) AS x
+    JOIN pg_class AS c
+      ON c.relname = i.tablename
+     AND c.relnamespace = i.schemaname::regnamespace
+    WHERE i.schemaname = :schema AND NOT c.relispartition
+    ORDER BY i.tablename, i.indexname
+    """)
+
+
+async def _create_tables(
+    conn: AsyncConnection, redundant: bool
+) -> Dict[str, sa.Table]:
+    """Таблицы моделей в схеме SCHEMA (+ избыточные индексы)."""
+    metadata = sa.MetaData()
+    tables = {
+        "questions": Question.__table__.to_metadata(metadata, schema=SCHEMA),
+        "answers": Answer.__table__.to_metadata(metadata, schema=SCHEMA),
+    }
+    has_trgm = await conn.scalar(
+        sa.text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+    )
+    if not has_trgm:
+        questions = tables["questions"]
+        questions.indexes -= {
+            i for i in questions.indexes if i.name == "ix_questions_text_trgm"
+        }
+    if redundant:
+        for table, name, column in REDUNDANT:
+            sa.Index(name, tables[table].c[column])
+
+    await conn.execute(sa.text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await conn.execute(sa.text(f"CREATE SCHEMA {SCHEMA}"))
+    await conn.run_sync(metadata.create_all)
+    # Секции answers — как при create_all рабочей схемы (IF NOT EXISTS)
+    this_month = month_start(datetime.now(timezone.utc).date())
+    for ddl in initial_partitions_ddl(
+        settings.answers_partition_by,
+        table=f"{SCHEMA}.answers",
+        hash_partitions=settings.answers_hash_partitions,
+        first_month=this_month,
+        last_month=add_months(this_month, 1),
+    ):
+        await conn.execute(sa.text(ddl))
+    await conn.commit()
+    return tables
+
+
+async def _insert(
+    conn: AsyncConnection,
+    tables: Dict[str, sa.Table],
+    *,
+    questions: int,
+    answers: int,
+    batch_size: int,
+    seed: int,
+) -> Tuple[float, float]:
+    """Вставить данные; время вставки вопросов и ответов, сек."""
+    questions_table, answers_table = tables["questions"], tables["answers"]
+    started = time.perf_counter()
+    result = await conn.execute(
+        sa.insert(questions_table).returning(
+            questions_table.c.id, sort_by_parameter_order=True
+        ),
+        [{"text": f"Question {i}"} for i in range(questions)],
+    )
+    question_ids = list(result.scalars())
+    await conn.commit()
+    questions_elapsed = time.perf_counter() - started
+
+    rnd = random.Random(seed)
+    stmt = sa.insert(answers_table).returning(
+        answers_table.c.id, sort_by_parameter_order=True
+    )
+    elapsed = 0.0
+    for done in range(0, answers, batch_size):
+        rows = [
+            {
+                "question_id": rnd.choice(question_ids),
+                "user_id": rnd.choice(USER_IDS),
+                "text": f"Answer {done + i}",
+            }
+            for i in range(min(batch_size, answers - done))
+        ]
+        started = time.perf_counter()
+        await conn.execute(stmt, rows)
+        await conn.commit()
+        elapsed += time.perf_counter() - started
+    return questions_elapsed, elapsed
+
+
+async def _index_sizes(conn: AsyncConnection) -> List[sa.Row]:
+    return list((await conn.execute(_INDEX_SIZES, {"schema": SCHEMA})).all())
+
+
+async def run_benchmark(
+    questions: int, answers: int, batch_size: int, seed: int
+) -> None:
+    """
+    Замерить вставку с избыточными индексами и без них.
+
+    Args:
+        questions: Сколько вопросов вставить.
+        answers: Сколько ответов вставить (случайно по вопросам).
+        batch_size: Ответов в одном INSERT (и транзакции).
+        seed: Зерно генератора — одинаковые данные в обоих вариантах.
+    """
+    print(
+        f"questions={questions} answers={answers} batch={batch_size} "
+        f"partition_by={settings.answers_partition_by}"
+    )
+    print(
+        f"{'variant':<8}{'questions/s':>12}{'answers/s':>12}"
+        f"{'answers idx, MB':>16}"
+    )
+    sizes: Dict[str, Dict[str, int]] = {}
+    try:
+        for variant, redundant in (("before", True), ("after", False)):
+            async with async_engine.connect() as conn:
+                tables = await _create_tables(conn, redundant)
+                questions_elapsed, elapsed = await _insert(
+                    conn,
+                    tables,
+                    questions=questions,
+                    answers=answers,
+                    batch_size=batch_size,
+                    seed=seed,
+                )
+                rows = await _index_sizes(conn)
+            sizes[variant] = {
+                f"{row.tablename}.{row.indexname}": row.bytes for row in rows
+            }
+            total = sum(
+                size
+                for name, size in sizes[variant].items()
+                if name.startswith("answers.")
+            )
+            print(
+                f"{variant:<8}{questions / questions_elapsed:>12.0f}"
+                f"{answers / elapsed:>12.0f}{total / 2**20:>16.1f}"
+            )
+    finally:
+        async with async_engine.begin() as conn:
+            await conn.execute(
+                sa.text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+            )
+        await async_engine.dispose()
+
+    print(f"{'index':<40}{'before, MB':>12}{'after, MB':>12}")
+    for name, size in sizes["before"].items():
+        after = sizes["after"].get(name)
+        after_mb = f"{after / 2**20:.1f}" if after is not None else "-"
+        print(f"{name:<40}{size / 2**20:>12.1f}{after_mb:>12}")
+
+
+def main() -> None:
+    """Точка входа CLI."""
+    parser = argparse.ArgumentParser(
+        description="Сравнить вставку с избыточными индексами и без них."
+    )
+    parser.add_argument("--questions", type=int, default=10_000)
+    parser.add_argument("--answers", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(
+        run_benchmark(args.questions, args.answers, args.batch_size, args.seed)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Бенчмарк записи ответов: отдельная транзакция на ответ против очереди
+с групповым коммитом (app.db.ingest, режим sync).
+
+Конкурентные «клиенты» пишут ответы вразброс на несколько вопросов:
+    - direct — как POST без очереди: create_answer и commit на ответ;
+    - group — submit в AnswerIngestQueue и ожидание коммита группы.
+Печатается пропускная способность (ответов/с) и p50/p99 задержки.
+Вопросы с ответами удаляются в конце.
+
+Запуск (нужна БД из DATABASE_URL со схемой из миграций):
+    python -m benchmarks.ingest --clients 64 --answers 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+from app.crud import answer as a_crud
+from app.crud import question as q_crud
+from app.db.base import AsyncSessionLocal, async_engine
+from app.db.ingest import AnswerIngestQueue
+from app.db.purge import QuestionPurger
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+
+
+async def _drive(
+    write: Callable[[int], Awaitable[None]], clients: int, answers: int
+) -> List[float]:
+    """Выполнить answers записей силами clients корутин; задержки, мс."""
+    latencies: List[float] = []
+    counter = iter(range(answers))
+
+    async def client() -> None:
+        for i in counter:
+            started = time.perf_counter()
+            await write(i)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return latencies
+
+
+def _report(name: str, latencies: List[float], elapsed: float) -> None:
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))]
+    print(
+        f"{name:<8}{len(latencies) / elapsed:>12.0f}"
+        f"{statistics.median(ordered):>10.1f}{p99:>10.1f}"
+    )
+
+
+async def run_benchmark(
+    clients: int,
+    answers: int,
+    questions: int,
+    batch_size: int,
+    max_delay: float,
+) -> None:
+    """
+    Замерить оба способа записи и напечатать таблицу.
+
+    Args:
+        clients: Число конкурентных писателей.
+        answers: Ответов на каждый способ.
+        questions: На сколько вопросов распределяются ответы.
+        batch_size: Максимум ответов в группе.
+        max_delay: Окно добора группы, сек.
+    """
+    async with AsyncSessionLocal() as db:
+        rows = await q_crud.create_questions_bulk(
+            db, texts=[f"Ingest benchmark {i}" for i in range(questions)]
+        )
+        await db.commit()
+    question_ids = [row.id for row in rows]
+
+    async def direct(i: int) -> None:
+        async with AsyncSessionLocal() as db:
+            await a_crud.create_answer(
+                db,
+                question_id=question_ids[i % questions],
+                user_id=USER_ID,
+                text=f"A{i}",
+            )
+            await db.commit()
+
+    queue = AnswerIngestQueue(
+        AsyncSessionLocal,
+        max_size=answers,
+        batch_size=batch_size,
+        max_delay=max_delay,
+    )
+
+    async def group(i: int) -> None:
+        ticket = queue.submit(
+            question_id=question_ids[i % questions],
+            user_id=USER_ID,
+            text=f"A{i}",
+        )
+        await ticket.wait()
+
+    try:
+        print(f"clients={clients} answers={answers} questions={questions}")
+        print(f"{'mode':<8}{'answers/s':>12}{'p50, ms':>10}{'p99, ms':>10}")
+        started = time.perf_counter()
+        latencies = await _drive(direct, clients, answers)
+        _report("direct", latencies, time.perf_counter() - started)
+
+        queue.start()
+        started = time.perf_counter()
+        latencies = await _drive(group, clients, answers)
+        _report("group", latencies, time.perf_counter() - started)
+        await queue.stop(timeout=30)
+        print(f"groups={queue.groups}")
+    finally:
+        async with AsyncSessionLocal() as db:
+            for question_id in question_ids:
+                await q_crud.delete_question(db, question_id)
+            await db.commit()
+        purger = QuestionPurger(AsyncSessionLocal, batch_size=10_000)
+        for question_id in question_ids:
+            await purger.purge_question(question_id)
+        await async_engine.dispose()
+
+
+def main() -> None:
+    """Точка входа CLI."""
+    parser = argparse.ArgumentParser(
+        description="Сравнить запись ответов по одному и группами."
+    )
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--answers", type=int, default=5000)
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--max-delay", type=float, default=0.01)
+    args = parser.parse_args()
+    asyncio.run(
+        run_benchmark(
+            args.clients,
+            args.answers,
+            args.questions,
+            args.batch_size,
+            args.max_delay,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+"""
+Нагрузочное тестирование API на больших объёмах данных.
+
+    - dataset — генератор набора вопросов и ответов через COPY;
+    - driver — нагрузка на запущенное приложение и JSON с результатами;
+    - compare — сравнение двух JSON с результатами, код 1 при регрессии.
+"""
@@ -0,0 +1,66 @@
+"""
+Сравнение результатов нагрузочного теста с базовым прогоном.
+
+Регрессия — рост p50/p95/p99 больше --latency-tolerance (и больше
+--min-latency-delta мс), падение пропускной способности больше
+--throughput-tolerance или рост доли ошибок больше
+--error-rate-tolerance — по любой общей конечной точке или в целом.
+При регрессии код возврата 1 (для CI).
+
+Запуск:
+    python -m benchmarks.load.compare baseline.json current.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+from benchmarks.load import results
+
+
+def main() -> None:
+    """Точка входа CLI."""
+    parser = argparse.ArgumentParser(
+        description="Сравнить результаты нагрузочного теста с базовыми."
+    )
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--latency-tolerance", type=float, default=0.10)
+    parser.add_argument("--throughput-tolerance", type=float, default=0.10)
+    parser.add_argument("--min-latency-delta", type=float, default=1.0)
+    parser.add_argument("--error-rate-tolerance", type=float, default=0.001)
+    args = parser.parse_args()
+
+    checks = results.compare(
+        results.load(args.baseline),
+        results.load(args.current),
+        latency_tolerance=args.latency_tolerance,
+        throughput_tolerance=args.throughput_tolerance,
+        min_latency_delta=args.min_latency_delta,
+        error_rate_tolerance=args.error_rate_tolerance,
+    )
+    print(
+        f"{'endpoint':<16}{'metric':<12}{'baseline':>12}{'current':>12}"
+        f"{'change':>10}"
+    )
+    for check in checks:
+        change = (
+            f"{check.current / check.baseline - 1:+.1%}"
+            if check.baseline
+            else "-"
+        )
+        mark = "  REGRESSION" if check.regression else ""
+        print(
+            f"{check.endpoint:<16}{check.metric:<12}{check.baseline:>12.4g}"
+            f"{check.current:>12.4g}{change:>10}{mark}"
+        )
+    regressions = sum(check.regression for check in checks)
+    if regressions:
+        print(f"{regressions} regression(s)")
+        sys.exit(1)
+    print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+Генератор набора данных для нагрузочного тестирования (COPY).
+
+Порядок работы:
+    1. Вопросы получают id после текущего максимального и даты создания,
+    равномерно распределённые по последним --days дням.
+    2. Ответы распределяются по вопросам с перекосом --skew: вопрос
+    ранга r (ранги перемешаны по id) получает долю, пропорциональную
+    1 / r ** skew. skew = 0 — поровну, 1 — закон Ципфа (горстка вопросов
+    собирает большую часть ответов). Даты ответов — равномерно между
+    созданием вопроса и текущим моментом.
+    3. Вопросы загружаются одной командой COPY сразу с answers_count и
+    last_answer_at, ответы — командами COPY по --chunk строк (транзакция
+    на команду) с явными id; затем сдвигаются последовательности id.
+    4. VACUUM ANALYZE — статистика и карта видимости, как после
+    autovacuum на рабочей базе.
+    5. Описание набора (диапазоны id, skew, seed) пишется в --manifest:
+    его читает benchmarks.load.driver, чтобы запросы к вопросам имели тот
+    же перекос, и --cleanup, чтобы удалить набор.
+
+Индексы и внешний ключ не отключаются: набор грузится в работающую
+схему, в том числе секционированную (app.db.partitions). Запускать на
+базе без параллельной записи: id берутся после максимальных.
+
+Запуск (нужна БД из DATABASE_URL со схемой из миграций):
+    python -m benchmarks.load.dataset --questions 1000000 \\
+        --answers 50000000 --skew 1.1
+    python -m benchmarks.load.dataset --cleanup
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Tuple
+
+from sqlalchemy import Connection, text
+
+from app.db.base import engine
+from app.db.bulk import copy_escape, copy_from, sync_id_sequence
+
+QUESTION_COLUMNS = (
+    "id",
+    "text",
+    "created_at",
+    "answers_count",
+    "last_answer_at",
+)
+ANSWER_COLUMNS = ("id", "question_id", "user_id", "text", "created_at")
+
+# Тексты собираются из словаря w1..wN с log-равномерным выбором слова
+# (близко к закону Ципфа, как в benchmarks.search)
+VOCABULARY = 50_000
+TEXT_POOL = 4096
+
+# Вопросов на транзакцию при удалении набора
+CLEANUP_BATCH = 10_000
+
+
+def popularity(questions: int, skew: float, seed: int) -> List[float]:
+    """
+    Веса вопросов набора (по смещению id от первого).
+
+    Args:
+        questions: Число вопросов.
+        skew: Показатель перекоса: вес вопроса ранга r — 1 / r ** skew.
+        seed: Зерно перестановки рангов по id.
+
+    Returns:
+        Список весов; используется и для раскладки ответов, и для выбора
+        вопросов драйвером нагрузки.
+    """
+    ranks = list(range(1, questions + 1))
+    random.Random(seed).shuffle(ranks)
+    return [rank**-skew for rank in ranks]
+
+
+def allocate(total: int, weights: List[float]) -> List[int]:
+    """
+    Разложить total ответов пропорционально весам (сумма точно total).
+    """
+    weight_sum = sum(weights)
+    counts = [int(total * w / weight_sum) for w in weights]
+    remainder = total - sum(counts)
+    heaviest = sorted(range(len(weights)), key=weights.__getitem__)
+    for i in heaviest[len(heaviest) - remainder :]:
+        counts[i] += 1
+    return counts
+
+
+def _text_pool(rnd: random.Random, prefix: str, words: int) -> List[str]:
+    """Экранированные для COPY синтетические тексты."""
+    pool = []
+    for _ in range(TEXT_POOL):
+        body = " ".join(
+            f"w{int(VOCABULARY ** rnd.random())}"
+            for _ in range(rnd.randint(words // 2, words))
+        )
+        pool.append(copy_escape(f"{prefix} {body}"))
+    return pool
+
+
+def _user_ids(users: int) -> List[str]:
+    return [f"00000000-0000-4000-8000-{i:012d}" for i in range(1, users + 1)]
+
+
+def _question_times(
+    questions: int, now: datetime, days: int
+) -> List[datetime]:
+    """Даты создания вопросов по возрастанию id."""
+    span = timedelta(days=days)
+    step = span / max(questions, 1)
+    return [now - span + step * i for i in range(questions)]
+
+
+def _question_lines(
+    first_id: int,
+    created: List[datetime],
+    counts: List[int],
+    now: datetime,
+    rnd: random.Random,
+) -> Iterator[str]:
+    pool = _text_pool(rnd, "Вопрос", 12)
+    for offset, (created_at, count) in enumerate(zip(created, counts)):
+        # Последний ответ — ровно там, где его поставит _answer_lines
+        last_answer_at = (
+            (created_at + (now - created_at) / (count + 1) * count).isoformat()
+            if count
+            else r"\N"
+        )
+        yield (
+            f"{first_id + offset}\t{pool[offset % TEXT_POOL]}\t"
+            f"{created_at.isoformat()}\t{count}\t{last_answer_at}\n"
+        )
+
+
+def _answer_lines(
+    first_id: int,
+    first_question_id: int,
+    created: List[datetime],
+    counts: List[int],
+    now: datetime,
+    users: int,
+    rnd: random.Random,
+) -> Iterator[str]:
+    pool = _text_pool(rnd, "Ответ", 30)
+    user_ids = _user_ids(users)
+    answer_id = first_id
+    for offset, (created_at, count) in enumerate(zip(created, counts)):
+        question_id = first_question_id + offset
+        step = (now - created_at) / (count + 1)
+        for j in range(1, count + 1):
+            yield (
+                f"{answer_id}\t{question_id}\t"
+                f"{user_ids[rnd.randrange(users)]}\t"
+                f"{pool[rnd.randrange(TEXT_POOL)]}\t"
+                f"{(created_at + step * j).isoformat()}\n"
+            )
+            answer_id += 1
+
+
+def _next_id(conn: Connection, table: str) -> int:
+    return (
+        conn.execute(
+            text(f"SELECT COALESCE(max(id), 0) FROM {table}")
+        ).scalar_one()
+        + 1
+    )
+
+
+def _vacuum_analyze() -> None:
+    with engine.connect().execution_options(
+        isolation_level="AUTOCOMMIT"
+    ) as conn:
+        conn.execute(text("VACUUM ANALYZE questions"))
+        conn.execute(text("VACUUM ANALYZE answers"))
+
+
+def generate(
+    *,
+    questions: int,
+    answers: int,
+    skew: float,
+    users: int,
+    days: int,
+    chunk: int,
+    seed: int,
+) -> Dict[str, Any]:
+    """
+    Загрузить набор данных в рабочие таблицы.
+
+    Args:
+        questions: Число вопросов.
+        answers: Число ответов (всего).
+        skew: Перекос ответов по вопросам (см. popularity).
+        users: Число различных user_id.
+        days: Глубина дат создания вопросов, дней.
+        chunk: Ответов в одной команде COPY (и транзакции).
+        seed: Зерно генератора.
+
+    Returns:
+        Манифест набора (см. описание модуля).
+    """
+    rnd = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    counts = allocate(answers, popularity(questions, skew, seed))
+    created = _question_times(questions, now, days)
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        first_question_id = _next_id(conn, "questions")
+        first_answer_id = _next_id(conn, "answers")
+        copy_from(
+            conn,
+            "questions",
+            QUESTION_COLUMNS,
+            _question_lines(first_question_id, created, counts, now, rnd),
+        )
+        sync_id_sequence(conn, "questions")
+    print(f"questions: {questions} in {time.perf_counter() - started:.1f}s")
+
+    lines = _answer_lines(
+        first_answer_id, first_question_id, created, counts, now, users, rnd
+    )
+    started = time.perf_counter()
+    loaded = 0
+    while loaded < answers:
+        with engine.begin() as conn:
+            copy_from(conn, "answers", ANSWER_COLUMNS, islice(lines, chunk))
+        loaded = min(answers, loaded + chunk)
+        elapsed = time.perf_counter() - started
+        print(
+            f"answers: {loaded}/{answers}, {loaded / elapsed:.0f} rows/s",
+            flush=True,
+        )
+    with engine.begin() as conn:
+        sync_id_sequence(conn, "answers")
+
+    started = time.perf_counter()
+    _vacuum_analyze()
+    print(f"vacuum analyze: {time.perf_counter() - started:.1f}s")
+
+    top = sorted(counts, reverse=True)
+    return {
+        "format": 1,
+        "created_at": now.isoformat(),
+        "seed": seed,
+        "skew": skew,
+        "questions": {
+            "first_id": first_question_id,
+            "count": questions,
+        },
+        "answers": {
+            "first_id": first_answer_id,
+            "count": answers,
+            "max_per_question": top[0] if top else 0,
+            "top_1pct_share": (
+                sum(top[: math.ceil(len(top) / 100)]) / answers
+                if answers
+                else 0.0
+            ),
+        },
+    }
+
+
+def question_id_range(manifest: Dict[str, Any]) -> Tuple[int, int]:
+    """Первый и последний id вопросов набора."""
+    first = manifest["questions"]["first_id"]
+    return first, first + manifest["questions"]["count"] - 1
+
+
+def cleanup(manifest: Dict[str, Any]) -> None:
+    """
+    Удалить набор: ответы, затем вопросы, по CLEANUP_BATCH вопросов на
+    транзакцию (ответы удаляются явно — каскад по внешнему ключу
+    построчный и медленнее).
+    """
+    first, last = question_id_range(manifest)
+    for low in range(first, last + 1, CLEANUP_BATCH):
+        bounds = {"lo": low, "hi": min(last, low + CLEANUP_BATCH - 1)}
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "DELETE FROM answers "
+                    "WHERE question_id BETWEEN :lo AND :hi"
+                ),
+                bounds,
+            )
+            conn.execute(
+                text("DELETE FROM questions WHERE id BETWEEN :lo AND :hi"),
+                bounds,
+            )
+        print(f"deleted questions {bounds['lo']}..{bounds['hi']}", flush=True)
+
+
+def main() -> None:
+    """Точка входа CLI."""
+    parser = argparse.ArgumentParser(
+        description="Сгенерировать набор данных для нагрузочного теста."
+    )
+    parser.add_argument("--questions", type=int, default=100_000)
+    parser.add_argument("--answers", type=int, default=1_000_000)
+    parser.add_argument(
+        "--skew",
+        type=float,
+        default=1.0,
+        help="Перекос ответов по вопросам: 0 — поровну, 1 — Ципф",
+    )
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--chunk", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--manifest", default="load_dataset.json")
+    parser.add_argument(
+        "--cleanup",
+        action="store_true",
+        help="Удалить набор, описанный в --manifest",
+    )
+    args = parser.parse_args()
+
+    if args.cleanup:
+        with open(args.manifest, encoding="utf-8") as f:
+            cleanup(json.load(f))
+        return
+    manifest = generate(
+        questions=args.questions,
+        answers=args.answers,
+        skew=args.skew,
+        users=args.users,
+        days=args.days,
+        chunk=args.chunk,
+        seed=args.seed,
+    )
+    with open(args.manifest, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    print(
+        f"manifest: {args.manifest}; max answers per question "
+        f"{manifest['answers']['max_per_question']}, top 1% of questions "
+        f"hold {manifest['answers']['top_1pct_share']:.0%} of answers"
+    )
+
+
+if __name__ == "__main__":
+    main()
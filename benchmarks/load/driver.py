@@ -0,0 +1,283 @@
+"""
+Нагрузка на запущенное приложение по HTTP (httpx).
+
+Порядок работы:
+    1. Вопросы для запросов выбираются с тем же перекосом, что и ответы
+    набора (веса benchmarks.load.dataset.popularity по --dataset):
+    популярные вопросы и читают чаще.
+    2. --concurrency клиентов работают по замкнутому циклу (следующий
+    запрос — после ответа на предыдущий) и выбирают конечную точку по
+    весам --mix:
+        - question — GET /questions/{id} (первая страница ответов);
+        - list — GET /questions/ (первая страница);
+        - answers — GET /questions/{id}/answers;
+        - create_answer — POST /questions/{id}/answers/.
+    3. Первые --warmup секунд не учитываются (пул соединений, кэши),
+    затем --duration секунд замеряются задержки и ошибки (статус >= 400,
+    сетевые ошибки и таймауты).
+    4. Печатается таблица по конечным точкам, результаты пишутся в
+    --output (формат — benchmarks.load.results); сравнение прогонов —
+    benchmarks.load.compare.
+
+Запуск (приложение уже запущено, набор создан benchmarks.load.dataset):
+    python -m benchmarks.load.driver --base-url http://127.0.0.1:8000 \\
+        --concurrency 64 --duration 60 --output current.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timezone
+from itertools import accumulate
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+from benchmarks.load import results
+from benchmarks.load.dataset import popularity
+
+DEFAULT_MIX = "question=50,list=10,answers=30,create_answer=10"
+
+PAGE_SIZE = 20
+
+USER_IDS = [f"00000000-0000-4000-8000-{i:012d}" for i in range(1, 1001)]
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """Веса конечных точек из строки вида "question=50,list=10"."""
+    mix: Dict[str, int] = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint {name!r}")
+        mix[name.strip()] = int(weight)
+    return mix
+
+
+class QuestionSampler:
+    """Выбор id вопросов набора с его перекосом."""
+
+    def __init__(self, manifest: Dict[str, Any]) -> None:
+        self._first_id = manifest["questions"]["first_id"]
+        weights = popularity(
+            manifest["questions"]["count"],
+            manifest["skew"],
+            manifest["seed"],
+        )
+        self._cum_weights = list(accumulate(weights))
+        self._offsets = range(len(weights))
+
+    def __call__(self, rnd: random.Random) -> int:
+        offset = rnd.choices(self._offsets, cum_weights=self._cum_weights)[0]
+        return self._first_id + offset
+
+
+def _question(rnd: random.Random, question_id: int) -> Tuple[str, str, Any]:
+    return (
+        "GET",
+        f"/questions/{question_id}",
+        {"params": {"answers_limit": PAGE_SIZE}},
+    )
+
+
+def _list(rnd: random.Random, question_id: int) -> Tuple[str, str, Any]:
+    return "GET", "/questions/", {"params": {"limit": PAGE_SIZE}}
+
+
+def _answers(rnd: random.Random, question_id: int) -> Tuple[str, str, Any]:
+    return (
+        "GET",
+        f"/questions/{question_id}/answers",
+        {"params": {"limit": PAGE_SIZE}},
+    )
+
+
+def _create_answer(
+    rnd: random.Random, question_id: int
+) -> Tuple[str, str, Any]:
+    return (
+        "POST",
+        f"/questions/{question_id}/answers/",
+        {
+            "json": {
+                "user_id": rnd.choice(USER_IDS),
+                "text": f"Load test answer {rnd.getrandbits(32)}",
+            }
+        },
+    )
+
+
+ENDPOINTS = {
+    "question": _question,
+    "list": _list,
+    "answers": _answers,
+    "create_answer": _create_answer,
+}
+
+
+async def run_load(
+    *,
+    base_url: str,
+    manifest: Dict[str, Any],
+    mix: Dict[str, int],
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    timeout: float,
+    seed: int,
+) -> Dict[str, Any]:
+    """
+    Выполнить прогон и вернуть результаты (см. benchmarks.load.results).
+
+    Args:
+        base_url: Адрес приложения.
+        manifest: Манифест набора данных.
+        mix: Веса конечных точек.
+        concurrency: Число одновременных клиентов.
+        duration: Длительность замера, сек.
+        warmup: Длительность прогрева, сек.
+        timeout: Таймаут запроса, сек.
+        seed: Зерно выбора запросов.
+    """
+    sampler = QuestionSampler(manifest)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+
+    loop = asyncio.get_running_loop()
+    measure_from = loop.time() + warmup
+    stop_at = measure_from + duration
+
+    async def client(rnd: random.Random, http: httpx.AsyncClient) -> None:
+        while loop.time() < stop_at:
+            name = rnd.choices(names, weights)[0]
+            method, url, kwargs = ENDPOINTS[name](rnd, sampler(rnd))
+            started = loop.time()
+            try:
+                response = await http.request(method, url, **kwargs)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            finished = loop.time()
+            if started < measure_from or finished > stop_at:
+                continue
+            latencies[name].append((finished - started) * 1000)
+            errors[name] += failed
+
+    started_at = datetime.now(timezone.utc)
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=timeout
+    ) as http:
+        await asyncio.gather(
+            *(
+                client(random.Random(f"{seed}:{i}"), http)
+                for i in range(concurrency)
+            )
+        )
+
+    return {
+        "format": results.FORMAT,
+        "meta": {
+            "started_at": started_at.isoformat(),
+            "base_url": base_url,
+            "concurrency": concurrency,
+            "duration": duration,
+            "warmup": warmup,
+            "mix": mix,
+            "seed": seed,
+            "dataset": {
+                "questions": manifest["questions"]["count"],
+                "answers": manifest["answers"]["count"],
+                "skew": manifest["skew"],
+            },
+        },
+        "endpoints": {
+            name: results.summarize(latencies[name], errors[name], duration)
+            for name in names
+        },
+        "total": results.summarize(
+            [value for name in names for value in latencies[name]],
+            sum(errors.values()),
+            duration,
+        ),
+    }
+
+
+def print_results(run: Dict[str, Any]) -> None:
+    print(
+        f"{'endpoint':<16}{'requests':>10}{'errors':>8}{'req/s':>10}"
+        f"{'p50, ms':>10}{'p95, ms':>10}{'p99, ms':>10}{'max, ms':>10}"
+    )
+    rows = list(run["endpoints"].items()) + [("total", run["total"])]
+    for name, stats in rows:
+        latency = stats["latency_ms"]
+        cells = "".join(
+            (
+                f"{latency[key]:>10.1f}"
+                if latency[key] is not None
+                else f"{'-':>10}"
+            )
+            for key in ("p50", "p95", "p99", "max")
+        )
+        print(
+            f"{name:<16}{stats['requests']:>10}{stats['errors']:>8}"
+            f"{stats['throughput']:>10.1f}{cells}"
+        )
+
+
+def main() -> None:
+    """Точка входа CLI."""
+    parser = argparse.ArgumentParser(
+        description="Нагрузить запущенное приложение и записать результаты."
+    )
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument(
+        "--dataset",
+        default="load_dataset.json",
+        help="Манифест набора (benchmarks.load.dataset)",
+    )
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=DEFAULT_MIX,
+        help=f"Веса конечных точек (по умолчанию {DEFAULT_MIX})",
+    )
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="load_results.json")
+    args = parser.parse_args()
+
+    with open(args.dataset, encoding="utf-8") as f:
+        manifest = json.load(f)
+    started = time.perf_counter()
+    run = asyncio.run(
+        run_load(
+            base_url=args.base_url,
+            manifest=manifest,
+            mix=args.mix,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            warmup=args.warmup,
+            timeout=args.timeout,
+            seed=args.seed,
+        )
+    )
+    print(f"finished in {time.perf_counter() - started:.1f}s")
+    print_results(run)
+    results.save(args.output, run)
+    print(f"results: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
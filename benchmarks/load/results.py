@@ -0,0 +1,169 @@
+"""
+Формат результатов нагрузочного теста и сравнение прогонов.
+
+JSON результатов (format = 1):
+    {
+      "format": 1,
+      "meta": {параметры прогона и набора данных},
+      "endpoints": {
+        "<имя>": {
+          "requests": 1234, "errors": 0, "throughput": 411.3,
+          "latency_ms": {"p50": .., "p95": .., "p99": .., "max": ..}
+        }
+      },
+      "total": {то же по всем запросам}
+    }
+throughput — запросов в секунду за измеряемый интервал (без прогрева),
+задержки — по всем запросам, включая ошибочные.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+FORMAT = 1
+
+PERCENTILES = {"p50": 0.50, "p95": 0.95, "p99": 0.99}
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Перцентиль отсортированной выборки (ближайший ранг)."""
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(
+    latencies: List[float], errors: int, elapsed: float
+) -> Dict[str, Any]:
+    """
+    Сводка по одной конечной точке (или по всем).
+
+    Args:
+        latencies: Задержки запросов, мс.
+        errors: Сколько из них завершились ошибкой.
+        elapsed: Длительность измеряемого интервала, сек.
+    """
+    ordered = sorted(latencies)
+    latency_ms: Dict[str, Optional[float]] = {
+        name: round(percentile(ordered, q), 3) if ordered else None
+        for name, q in PERCENTILES.items()
+    }
+    latency_ms["max"] = round(ordered[-1], 3) if ordered else None
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": round(len(latencies) / elapsed, 2),
+        "latency_ms": latency_ms,
+    }
+
+
+def load(path: str) -> Dict[str, Any]:
+    """Прочитать результаты и проверить версию формата."""
+    with open(path, encoding="utf-8") as f:
+        results = json.load(f)
+    if results.get("format") != FORMAT:
+        raise ValueError(
+            f"{path}: unsupported results format {results.get('format')!r}"
+        )
+    return results
+
+
+def save(path: str, results: Dict[str, Any]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+@dataclass
+class Check:
+    """
+    Сравнение одной метрики.
+
+    Args:
+        endpoint (str): Конечная точка или total;
+        metric (str): p50/p95/p99, throughput или error_rate;
+        baseline (float): Значение в базовом прогоне;
+        current (float): Значение в текущем прогоне;
+        regression (bool): Ухудшение сверх допуска.
+    """
+
+    endpoint: str
+    metric: str
+    baseline: float
+    current: float
+    regression: bool
+
+
+def _error_rate(stats: Dict[str, Any]) -> float:
+    return stats["errors"] / stats["requests"] if stats["requests"] else 0.0
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    *,
+    latency_tolerance: float,
+    throughput_tolerance: float,
+    min_latency_delta: float,
+    error_rate_tolerance: float,
+) -> List[Check]:
+    """
+    Сравнить прогоны по общим конечным точкам и total.
+
+    Args:
+        baseline: Результаты базового прогона.
+        current: Результаты текущего прогона.
+        latency_tolerance: Допустимый рост перцентилей (0.1 — на 10 %).
+        throughput_tolerance: Допустимое падение пропускной способности.
+        min_latency_delta: Рост задержки меньше этого (мс) — шум, не
+            регрессия (для быстрых конечных точек).
+        error_rate_tolerance: Допустимый рост доли ошибок (абсолютный).
+
+    Returns:
+        Список проверок; регрессия — если хоть одна с regression=True.
+    """
+    pairs = [
+        (name, stats, current["endpoints"][name])
+        for name, stats in baseline["endpoints"].items()
+        if name in current["endpoints"]
+    ]
+    pairs.append(("total", baseline["total"], current["total"]))
+
+    checks: List[Check] = []
+    for name, base, cur in pairs:
+        for metric in PERCENTILES:
+            before = base["latency_ms"][metric]
+            after = cur["latency_ms"][metric]
+            if before is None or after is None:
+                continue
+            checks.append(
+                Check(
+                    name,
+                    metric,
+                    before,
+                    after,
+                    after > before * (1 + latency_tolerance)
+                    and after - before > min_latency_delta,
+                )
+            )
+        checks.append(
+            Check(
+                name,
+                "throughput",
+                base["throughput"],
+                cur["throughput"],
+                cur["throughput"]
+                < base["throughput"] * (1 - throughput_tolerance),
+            )
+        )
+        before, after = _error_rate(base), _error_rate(cur)
+        checks.append(
+            Check(
+                name,
+                "error_rate",
+                before,
+                after,
+                after > before + error_rate_tolerance,
+            )
+        )
+    return checks
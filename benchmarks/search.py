@@ -0,0 +1,208 @@
+"""
+Бенчмарк полнотекстового поиска GET /questions/search.
+
+Порядок работы:
+    1. В рабочие таблицы пачками вставляются синтетические вопросы и
+    ответы (тексты из словаря с распределением частот слов, близким к
+    закону Ципфа).
+    2. VACUUM ANALYZE — сбрасывает pending list GIN-индексов и обновляет
+    статистику, как это сделал бы autovacuum на рабочей базе.
+    3. Для частых, средних и редких слов и для фраз замеряется
+    app.crud.search.search_questions (первая страница и страница по
+    курсору), печатаются p50/p95/max.
+    4. Вставленные строки удаляются (если не указан --keep): удаляются
+    все вопросы с id больше максимального на момент старта, поэтому
+    запускать на базе без параллельной записи.
+
+Запуск (нужна БД из DATABASE_URL со схемой из миграций):
+    python -m benchmarks.search --questions 1000000 --answers 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.crud.search import search_questions
+from app.db.base import async_engine
+
+# Синтетический словарь из VOCABULARY слов w1..wN. Номер слова
+# выбирается как floor(N ^ random()) — log-равномерно, что близко к закону
+# Ципфа: w1 есть почти в половине текстов, w10000 — в долях процента.
+VOCABULARY = 50_000
+
+QUERIES: Dict[str, str] = {
+    "частое слово": "w1",
+    "среднее слово": "w100",
+    "редкое слово": "w20000",
+    "два слова": "w2 w30",
+    "фраза": '"w3 w4"',
+    "слово OR слово": "w500 OR w700",
+}
+
+_INSERT_QUESTIONS = text("""
+    INSERT INTO questions (text)
+    SELECT string_agg(
+        'w' || floor(power(:vocabulary, random()))::int, ' '
+    )
+    FROM generate_series(1, :n) AS g
+    CROSS JOIN generate_series(1, 8) AS w
+    GROUP BY g
+    """)
+
+_INSERT_ANSWERS = text("""
+    INSERT INTO answers (question_id, user_id, text)
+    SELECT :first_id + floor(random() * :span)::bigint,
+           '00000000-0000-0000-0000-000000000001',
+           string_agg(
+               'w' || floor(power(:vocabulary, random()))::int, ' '
+           )
+    FROM generate_series(1, :n) AS g
+    CROSS JOIN generate_series(1, 12) AS w
+    GROUP BY g
+    """)
+
+BATCH = 100_000
+
+
+async def _max_question_id(conn: AsyncConnection) -> int:
+    return await conn.scalar(
+        text("SELECT COALESCE(max(id), 0) FROM questions")
+    )
+
+
+async def _fill(
+    conn: AsyncConnection, questions: int, answers: int, after_id: int
+) -> None:
+    """Вставить данные пачками (id вопросов — больше after_id)."""
+    for done in range(0, questions, BATCH):
+        await conn.execute(
+            _INSERT_QUESTIONS,
+            {"vocabulary": VOCABULARY, "n": min(BATCH, questions - done)},
+        )
+        await conn.commit()
+    first_id = await conn.scalar(
+        text("SELECT min(id) FROM questions WHERE id > :id"), {"id": after_id}
+    )
+    last_id = await _max_question_id(conn)
+    for done in range(0, answers, BATCH):
+        # Без параллельной записи id вставленных вопросов идут подряд
+        await conn.execute(
+            _INSERT_ANSWERS,
+            {
+                "vocabulary": VOCABULARY,
+                "n": min(BATCH, answers - done),
+                "first_id": first_id,
+                "span": last_id - first_id + 1,
+            },
+        )
+        await conn.commit()
+
+
+async def _vacuum() -> None:
+    async with async_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE questions"))
+        await conn.execute(text("VACUUM ANALYZE answers"))
+
+
+async def _timed(
+    query: str, after: Optional[Tuple[float, int]], limit: int
+) -> Tuple[float, Optional[Tuple[float, int]]]:
+    """Время одного поиска, мс, и позиция для следующей страницы."""
+    async with AsyncSession(async_engine) as db:
+        started = time.perf_counter()
+        rows = await search_questions(
+            db, query=query, limit=limit, after=after
+        )
+        elapsed = (time.perf_counter() - started) * 1000
+    position = (rows[-1].rank, rows[-1].id) if rows else None
+    return elapsed, position
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_benchmark(
+    questions: int, answers: int, repeat: int, limit: int, keep: bool
+) -> None:
+    """
+    Заполнить данные, замерить поиск и напечатать таблицу.
+
+    Args:
+        questions: Сколько вопросов вставить.
+        answers: Сколько ответов вставить (случайно по вопросам).
+        repeat: Замеров на каждый запрос.
+        limit: Размер страницы.
+        keep: Не удалять вставленные строки.
+    """
+    async with async_engine.connect() as conn:
+        after_id = await _max_question_id(conn)
+    try:
+        async with async_engine.connect() as conn:
+            started = time.perf_counter()
+            await _fill(conn, questions, answers, after_id)
+            print(
+                f"inserted {questions} questions, {answers} answers "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+        await _vacuum()
+        print(f"page size {limit}, {repeat} runs per query, ms")
+        print(f"{'query':<18}{'page':>6}{'p50':>9}{'p95':>9}{'max':>9}")
+        for name, query in QUERIES.items():
+            # Прогрев кэша страниц
+            _, position = await _timed(query, None, limit)
+            for page, after in (("1", None), ("2", position)):
+                if page == "2" and after is None:
+                    continue
+                samples = [
+                    (await _timed(query, after, limit))[0]
+                    for _ in range(repeat)
+                ]
+                print(
+                    f"{name:<18}{page:>6}"
+                    f"{statistics.median(samples):>9.1f}"
+                    f"{_percentile(samples, 0.95):>9.1f}"
+                    f"{max(samples):>9.1f}"
+                )
+    finally:
+        if not keep:
+            async with async_engine.begin() as conn:
+                # Ответы удаляются каскадно
+                await conn.execute(
+                    text("DELETE FROM questions WHERE id > :id"),
+                    {"id": after_id},
+                )
+        await async_engine.dispose()
+
+
+def main() -> None:
+    """Точка входа CLI."""
+    parser = argparse.ArgumentParser(
+        description="Замерить полнотекстовый поиск на синтетических данных."
+    )
+    parser.add_argument("--questions", type=int, default=1_000_000)
+    parser.add_argument("--answers", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument(
+        "--keep", action="store_true", help="Не удалять вставленные строки"
+    )
+    args = parser.parse_args()
+    asyncio.run(
+        run_benchmark(
+            args.questions, args.answers, args.repeat, args.limit, args.keep
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Бенчмарк сериализации страниц GET /questions/ и GET /questions/{id}.
+
+Сравнивает два пути «выборка + JSON» на одних и тех же данных:
+    - orm — ORM-объекты, валидация Pydantic-схем (from_attributes) и
+    dump_json (как было до быстрого пути);
+    - rows — строки колонок (Core select) и TypedDict-адаптеры
+    app.schemas.rows.
+
+Данные (вопросы и ответы) вставляются в транзакции, которая в конце
+откатывается, — база не меняется.
+
+Запуск (нужна БД из DATABASE_URL):
+    python -m benchmarks.serialization --page-size 100 --repeat 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable, List
+
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import split_page
+from app.crud import answer as a_crud
+from app.crud import question as q_crud
+from app.db.base import async_engine
+from app.schemas.question import QuestionDetail, QuestionListItem
+from app.schemas.rows import dump_question_detail, dump_question_list
+
+_list_adapter = TypeAdapter(List[QuestionListItem])
+_detail_adapter = TypeAdapter(QuestionDetail)
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+
+
+async def _list_orm(db: AsyncSession, limit: int) -> bytes:
+    items = await q_crud.list_questions(db, limit=limit)
+    return _list_adapter.dump_json(
+        _list_adapter.validate_python(items, from_attributes=True)
+    )
+
+
+async def _list_rows(db: AsyncSession, limit: int) -> bytes:
+    return dump_question_list(await q_crud.list_question_rows(db, limit=limit))
+
+
+async def _detail_orm(db: AsyncSession, question_id: int, limit: int) -> bytes:
+    obj = await q_crud.get_question(db, question_id)
+    answers = await a_crud.list_answers(
+        db, question_id=question_id, limit=limit + 1
+    )
+    answers, next_cursor = split_page(answers, limit)
+    detail = _detail_adapter.validate_python(
+        {
+            "id": obj.id,
+            "text": obj.text,
+            "created_at": obj.created_at,
+            "answers": answers,
+            "answers_next_cursor": next_cursor,
+        },
+        from_attributes=True,
+    )
+    return _detail_adapter.dump_json(detail)
+
+
+async def _detail_rows(
+    db: AsyncSession, question_id: int, limit: int
+) -> bytes:
+    question = await q_crud.get_question_row(db, question_id)
+    answers = await a_crud.list_answer_rows(
+        db, question_id=question_id, limit=limit + 1
+    )
+    answers, next_cursor = split_page(answers, limit)
+    return dump_question_detail(question, answers, next_cursor)
+
+
+async def _measure(
+    db: AsyncSession, run: Callable[[], Awaitable[bytes]], repeat: int
+) -> float:
+    """Среднее время одного вызова, мкс (первый вызов — прогрев)."""
+    await run()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await run()
+        # Между итерациями ORM-путь не должен выигрывать от identity map
+        db.expunge_all()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+async def run_benchmark(page_size: int, repeat: int) -> None:
+    """
+    Заполнить данные, замерить оба пути и напечатать таблицу.
+
+    Args:
+        page_size: Размер страницы вопросов и ответов.
+        repeat: Число замеров каждого пути.
+    """
+    async with async_engine.connect() as conn:
+        trans = await conn.begin()
+        db = AsyncSession(bind=conn, expire_on_commit=False)
+        try:
+            await q_crud.create_questions_bulk(
+                db, texts=[f"Question {i}" for i in range(page_size)]
+            )
+            question = await q_crud.create_question(db, text="Detail")
+            await a_crud.create_answers_bulk(
+                db,
+                question_id=question.id,
+                items=[
+                    {"user_id": USER_ID, "text": f"Answer {i}"}
+                    for i in range(page_size)
+                ],
+            )
+            assert await _list_orm(db, page_size) == await _list_rows(
+                db, page_size
+            ), "Пути сериализации разошлись"
+
+            cases = [
+                (
+                    "GET /questions/",
+                    lambda: _list_orm(db, page_size),
+                    lambda: _list_rows(db, page_size),
+                ),
+                (
+                    "GET /questions/{id}",
+                    lambda: _detail_orm(db, question.id, page_size),
+                    lambda: _detail_rows(db, question.id, page_size),
+                ),
+            ]
+            print(f"page_size={page_size} repeat={repeat}")
+            print(f"{'endpoint':<22}{'orm, us':>12}{'rows, us':>12}{'x':>8}")
+            for name, orm, fast in cases:
+                orm_us = await _measure(db, orm, repeat)
+                rows_us = await _measure(db, fast, repeat)
+                print(
+                    f"{name:<22}{orm_us:>12.0f}{rows_us:>12.0f}"
+                    f"{orm_us / rows_us:>8.2f}"
+                )
+        finally:
+            await db.close()
+            await trans.rollback()
+    await async_engine.dispose()
+
+
+def main() -> None:
+    """Точка входа CLI."""
+    parser = argparse.ArgumentParser(
+        description="Сравнить ORM- и row-сериализацию страниц вопросов."
+    )
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=300)
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.page_size, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Бенчмарк холодного старта: время до готовности процесса и задержки
+первых запросов без прогрева и с прогревом (STARTUP_WARMUP,
+app.core.warmup).
+
+Для каждого режима --runs раз:
+    1. Запускается uvicorn app.main:create_app --factory на --port (кэш
+    ответов выключен, чтобы повторные GET шли в базу); ready — время от
+    запуска процесса до первого ответа GET /internal/pool (uvicorn
+    принимает соединения после startup в lifespan, то есть после
+    прогрева).
+    2. first — по одному запросу на каждую конечную точку по очереди
+    (деталка вопроса, список, ответы вопроса, создание ответа).
+    3. burst — --burst одновременных запросов вперемешку: так выглядит
+    трафик на новом поде после переключения балансировщика.
+    4. steady — ещё 20 запросов на конечную точку, медиана — задержка
+    прогретого процесса.
+Печатаются медианы по прогонам. Вопрос с ответами для запросов
+создаётся перед замером и удаляется в конце.
+
+Запуск (нужна БД из DATABASE_URL со схемой из миграций):
+    python -m benchmarks.startup --runs 5 --burst 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+
+from app.crud import answer as a_crud
+from app.crud import question as q_crud
+from app.db.base import AsyncSessionLocal, async_engine
+from app.db.purge import QuestionPurger
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+
+STEADY_ROUNDS = 20
+
+
+def _endpoints(question_id: int) -> Dict[str, Tuple[str, str, dict]]:
+    return {
+        "question": ("GET", f"/questions/{question_id}", {}),
+        "list": ("GET", "/questions/", {"params": {"limit": 20}}),
+        "answers": ("GET", f"/questions/{question_id}/answers", {}),
+        "create_answer": (
+            "POST",
+            f"/questions/{question_id}/answers/",
+            {"json": {"user_id": USER_ID, "text": "Startup benchmark"}},
+        ),
+    }
+
+
+async def _prepare(answers: int) -> int:
+    async with AsyncSessionLocal() as db:
+        question = await q_crud.create_question(db, text="Startup benchmark")
+        await a_crud.create_answers_bulk(
+            db,
+            question_id=question.id,
+            items=[
+                {"user_id": USER_ID, "text": f"Answer {i}"}
+                for i in range(answers)
+            ],
+        )
+        await db.commit()
+    await async_engine.dispose()
+    return question.id
+
+
+async def _cleanup(question_id: int) -> None:
+    async with AsyncSessionLocal() as db:
+        await q_crud.delete_question(db, question_id)
+        await db.commit()
+    await QuestionPurger(AsyncSessionLocal).purge_question(question_id)
+    await async_engine.dispose()
+
+
+async def _timed(
+    http: httpx.AsyncClient, method: str, url: str, kwargs: dict
+) -> float:
+    started = time.perf_counter()
+    response = await http.request(method, url, **kwargs)
+    elapsed = (time.perf_counter() - started) * 1000
+    response.raise_for_status()
+    return elapsed
+
+
+async def _measure(
+    base_url: str, started: float, question_id: int, burst: int
+) -> Dict[str, float]:
+    """Замеры одного запущенного процесса (см. описание модуля), мс."""
+    endpoints = _endpoints(question_id)
+    result: Dict[str, float] = {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as http:
+        while True:
+            try:
+                await http.get("/internal/pool")
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.01)
+        result["ready"] = (time.perf_counter() - started) * 1000
+
+    # Новый клиент: соединения HTTP открываются так же, как у трафика
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as http:
+        for name, request in endpoints.items():
+            result[f"first {name}"] = await _timed(http, *request)
+
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        timeout=30,
+        limits=httpx.Limits(max_connections=burst),
+    ) as http:
+        requests = list(endpoints.values())
+        latencies = await asyncio.gather(
+            *(_timed(http, *requests[i % len(requests)]) for i in range(burst))
+        )
+        result["burst p50"] = statistics.median(latencies)
+        result["burst max"] = max(latencies)
+
+        for name, request in endpoints.items():
+            result[f"steady {name}"] = statistics.median(
+                [await _timed(http, *request) for _ in range(STEADY_ROUNDS)]
+            )
+    return result
+
+
+def _run_server(
+    warmup: bool, port: int, question_id: int, burst: int
+) -> Dict[str, float]:
+    env = {
+        **os.environ,
+        "STARTUP_WARMUP": str(warmup).lower(),
+        "RESPONSE_CACHE_ENABLED": "false",
+    }
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:create_app",
+            "--factory",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+    )
+    try:
+        return asyncio.run(
+            _measure(f"http://127.0.0.1:{port}", started, question_id, burst)
+        )
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main() -> None:
+    """Точка входа CLI."""
+    parser = argparse.ArgumentParser(
+        description="Сравнить холодный старт без прогрева и с прогревом."
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--burst", type=int, default=32)
+    parser.add_argument("--answers", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    question_id = asyncio.run(_prepare(args.answers))
+    runs: Dict[bool, List[Dict[str, float]]] = {False: [], True: []}
+    try:
+        for _ in range(args.runs):
+            for warmup in (False, True):
+                runs[warmup].append(
+                    _run_server(warmup, args.port, question_id, args.burst)
+                )
+    finally:
+        asyncio.run(_cleanup(question_id))
+
+    print(f"runs={args.runs} burst={args.burst} (medians, ms)")
+    print(f"{'metric':<24}{'cold':>10}{'warm-up':>10}")
+    for metric in runs[False][0]:
+        cold, warm = (
+            statistics.median(run[metric] for run in runs[mode])
+            for mode in (False, True)
+        )
+        print(f"{metric:<24}{cold:>10.1f}{warm:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,5 +10,5 @@ echo "Postgres is up."
 echo "Running Alembic migrations..."
 alembic upgrade head
 
-echo "Starting Uvicorn..."
-exec uvicorn app.main:app --host 0.0.0.0 --port 8000
\ No newline at end of file
+echo "Starting server..."
+exec python -m app.server
\ No newline at end of file
@@ -1,26 +1,43 @@
 """
 Фикстуры pytest:
     - Создание/инициализация тестовой БД в Postgres.
-    - Транзакционная сессия SQLAlchemy для каждого теста
-    (rollback по завершении).
-    - TestClient FastAPI с переопределением зависимостей get_db/get_uow.
+    - Проверка наличия расширения pg_trgm (тесты похожих вопросов
+    пропускаются, если его нельзя установить).
+    - Транзакционная асинхронная сессия SQLAlchemy для каждого теста
+    (rollback по завершении) и такое же синхронное соединение
+    (инструменты на psycopg2).
+    - Асинхронный HTTP-клиент (httpx + ASGITransport) с переопределением
+    зависимостей get_db/get_uow и заголовки доступа к /internal/*.
+    - Строгие бюджеты SQL-запросов маршрутов: превышение бюджета или
+    N+1 (app.core.query_budget) — ошибка теста.
+
+Асинхронные тесты запускаются плагином anyio (маркер pytest.mark.anyio).
 """
 
 from __future__ import annotations
 
+import contextlib
 import os
 import re
-from typing import Generator, Iterator
+from typing import AsyncIterator, Iterator
 
+import httpx
 import pytest
 import sqlalchemy as sa
-from fastapi.testclient import TestClient
-from sqlalchemy.engine import Engine
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
 
+from app.core.cache import response_cache
+from app.core.config import settings, to_async_url
 from app.db import dependences as app_deps
 from app.db.base import Base
+from app.db.queries import instrument_queries
 from app.main import app
+from app.models.question import Question
+
+# Индексы, которым нужно расширение pg_trgm
+_TRIGRAM_INDEXES = ("ix_questions_text_trgm",)
 
 
 def _derive_test_url(url: str) -> str:
@@ -49,6 +66,20 @@ def test_database_url() -> str:
     return _derive_test_url(settings.database_url)
 
 
+@pytest.fixture(scope="session", autouse=True)
+def _strict_query_budgets() -> Iterator[None]:
+    """
+    Превышение бюджета SQL-запросов маршрута проваливает тест
+    (в production — только предупреждение в журнале).
+    """
+    from app.core.config import settings
+
+    previous = settings.query_budget_mode
+    settings.query_budget_mode = "raise"
+    yield
+    settings.query_budget_mode = previous
+
+
 @pytest.fixture(scope="session", autouse=True)
 def _prepare_test_db(test_database_url: str) -> Iterator[None]:
     """
@@ -77,68 +108,167 @@ def _prepare_test_db(test_database_url: str) -> Iterator[None]:
             conn.execute(sa.text(f'CREATE DATABASE "{db_name}"'))
 
     engine: Engine = sa.create_engine(test_database_url, future=True)
-    Base.metadata.create_all(bind=engine)
+    if _install_pg_trgm(engine):
+        Base.metadata.create_all(bind=engine)
+    else:
+        # Без pg_trgm создаём схему без триграммных индексов
+        table = Question.__table__
+        skipped = {i for i in table.indexes if i.name in _TRIGRAM_INDEXES}
+        table.indexes -= skipped
+        try:
+            Base.metadata.create_all(bind=engine)
+        finally:
+            table.indexes |= skipped
     yield
 
 
+def _install_pg_trgm(engine: Engine) -> bool:
+    """
+    Установить расширение pg_trgm в тестовую БД.
+
+    Returns:
+        bool: False, если расширение недоступно на сервере.
+    """
+    try:
+        with engine.begin() as conn:
+            conn.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except sa.exc.DBAPIError:
+        return False
+    return True
+
+
+@pytest.fixture(scope="session")
+def pg_trgm(test_database_url: str) -> None:
+    """
+    Пропустить тест, если в тестовой БД нет расширения pg_trgm
+    (например, сервер собран без contrib).
+    """
+    engine: Engine = sa.create_engine(test_database_url, future=True)
+    with engine.connect() as conn:
+        installed = conn.execute(
+            sa.text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        ).scalar()
+    engine.dispose()
+    if not installed:
+        pytest.skip("расширение pg_trgm недоступно в тестовой БД")
+
+
+@pytest.fixture()
+def anyio_backend() -> str:
+    """
+    Запускать асинхронные тесты только на asyncio (asyncpg не работает
+    с trio).
+    """
+    return "asyncio"
+
+
 @pytest.fixture()
-def db_session(test_database_url: str) -> Iterator[Session]:
+async def db_session(test_database_url: str) -> AsyncIterator[AsyncSession]:
     """
-    Выдать транзакционную сессию SQLAlchemy для изоляции теста:
+    Выдать транзакционную асинхронную сессию SQLAlchemy для изоляции теста:
       - Открываем соединение и начинаем транзакцию.
-      - Привязываем к ней Session.
+      - Привязываем к ней AsyncSession.
       - По завершении теста — делаем rollback и закрываем соединение.
 
+    NullPool: соединения asyncpg привязаны к event loop теста,
+    переиспользовать их между тестами нельзя.
+
     Returns:
-        Iterator[Session]: Сессия SQLAlchemy, обёрнутая в транзакцию.
+        AsyncIterator[AsyncSession]: Сессия SQLAlchemy, обёрнутая
+        в транзакцию.
     """
-    engine: Engine = sa.create_engine(test_database_url, future=True)
-    TestingSessionLocal: sessionmaker[Session] = sessionmaker(
-        bind=engine, autoflush=False, autocommit=False, class_=Session
+    engine = create_async_engine(
+        to_async_url(test_database_url), poolclass=NullPool
     )
-    connection = engine.connect()
-    trans = connection.begin()
+    # Как у движков приложения (app.db.base): SQL-запросы в метриках
+    instrument_queries(engine.sync_engine)
+    connection = await engine.connect()
+    trans = await connection.begin()
 
-    session: Session = TestingSessionLocal(bind=connection)
+    session = AsyncSession(
+        bind=connection, autoflush=False, expire_on_commit=False
+    )
     try:
         yield session
     finally:
-        session.close()
-        trans.rollback()
-        connection.close()
+        await session.close()
+        await trans.rollback()
+        await connection.close()
+        await engine.dispose()
+
+
+@pytest.fixture()
+def sync_conn(test_database_url: str) -> Iterator[Connection]:
+    """
+    Синхронное соединение (psycopg2) в транзакции с rollback по завершении.
+    """
+    engine = sa.create_engine(test_database_url, future=True)
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            yield conn
+        finally:
+            trans.rollback()
+    engine.dispose()
 
 
 @pytest.fixture()
-def client(db_session: Session) -> Generator[TestClient, None, None]:
+async def client(db_session: AsyncSession) -> AsyncIterator[httpx.AsyncClient]:
     """
-    Вернуть TestClient FastAPI с переопределённым
+    Вернуть асинхронный HTTP-клиент FastAPI с переопределёнными
     зависимостями get_db и get_uow, указывающими на одну
     и ту же транзакционную сессию (rollback в фикстуре).
+    Кэш ответов очищается, чтобы тесты не видели данные друг друга.
     """
+    response_cache.clear()
 
-    def _get_db_override() -> Iterator[Session]:
+    async def _get_db_override() -> AsyncIterator[AsyncSession]:
         """
         Переопределение зависимость для read-only эндпоинтов (без коммита).
         """
-        try:
-            yield db_session
-        finally:
-            pass
+        yield db_session
 
-    def _get_uow_override() -> Iterator[Session]:
+    async def _get_uow_override() -> AsyncIterator[AsyncSession]:
         """
         Переопределение зависимости Unit of Work для write-эндпоинтов.
-        Коммит не вызываем — фиксируем откат в рамках общей транзакции теста.
+        Коммит сессии не фиксирует внешнюю транзакцию теста (её откатит
+        фикстура), но запускает after-commit хуки (инвалидацию кэша).
+        Rollback не вызываем: он откатил бы всю транзакцию теста.
         """
-        try:
-            yield db_session
-        finally:
-            pass
+        yield db_session
+        await db_session.commit()
+
+    @contextlib.asynccontextmanager
+    async def _read_session_override(
+        *, snapshot: bool = False
+    ) -> AsyncIterator[AsyncSession]:
+        """
+        Переопределение фабрики сессий для потоковых эндпоинтов.
+        Транзакция теста уже открыта, поэтому snapshot не меняет её
+        уровень изоляции (снимок проверяется в tests/tools).
+        """
+        yield db_session
 
     app.dependency_overrides[app_deps.get_db] = _get_db_override
+    app.dependency_overrides[app_deps.get_read_session_factory] = (
+        lambda: _read_session_override
+    )
     app.dependency_overrides[app_deps.get_uow] = _get_uow_override
 
-    with TestClient(app) as test_client:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as test_client:
         yield test_client
 
     app.dependency_overrides.clear()
+
+
+@pytest.fixture()
+def internal_headers(monkeypatch: pytest.MonkeyPatch) -> dict[str, str]:
+    """
+    Задать INTERNAL_TOKEN на время теста и вернуть заголовки запроса к
+    служебным маршрутам /internal/*.
+    """
+    monkeypatch.setattr(settings, "internal_token", "internal-secret")
+    return {"X-Internal-Token": "internal-secret"}
@@ -0,0 +1,164 @@
+"""
+Тесты кэша ответов: LRU, TTL, инвалидация по тегам, защита от гонки,
+окно после инвалидации и stale-while-revalidate.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Optional
+
+import pytest
+
+from app.core.cache import CachedResponse, ResponseCache
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeClock:
+    """Управляемые часы для проверки TTL."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _loader(body: bytes, calls: list[bytes]):
+    async def load() -> Optional[CachedResponse]:
+        calls.append(body)
+        return CachedResponse(body=body)
+
+    return load
+
+
+async def test_hit_miss_and_ttl() -> None:
+    """
+    Проверить попадание до истечения TTL и повторную загрузку после.
+    """
+    clock = FakeClock()
+    cache = ResponseCache(ttl=10, clock=clock)
+    calls: list[bytes] = []
+
+    assert (await cache.get_or_load("k", _loader(b"1", calls))).body == b"1"
+    assert (await cache.get_or_load("k", _loader(b"2", calls))).body == b"1"
+    clock.now = 11
+    assert (await cache.get_or_load("k", _loader(b"3", calls))).body == b"3"
+
+    assert calls == [b"1", b"3"]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+async def test_lru_eviction() -> None:
+    """
+    Проверить вытеснение давно не использованной записи.
+    """
+    cache = ResponseCache(max_entries=2)
+    calls: list[bytes] = []
+    await cache.get_or_load("a", _loader(b"a", calls))
+    await cache.get_or_load("b", _loader(b"b", calls))
+    await cache.get_or_load("a", _loader(b"a", calls))
+    await cache.get_or_load("c", _loader(b"c", calls))
+    await cache.get_or_load("b", _loader(b"b", calls))
+
+    assert calls == [b"a", b"b", b"c", b"b"]
+    assert cache.stats()["evictions"] == 2
+
+
+async def test_invalidate_by_tag_and_not_found_not_cached() -> None:
+    """
+    Проверить инвалидацию только записей с тегом и то, что None
+    (не найдено) не кэшируется.
+    """
+    cache = ResponseCache()
+    calls: list[bytes] = []
+    await cache.get_or_load("q1", _loader(b"1", calls), tags=["question:1"])
+    await cache.get_or_load("q2", _loader(b"2", calls), tags=["question:2"])
+    cache.invalidate("question:1")
+    await cache.get_or_load("q1", _loader(b"1", calls), tags=["question:1"])
+    await cache.get_or_load("q2", _loader(b"2", calls), tags=["question:2"])
+    assert calls == [b"1", b"2", b"1"]
+
+    async def missing() -> Optional[CachedResponse]:
+        return None
+
+    assert await cache.get_or_load("none", missing) is None
+    assert cache.stats()["entries"] == 2
+
+
+async def test_load_racing_invalidation_is_not_stored() -> None:
+    """
+    Проверить, что результат загрузки, во время которой прошла
+    инвалидация, не попадает в кэш.
+    """
+    cache = ResponseCache()
+
+    async def load() -> CachedResponse:
+        cache.invalidate("question:1")
+        return CachedResponse(body=b"old")
+
+    await cache.get_or_load("k", load, tags=["question:1"])
+    assert cache.stats()["entries"] == 0
+
+
+async def test_settle_after_invalidation() -> None:
+    """
+    Проверить, что settle секунд после инвалидации тега загрузки с ним
+    отдаются, но не сохраняются, а записи с другими тегами — сохраняются.
+    """
+    clock = FakeClock()
+    cache = ResponseCache(ttl=30, settle=5, clock=clock)
+    calls: list[bytes] = []
+    cache.invalidate("question:1")
+
+    clock.now = 4
+    got = await cache.get_or_load(
+        "q1", _loader(b"lagging", calls), tags=["question:1"]
+    )
+    assert got.body == b"lagging"
+    await cache.get_or_load("q2", _loader(b"2", calls), tags=["question:2"])
+    assert cache.stats()["entries"] == 1
+
+    clock.now = 5
+    await cache.get_or_load("q1", _loader(b"1", calls), tags=["question:1"])
+    await cache.get_or_load("q1", _loader(b"x", calls), tags=["question:1"])
+    assert calls == [b"lagging", b"2", b"1"]
+
+
+async def test_stale_while_revalidate() -> None:
+    """
+    Проверить, что устаревшая запись отдаётся сразу, а обновляется в фоне.
+    """
+    clock = FakeClock()
+    cache = ResponseCache(ttl=10, stale_ttl=10, clock=clock)
+    calls: list[bytes] = []
+    await cache.get_or_load("k", _loader(b"1", calls))
+
+    clock.now = 15
+    got = await cache.get_or_load(
+        "k", _loader(b"x", calls), refresh=_loader(b"2", calls)
+    )
+    assert got.body == b"1"
+    await asyncio.sleep(0)
+
+    got = await cache.get_or_load("k", _loader(b"x", calls))
+    assert got.body == b"2"
+    assert calls == [b"1", b"2"]
+    assert cache.stats()["stale_hits"] == 1
+
+
+async def test_bypass_and_disabled() -> None:
+    """
+    Проверить, что bypass и выключенный кэш всегда загружают данные.
+    """
+    calls: list[bytes] = []
+    cache = ResponseCache()
+    await cache.get_or_load("k", _loader(b"1", calls))
+    await cache.get_or_load("k", _loader(b"2", calls), bypass=True)
+
+    off = ResponseCache(enabled=False)
+    await off.get_or_load("k", _loader(b"3", calls))
+    await off.get_or_load("k", _loader(b"4", calls))
+    assert calls == [b"1", b"2", b"3", b"4"]
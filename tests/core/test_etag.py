@@ -0,0 +1,37 @@
+"""
+Тесты ETag: стабильность построения и сравнение с If-None-Match.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from app.core.etag import etag_matches, make_etag
+
+
+def test_make_etag_is_stable_and_quoted() -> None:
+    """
+    Проверить, что ETag детерминирован, в кавычках и зависит от версии.
+    """
+    etag = make_etag("question", 1, 7)
+    assert etag == make_etag("question", 1, 7)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag != make_etag("question", 1, 8)
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"x", "abc"', True),
+        ("*", True),
+        ('"abd"', False),
+    ],
+)
+def test_etag_matches(header: str | None, expected: bool) -> None:
+    """
+    Проверить слабое сравнение ETag для If-None-Match.
+    """
+    assert etag_matches(header, '"abc"') is expected
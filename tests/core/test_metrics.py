@@ -0,0 +1,38 @@
+"""
+Тесты метрик: текстовый формат Prometheus для счётчиков и гистограмм.
+"""
+
+from __future__ import annotations
+
+from app.core.metrics import Counter, Histogram, MetricsRegistry
+
+
+def test_render_counter_and_histogram() -> None:
+    """
+    Проверить накопительные корзины гистограммы, сумму, число
+    наблюдений и экранирование значений меток.
+    """
+    registry = MetricsRegistry()
+    counter = registry.register(
+        Counter("requests_total", "Requests.", ("route",))
+    )
+    histogram = registry.register(
+        Histogram("latency_seconds", "Latency.", (0.1, 1.0), ("route",))
+    )
+    counter.inc('/a"b')
+    counter.inc('/a"b', amount=2)
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "/q")
+
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        'requests_total{route="/a\\"b"} 3',
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/q",le="0.1"} 2',
+        'latency_seconds_bucket{route="/q",le="1"} 3',
+        'latency_seconds_bucket{route="/q",le="+Inf"} 4',
+        'latency_seconds_sum{route="/q"} 3.65',
+        'latency_seconds_count{route="/q"} 4',
+    ]
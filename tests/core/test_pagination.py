@@ -0,0 +1,47 @@
+"""
+Тесты курсоров keyset-пагинации: кодирование и разбор.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+def test_cursor_roundtrip() -> None:
+    """
+    Проверить, что курсор раскодируется в исходную пару (created_at, id).
+    """
+    ts = datetime(2025, 8, 29, 19, 53, 44, 185276, tzinfo=timezone.utc)
+    cursor = encode_cursor(ts, 42)
+    assert decode_cursor(cursor) == (ts, 42)
+
+
+@pytest.mark.parametrize("bad", ["", "garbage", "WyJ4IiwxXQ", "WzEsMl0"])
+def test_cursor_invalid_rejected(bad: str) -> None:
+    """
+    Проверить, что повреждённый курсор отклоняется.
+    """
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(bad)
+
+
+def test_cursor_int_key_roundtrip() -> None:
+    """
+    Проверить курсор с целым ключом сортировки и отказ при несовпадении
+    типа ключа.
+    """
+    cursor = encode_cursor(7, 42)
+    assert decode_cursor(cursor, key_type=int) == (7, 42)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+    ts_cursor = encode_cursor(datetime(2025, 1, 1, tzinfo=timezone.utc), 1)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(ts_cursor, key_type=int)
@@ -0,0 +1,169 @@
+"""
+Тесты профилирования запросов: запуск по заголовку и выборке, стеки
+кода запроса, хронология SQL и форматы collapsed/speedscope.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from typing import Iterator, Optional
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy.util import greenlet_spawn
+
+from app.core.config import settings
+from app.core.profiling import (
+    WAITING,
+    ProfilingMiddleware,
+    profile_store,
+    write_profile,
+)
+from app.db.queries import current_query_stats
+
+pytestmark = pytest.mark.anyio
+
+TOKEN = "secret"
+
+profiled_app = FastAPI()
+profiled_app.add_middleware(ProfilingMiddleware)
+
+
+def busy_loop(seconds: float) -> None:
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        pass
+
+
+@profiled_app.get("/work")
+async def work():
+    busy_loop(0.05)
+    # Ожидание — как ответ базы: задача запроса не выполняется
+    await asyncio.sleep(0.03)
+    stats = current_query_stats()
+    if stats is not None:
+        stats.add(0.002, "SELECT 1", started=time.perf_counter() - 0.002)
+    return {}
+
+
+@profiled_app.get("/sync")
+async def sync_work():
+    # Так выполняется синхронный код SQLAlchemy в async-сессии
+    await greenlet_spawn(busy_loop, 0.05)
+    return {}
+
+
+@pytest.fixture()
+def profiling() -> Iterator[None]:
+    previous = (
+        settings.profiling_enabled,
+        settings.profiling_token,
+        settings.profiling_sample_rate,
+        settings.profiling_interval_ms,
+    )
+    settings.profiling_enabled = True
+    settings.profiling_token = TOKEN
+    settings.profiling_sample_rate = 0.0
+    settings.profiling_interval_ms = 1.0
+    profile_store.clear()
+    yield
+    (
+        settings.profiling_enabled,
+        settings.profiling_token,
+        settings.profiling_sample_rate,
+        settings.profiling_interval_ms,
+    ) = previous
+    profile_store.clear()
+
+
+async def _get(url: str, token: Optional[str] = None) -> httpx.Response:
+    transport = httpx.ASGITransport(app=profiled_app)
+    headers = {"X-Profile": token} if token is not None else {}
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as client:
+        return await client.get(url, headers=headers)
+
+
+async def test_profile_by_header(profiling: None) -> None:
+    """
+    Проверить, что запрос с токеном профилируется: стеки содержат код
+    маршрута, ожидание отделено от выполнения, SQL-запрос попадает в
+    хронологию.
+    """
+    r = await _get("/work", TOKEN)
+    assert r.status_code == 200
+    profile = profile_store.get(r.headers["x-profile-id"])
+    assert profile is not None
+    assert (profile.method, profile.route, profile.status) == (
+        "GET",
+        "/work",
+        200,
+    )
+
+    summary = profile.summary()
+    assert summary["samples"] > 0
+    assert 30 <= summary["cpu_ms"] < summary["duration_ms"]
+    assert summary["sql_statements"] == 1
+    [(offset, seconds, statement)] = profile.sql
+    assert statement == "SELECT 1"
+    assert 0 < offset < profile.duration
+
+    collapsed = profile.collapsed()
+    assert "work (test_profiling.py:" in collapsed
+    assert ";busy_loop (test_profiling.py:" in collapsed
+    assert f"\n{WAITING[0]} " in "\n" + collapsed
+
+    speedscope = profile.speedscope()
+    sampled, sql = speedscope["profiles"]
+    assert len(sampled["samples"]) == len(sampled["weights"])
+    frames = speedscope["shared"]["frames"]
+    assert [frames[e["frame"]]["name"] for e in sql["events"]] == [
+        "SQL: SELECT 1",
+        "SQL: SELECT 1",
+    ]
+
+
+async def test_profile_greenlet(profiling: None) -> None:
+    """
+    Проверить, что стек кода в greenlet продолжает стек маршрута.
+    """
+    r = await _get("/sync", TOKEN)
+    profile = profile_store.get(r.headers["x-profile-id"])
+    assert any(
+        "sync_work (test_profiling.py:" in line
+        and ";greenlet_spawn (" in line
+        and ";busy_loop (test_profiling.py:" in line
+        for line in profile.collapsed().splitlines()
+    )
+
+
+async def test_profile_trigger(profiling: None) -> None:
+    """
+    Проверить, что без заголовка, с неверным токеном или с выключенным
+    профилированием запрос не профилируется, а при доле 1 — всегда.
+    """
+    assert "x-profile-id" not in (await _get("/work")).headers
+    assert "x-profile-id" not in (await _get("/work", "wrong")).headers
+
+    settings.profiling_sample_rate = 1.0
+    assert "x-profile-id" in (await _get("/work")).headers
+
+    settings.profiling_enabled = False
+    assert "x-profile-id" not in (await _get("/work", TOKEN)).headers
+    assert len(profile_store.summaries()) == 1
+
+
+async def test_write_profile(profiling: None, tmp_path) -> None:
+    """
+    Проверить, что профиль пишется в каталог файлом speedscope.
+    """
+    r = await _get("/work", TOKEN)
+    profile = profile_store.get(r.headers["x-profile-id"])
+    path = write_profile(str(tmp_path), profile)
+    assert path.endswith(f"{profile.id}.speedscope.json")
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == profile.speedscope()
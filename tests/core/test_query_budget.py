@@ -0,0 +1,101 @@
+"""
+Тесты бюджетов SQL-запросов маршрутов: превышение числа запросов,
+обнаружение N+1 и режимы raise/warn.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Iterator
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.core.config import settings
+from app.core.query_budget import (
+    QueryBudgetExceeded,
+    QueryBudgetMiddleware,
+    query_budget,
+)
+from app.db.queries import current_query_stats
+
+pytestmark = pytest.mark.anyio
+
+
+def _execute(*statements: str) -> None:
+    """Учесть запросы так, как это делают события курсора движка."""
+    stats = current_query_stats()
+    assert stats is not None
+    for statement in statements:
+        stats.add(0.001, statement)
+
+
+budget_app = FastAPI()
+budget_app.add_middleware(QueryBudgetMiddleware)
+
+
+@budget_app.get("/two")
+@query_budget(statements=2)
+async def two_statements(n: int):
+    _execute(*(f"SELECT {i}" for i in range(n)))
+    return {}
+
+
+@budget_app.get("/loop")
+async def loop(n: int):
+    _execute(*(["SELECT * FROM answers WHERE id = $1"] * n))
+    return {}
+
+
+@budget_app.get("/batches")
+@query_budget(repeats=None)
+async def batches(n: int):
+    _execute(*(["DELETE FROM answers WHERE id IN ($1)"] * n))
+    return {}
+
+
+@pytest.fixture()
+def budget_mode() -> Iterator[None]:
+    previous = settings.query_budget_mode
+    yield
+    settings.query_budget_mode = previous
+
+
+async def _get(url: str) -> httpx.Response:
+    transport = httpx.ASGITransport(app=budget_app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as client:
+        return await client.get(url)
+
+
+async def test_raise_mode(budget_mode: None) -> None:
+    """
+    Проверить, что в режиме raise превышение числа запросов и N+1
+    проваливают запрос, а объявленный бюджет и repeats=None соблюдаются.
+    """
+    settings.query_budget_mode = "raise"
+    assert (await _get("/two?n=2")).status_code == 200
+    with pytest.raises(QueryBudgetExceeded, match="3 SQL statements"):
+        await _get("/two?n=3")
+
+    limit = settings.query_repeats_limit
+    assert (await _get(f"/loop?n={limit}")).status_code == 200
+    with pytest.raises(QueryBudgetExceeded, match="possible N\\+1"):
+        await _get(f"/loop?n={limit + 1}")
+    assert (await _get(f"/batches?n={limit + 1}")).status_code == 200
+
+
+async def test_warn_mode(
+    budget_mode: None, caplog: pytest.LogCaptureFixture
+) -> None:
+    """
+    Проверить, что в режиме warn ответ отдаётся, а превышение
+    записывается в журнал.
+    """
+    settings.query_budget_mode = "warn"
+    with caplog.at_level(logging.WARNING, logger="app.core.query_budget"):
+        r = await _get("/two?n=3")
+    assert r.status_code == 200
+    assert "GET /two: 3 SQL statements, budget 2" in caplog.text
@@ -4,33 +4,213 @@ CRUD-тесты для Answer: создание, получение и удал
 
 from __future__ import annotations
 
-from sqlalchemy.orm import Session
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud import answer as a_crud
 from app.crud import question as q_crud
+from app.models.answer import Answer
 from tests.utils.helpers import to_uuid
 
+pytestmark = pytest.mark.anyio
 
-def test_create_get_delete_answer(db_session: Session) -> None:
+
+async def test_create_get_delete_answer(db_session: AsyncSession) -> None:
     """
     Проверить жизненный цикл ответа (create - get - delete).
     """
-    q = q_crud.create_question(db_session, text="Q")
-    db_session.commit()
+    q = await q_crud.create_question(db_session, text="Q")
+    await db_session.commit()
 
-    ans = a_crud.create_answer(
+    ans = await a_crud.create_answer(
         db_session,
         question_id=q.id,
         user_id=to_uuid("firstuser"),
         text="A",
     )
-    db_session.commit()
+    await db_session.commit()
 
-    got = a_crud.get_answer(db_session, ans.id)
+    got = await a_crud.get_answer(db_session, ans.id)
     assert got is not None
     assert got.text == "A"
 
-    deleted: bool = a_crud.delete_answer(db_session, ans.id)
-    db_session.commit()
+    deleted: bool = await a_crud.delete_answer(db_session, ans.id)
+    await db_session.commit()
     assert deleted is True
-    assert a_crud.get_answer(db_session, ans.id) is None
+    assert await a_crud.get_answer(db_session, ans.id) is None
+
+
+async def test_list_answers_keyset(db_session: AsyncSession) -> None:
+    """
+    Проверить выборку ответов вопроса страницами по (created_at, id).
+    """
+    q = await q_crud.create_question(db_session, text="Q")
+    answers = [
+        await a_crud.create_answer(
+            db_session, question_id=q.id, user_id=to_uuid("u"), text=f"A{i}"
+        )
+        for i in range(3)
+    ]
+    await db_session.commit()
+
+    page = await a_crud.list_answers(db_session, question_id=q.id, limit=2)
+    assert [a.id for a in page] == [answers[0].id, answers[1].id]
+
+    last = page[-1]
+    rest = await a_crud.list_answers(
+        db_session, question_id=q.id, after=(last.created_at, last.id)
+    )
+    assert [a.id for a in rest] == [answers[2].id]
+
+
+async def test_create_answers_bulk(db_session: AsyncSession) -> None:
+    """
+    Проверить пакетную вставку ответов и увеличение версии вопроса.
+    """
+    q = await q_crud.create_question(db_session, text="Q")
+    rows = await a_crud.create_answers_bulk(
+        db_session,
+        question_id=q.id,
+        items=[
+            {"user_id": to_uuid("u1"), "text": "A1"},
+            {"user_id": to_uuid("u2"), "text": "A2"},
+        ],
+    )
+    assert [r.text for r in rows] == ["A1", "A2"]
+    assert rows[0].id < rows[1].id
+    assert await q_crud.get_question_version(db_session, q.id) == 2
+
+
+async def test_create_answers_bulk_deleted_question(
+    db_session: AsyncSession,
+) -> None:
+    """
+    Проверить, что для удалённого и несуществующего вопроса пачка не
+    вставляется и возвращается None, а пустая пачка на существующий
+    вопрос его не меняет.
+    """
+    q = await q_crud.create_question(db_session, text="Q")
+    assert (
+        await a_crud.create_answers_bulk(
+            db_session, question_id=q.id, items=[]
+        )
+        == []
+    )
+    assert await q_crud.get_question_version(db_session, q.id) == 1
+
+    assert await q_crud.delete_question(db_session, q.id)
+    items = [{"user_id": to_uuid("u1"), "text": "A1"}]
+    for question_id in (q.id, 999999):
+        assert (
+            await a_crud.create_answers_bulk(
+                db_session, question_id=question_id, items=items
+            )
+            is None
+        )
+    count = await db_session.scalar(
+        select(func.count())
+        .select_from(Answer)
+        .where(Answer.question_id == q.id)
+    )
+    assert count == 0
+
+
+async def test_create_answer_single_statement(
+    db_session: AsyncSession,
+) -> None:
+    """
+    Проверить, что создание ответа — один запрос к БД, который
+    увеличивает версию вопроса, а для несуществующего вопроса
+    возвращает None.
+    """
+    q = await q_crud.create_question(db_session, text="Q")
+    statements: list[str] = []
+
+    def _count(conn, cursor, statement, *args) -> None:
+        statements.append(statement)
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        row = await a_crud.create_answer(
+            db_session, question_id=q.id, user_id=to_uuid("u"), text="A"
+        )
+        missing = await a_crud.create_answer(
+            db_session, question_id=q.id + 1, user_id=to_uuid("u"), text="A"
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+    assert len(statements) == 2
+    assert row is not None and row.question_id == q.id
+    assert row.created_at is not None
+    assert missing is None
+    assert await q_crud.get_question_version(db_session, q.id) == 2
+
+
+async def test_answer_writes_maintain_question_counters(
+    db_session: AsyncSession,
+) -> None:
+    """
+    Проверить, что создание (одиночное и пакетное) и удаление ответов
+    ведут answers_count и last_answer_at вопроса.
+    """
+    q = await q_crud.create_question(db_session, text="Q")
+    single = await a_crud.create_answer(
+        db_session, question_id=q.id, user_id=to_uuid("u"), text="A0"
+    )
+    await a_crud.create_answers_bulk(
+        db_session,
+        question_id=q.id,
+        items=[{"user_id": to_uuid("u"), "text": f"A{i}"} for i in (1, 2)],
+    )
+    row = await q_crud.get_question_row(db_session, q.id)
+    assert (row.version, row.answers_count) == (3, 3)
+    assert row.last_answer_at == single.created_at
+
+    for answer in await a_crud.list_answers(db_session, question_id=q.id):
+        await a_crud.delete_answer(db_session, answer.id)
+    row = await q_crud.get_question_row(db_session, q.id)
+    assert (row.answers_count, row.last_answer_at) == (0, None)
+
+
+async def test_delete_user_answers_batch_locks_questions_in_order(
+    db_session: AsyncSession,
+) -> None:
+    """
+    Проверить, что пачка ответов пользователя удаляется с пересчётом
+    счётчиков, а вопросы блокируются до удаления по возрастанию id.
+    """
+    q1 = await q_crud.create_question(db_session, text="Q1")
+    q2 = await q_crud.create_question(db_session, text="Q2")
+    for q in (q2, q1, q2):
+        await a_crud.create_answer(
+            db_session, question_id=q.id, user_id=to_uuid("u"), text="A"
+        )
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, *args) -> None:
+        statements.append(statement)
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        touched = await a_crud.delete_user_answers_batch(
+            db_session, user_id=to_uuid("u"), batch_size=10
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+    assert touched == {q1.id: 1, q2.id: 2}
+    lock = next(s for s in statements if "FOR NO KEY UPDATE" in s)
+    assert "ORDER BY questions.id" in lock
+    assert statements.index(lock) < next(
+        i for i, s in enumerate(statements) if "DELETE FROM answers" in s
+    )
+    assert (
+        await a_crud.delete_user_answers_batch(
+            db_session, user_id=to_uuid("u"), batch_size=10
+        )
+        == {}
+    )
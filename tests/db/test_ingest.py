@@ -0,0 +1,96 @@
+"""
+Тесты очереди записи ответов: групповой коммит, backpressure и
+дозапись принятых ответов при остановке.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from typing import AsyncIterator
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import question as q_crud
+from app.db.ingest import (
+    COMMITTED,
+    QUESTION_NOT_FOUND,
+    AnswerIngestQueue,
+    IngestUnavailable,
+)
+
+pytestmark = pytest.mark.anyio
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+
+
+def _queue(db_session: AsyncSession, **options) -> AnswerIngestQueue:
+    """Очередь, пишущая в транзакционную сессию теста."""
+
+    @contextlib.asynccontextmanager
+    async def session_factory() -> AsyncIterator[AsyncSession]:
+        yield db_session
+
+    return AnswerIngestQueue(session_factory, **options)
+
+
+async def test_answers_are_written_in_one_group(
+    db_session: AsyncSession,
+) -> None:
+    """
+    Проверить, что ответы из окна max_delay пишутся одной группой, а
+    ответ на несуществующий вопрос отклоняется, не мешая остальным.
+    """
+    q1 = await q_crud.create_question(db_session, text="Q1")
+    q2 = await q_crud.create_question(db_session, text="Q2")
+    queue = _queue(db_session, batch_size=10, max_delay=0.05)
+    queue.start()
+    try:
+        tickets = [
+            queue.submit(question_id=q, user_id=USER_ID, text=f"A{i}")
+            for i, q in enumerate((q1.id, q2.id, 999_999_999, q1.id))
+        ]
+        rows = await asyncio.gather(*(t.wait() for t in tickets))
+    finally:
+        await queue.stop(timeout=5)
+
+    assert queue.groups == 1
+    assert [r.text if r else None for r in rows] == ["A0", "A1", None, "A3"]
+    assert [t.status.status for t in tickets] == [
+        COMMITTED,
+        COMMITTED,
+        QUESTION_NOT_FOUND,
+        COMMITTED,
+    ]
+    assert queue.status(tickets[0].status.tracking_id).answer_id == rows[0].id
+    question = await q_crud.get_question_row(db_session, q1.id)
+    assert question.answers_count == 2
+    assert queue.stats()["committed"] == 3
+
+
+async def test_backpressure_and_drain_on_stop(
+    db_session: AsyncSession,
+) -> None:
+    """
+    Проверить отказ при заполненной и остановленной очереди и запись
+    уже принятых ответов при остановке.
+    """
+    question = await q_crud.create_question(db_session, text="Q")
+    queue = _queue(db_session, max_size=2, max_delay=0)
+    with pytest.raises(IngestUnavailable):
+        queue.submit(question_id=question.id, user_id=USER_ID, text="A")
+
+    queue.start()
+    tickets = [
+        queue.submit(question_id=question.id, user_id=USER_ID, text="A")
+        for _ in range(2)
+    ]
+    with pytest.raises(IngestUnavailable):
+        queue.submit(question_id=question.id, user_id=USER_ID, text="A")
+
+    await queue.stop(timeout=5)
+    assert all(t.status.status == COMMITTED for t in tickets)
+    with pytest.raises(IngestUnavailable):
+        queue.submit(question_id=question.id, user_id=USER_ID, text="A")
+    assert queue.stats()["rejected"] == 3
@@ -0,0 +1,106 @@
+"""
+Тесты секционирования answers (app.db.partitions): имена и границы
+месячных секций, создание будущих и отсоединение старых секций.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+import sqlalchemy as sa
+from sqlalchemy.engine import Connection
+
+from app.db.partitions import (
+    RANGE,
+    add_months,
+    create_future_partitions,
+    detach_partition,
+    expired_partitions,
+    is_partition_name,
+    parse_range_partition,
+    partition_strategy,
+    range_partition_ddl,
+    range_partitions,
+)
+
+# Отдельная range-таблица: тестовая answers секционирована по настройке
+TABLE = "scratch_answers"
+
+
+def test_month_helpers() -> None:
+    """
+    Проверить арифметику месяцев, разбор имён секций и выбор устаревших.
+    """
+    assert add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert parse_range_partition("answers", "answers_y2026m03") == date(
+        2026, 3, 1
+    )
+    assert parse_range_partition("answers", "answers_default") is None
+    assert parse_range_partition("answers", "answers_old_y2026m03") is None
+    assert is_partition_name("answers", "answers_p07_pkey")
+    assert is_partition_name("answers", "answers_y2026m03")
+    assert not is_partition_name("answers", "answers_pkey")
+
+    partitions = [
+        (date(2026, 1, 1), "answers_y2026m01"),
+        (date(2026, 2, 1), "answers_y2026m02"),
+        (date(2026, 3, 1), "answers_y2026m03"),
+    ]
+    assert expired_partitions(
+        partitions, today=date(2026, 3, 15), retain=1
+    ) == ["answers_y2026m01"]
+
+
+def test_create_and_detach_partitions(sync_conn: Connection) -> None:
+    """
+    Проверить, что недостающие секции создаются наперёд, а отсоединение
+    секции пересчитывает answers_count и last_answer_at вопроса.
+    """
+    sync_conn.execute(
+        sa.text(
+            f"CREATE TABLE {TABLE} (question_id bigint NOT NULL, "
+            "created_at timestamptz NOT NULL) PARTITION BY RANGE (created_at)"
+        )
+    )
+    sync_conn.execute(sa.text(range_partition_ddl(TABLE, date(2026, 1, 1))))
+    assert partition_strategy(sync_conn, TABLE) == RANGE
+
+    created = create_future_partitions(
+        sync_conn, table=TABLE, today=date(2026, 2, 20), ahead=1
+    )
+    assert created == [f"{TABLE}_y2026m02", f"{TABLE}_y2026m03"]
+    assert not create_future_partitions(
+        sync_conn, table=TABLE, today=date(2026, 2, 20), ahead=1
+    )
+
+    question_id = sync_conn.execute(
+        sa.text(
+            "INSERT INTO questions (text, answers_count, last_answer_at) "
+            "VALUES ('Q', 2, '2026-02-10+00') RETURNING id"
+        )
+    ).scalar_one()
+    sync_conn.execute(
+        sa.text(
+            f"INSERT INTO {TABLE} VALUES "
+            "(:q, '2026-01-10+00'), (:q, '2026-02-10+00')"
+        ),
+        {"q": question_id},
+    )
+
+    touched = detach_partition(
+        sync_conn, table=TABLE, partition=f"{TABLE}_y2026m01", drop=True
+    )
+    assert touched == 1
+    assert [name for _, name in range_partitions(sync_conn, TABLE)] == [
+        f"{TABLE}_y2026m02",
+        f"{TABLE}_y2026m03",
+    ]
+    count, last_answer_at = sync_conn.execute(
+        sa.text(
+            "SELECT answers_count, last_answer_at FROM questions WHERE id = :q"
+        ),
+        {"q": question_id},
+    ).one()
+    assert count == 1
+    assert last_answer_at.date() == date(2026, 2, 10)
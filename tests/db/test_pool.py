@@ -0,0 +1,99 @@
+"""
+Тесты инструментирования пула: счётчики выдач/возвратов и таймаутов;
+размер пула воркера при общем бюджете соединений.
+"""
+
+from __future__ import annotations
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.pool import QueuePool
+
+from app.db.pool import (
+    PoolStats,
+    instrument_engine,
+    instrumented_pool_class,
+    worker_pool_limits,
+)
+
+
+def test_pool_stats_counts_checkouts_and_timeouts(
+    test_database_url: str,
+) -> None:
+    """
+    Проверить учёт выдач, возвратов, новых соединений и таймаута
+    при исчерпании пула.
+    """
+    stats = PoolStats()
+    engine = sa.create_engine(
+        test_database_url,
+        poolclass=instrumented_pool_class(QueuePool, stats),
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+    instrument_engine(engine, stats)
+    try:
+        with engine.connect() as conn:
+            conn.execute(sa.text("SELECT 1"))
+            with pytest.raises(sa.exc.TimeoutError):
+                engine.connect()
+            snap = stats.snapshot(engine.pool)
+            assert snap["checkedout"] == 1
+            assert snap["overflow"] == 0
+
+        with engine.connect():
+            pass
+
+        snap = stats.snapshot(engine.pool)
+        assert snap["checkouts"] == 2
+        assert snap["checkins"] == 2
+        assert snap["connects"] == 1
+        assert snap["timeouts"] == 1
+        assert snap["checked_out_max"] == 1
+        assert snap["wait_seconds_max"] >= 0.1
+        assert snap["pool_class"] == "InstrumentedQueuePool"
+    finally:
+        engine.dispose()
+
+
+@pytest.mark.parametrize(
+    "pool_size, max_overflow, max_connections, workers, expected",
+    [
+        (10, 20, None, 8, (10, 20)),
+        (10, 20, 80, 4, (10, 10)),
+        (10, 20, 80, 8, (10, 0)),
+        (10, 20, 30, 4, (7, 0)),
+        (10, -1, 80, 2, (10, 30)),
+        (5, 0, 4, 4, (1, 0)),
+    ],
+)
+def test_worker_pool_limits(
+    pool_size: int,
+    max_overflow: int,
+    max_connections: int,
+    workers: int,
+    expected: tuple,
+) -> None:
+    """
+    Проверить, что пул воркера не превышает его доли бюджета: сначала
+    урезается max_overflow, затем pool_size; без бюджета — как в
+    настройках.
+    """
+    assert (
+        worker_pool_limits(
+            pool_size,
+            max_overflow,
+            max_connections=max_connections,
+            workers=workers,
+        )
+        == expected
+    )
+
+
+def test_worker_pool_limits_budget_too_small() -> None:
+    """
+    Проверить ошибку, если бюджета не хватает на соединение на воркер.
+    """
+    with pytest.raises(ValueError):
+        worker_pool_limits(5, 10, max_connections=3, workers=4)
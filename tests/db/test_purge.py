@@ -0,0 +1,119 @@
+"""
+Тесты фоновой очистки удалённых вопросов: удаление ответов пачками,
+затем строки вопроса; прогресс в stats(); параллельные очистки одного
+вопроса.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from typing import AsyncIterator
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.core.config import to_async_url
+from app.crud import answer as a_crud
+from app.crud import question as q_crud
+from app.db.purge import QuestionPurger
+from app.models.answer import Answer
+from app.models.question import Question
+
+pytestmark = pytest.mark.anyio
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+
+
+def _purger(db_session: AsyncSession, **options) -> QuestionPurger:
+    """Очистка, работающая в транзакционной сессии теста."""
+
+    @contextlib.asynccontextmanager
+    async def session_factory() -> AsyncIterator[AsyncSession]:
+        yield db_session
+
+    return QuestionPurger(session_factory, **options)
+
+
+async def test_purge_deletes_answers_in_batches(
+    db_session: AsyncSession,
+) -> None:
+    """
+    Проверить, что очистка удаляет ответы удалённого вопроса пачками,
+    затем сам вопрос, и не трогает живые вопросы.
+    """
+    deleted = await q_crud.create_question(db_session, text="Deleted")
+    alive = await q_crud.create_question(db_session, text="Alive")
+    for question in (deleted, alive):
+        await a_crud.create_answers_bulk(
+            db_session,
+            question_id=question.id,
+            items=[{"user_id": USER_ID, "text": f"A{i}"} for i in range(5)],
+        )
+    assert await q_crud.delete_question(db_session, deleted.id)
+    assert not await q_crud.delete_question(db_session, deleted.id)
+    await db_session.commit()
+
+    purger = _purger(db_session, batch_size=2)
+    assert await purger.purge_pending() == 1
+    assert await purger.purge_pending() == 0
+
+    stats = purger.stats()
+    assert stats["batches"] == 3
+    assert stats["answers_purged"] == 5
+    assert stats["questions_purged"] == 1
+    assert stats["current_question_id"] is None
+    assert stats["pending_questions"] == 0
+
+    remaining = await db_session.scalar(
+        select(func.count()).where(Answer.question_id == deleted.id)
+    )
+    assert remaining == 0
+    assert await db_session.get(Question, deleted.id) is None
+    alive_row = await q_crud.get_question_row(db_session, alive.id)
+    assert alive_row.answers_count == 5
+
+
+async def test_concurrent_purgers_delete_in_batches(
+    test_database_url: str,
+) -> None:
+    """
+    Проверить, что две очистки одного вопроса удаляют все ответы
+    пачками (каскад внешнего ключа не удаляет ни одного) и строку
+    вопроса удаляет ровно одна из них.
+    """
+    engine = create_async_engine(to_async_url(test_database_url))
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        async with sessions() as db:
+            question = await q_crud.create_question(db, text="Deleted")
+            await a_crud.create_answers_bulk(
+                db,
+                question_id=question.id,
+                items=[
+                    {"user_id": USER_ID, "text": f"A{i}"} for i in range(400)
+                ],
+            )
+            assert await q_crud.delete_question(db, question.id)
+            await db.commit()
+
+        purgers = [
+            QuestionPurger(sessions, batch_size=20, batch_pause=0.001)
+            for _ in range(2)
+        ]
+        await asyncio.gather(
+            *(purger.purge_question(question.id) for purger in purgers)
+        )
+
+        assert sum(p.answers_purged for p in purgers) == 400
+        assert all(p.answers_purged > 0 for p in purgers)
+        assert sum(p.questions_purged for p in purgers) == 1
+        async with sessions() as db:
+            assert await db.get(Question, question.id) is None
+    finally:
+        await engine.dispose()
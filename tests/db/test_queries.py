@@ -0,0 +1,54 @@
+"""
+Тесты учёта SQL-запросов: счётчики track_queries() и журнал медленных
+запросов с EXPLAIN (ANALYZE, BUFFERS).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import to_async_url
+from app.db.queries import SlowQueryLog, instrument_queries, track_queries
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_track_and_explain_slow_queries(
+    test_database_url: str, caplog: pytest.LogCaptureFixture
+) -> None:
+    """
+    Проверить подсчёт повторов одного текста SQL и то, что для
+    медленного запроса снимается один план (повтор — в пределах
+    explain_cooldown), не попадающий в счётчики HTTP-запроса.
+    """
+    engine = create_async_engine(
+        to_async_url(test_database_url), poolclass=NullPool
+    )
+    slow_log = SlowQueryLog(0.0, explain_sample_rate=1.0)
+    instrument_queries(engine.sync_engine, slow_log)
+    try:
+        with caplog.at_level(logging.WARNING, logger="app.db.queries"):
+            with track_queries() as stats:
+                async with engine.connect() as conn:
+                    stmt = sa.text("SELECT :i AS n").bindparams(
+                        sa.bindparam("i", type_=sa.Integer)
+                    )
+                    for i in range(3):
+                        await conn.execute(stmt, {"i": i})
+                await asyncio.gather(*slow_log.pending)
+    finally:
+        await engine.dispose()
+
+    assert stats.statements == 3
+    statement, count = stats.most_repeated()
+    assert count == 3 and "SELECT" in statement
+    assert slow_log.slow_queries == 3
+    assert slow_log.explained == 1
+    assert "slow query" in caplog.text
+    assert "Execution Time" in caplog.text
@@ -0,0 +1,84 @@
+"""
+Тесты маршрутизации чтения на реплики: round-robin, fallback на primary,
+health-check и окно read-your-writes.
+"""
+
+from __future__ import annotations
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import to_async_url
+from app.db.replicas import ReplicaRouter, within_write_window
+
+DEAD_URL = "postgresql+asyncpg://u:p@127.0.0.1:1/db"
+
+
+def test_pick_round_robin_skips_unhealthy() -> None:
+    """
+    Проверить, что реплики выбираются по кругу, нездоровые пропускаются,
+    а без здоровых реплик и в окне read-your-writes выбирается primary.
+    """
+    primary, r1, r2 = (create_async_engine(DEAD_URL) for _ in range(3))
+    router = ReplicaRouter(primary, [r1, r2])
+
+    assert [router.pick() for _ in range(4)] == [r1, r2, r1, r2]
+    assert router.pick(prefer_primary=True) is primary
+
+    router.mark(r1, False)
+    assert [router.pick() for _ in range(2)] == [r2, r2]
+
+    router.mark(r2, False)
+    assert router.pick() is primary
+
+
+def test_pick_without_replicas_returns_primary() -> None:
+    """
+    Проверить, что без реплик всегда выбирается primary.
+    """
+    primary = create_async_engine(DEAD_URL)
+    assert ReplicaRouter(primary, []).pick() is primary
+
+
+@pytest.mark.anyio
+async def test_health_check_marks_replicas(test_database_url: str) -> None:
+    """
+    Проверить, что недоступная реплика помечается нездоровой,
+    а доступная — здоровой.
+    """
+    alive = create_async_engine(
+        to_async_url(test_database_url), poolclass=NullPool
+    )
+    dead = create_async_engine(DEAD_URL, poolclass=NullPool)
+    router = ReplicaRouter(
+        create_async_engine(DEAD_URL), [alive, dead], check_timeout=1.0
+    )
+
+    await router.check_all()
+    assert router.is_healthy(alive)
+    assert not router.is_healthy(dead)
+    assert [router.pick() for _ in range(2)] == [alive, alive]
+    await alive.dispose()
+
+
+@pytest.mark.parametrize(
+    "cookie, expected",
+    [
+        (None, False),
+        ("garbage", False),
+        ("995.0", True),
+        ("1000.0", True),
+        ("1001.5", True),
+        ("1010.0", False),
+        ("inf", False),
+        ("nan", False),
+        ("980.0", False),
+    ],
+)
+def test_within_write_window(cookie: str | None, expected: bool) -> None:
+    """
+    Проверить окно read-your-writes (5 секунд, «сейчас» = 1000):
+    время из будущего дальше MAX_CLOCK_SKEW окном не считается.
+    """
+    assert within_write_window(cookie, 5.0, now=1000.0) is expected
@@ -4,40 +4,282 @@ API-тесты ответов: 404 при несуществующем вопр
 
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+import contextlib
+from typing import Any, AsyncIterator
 
-from fastapi.testclient import TestClient
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.db import dependences as app_deps
+from app.db.dependences import get_answer_ingest
+from app.db.ingest import AnswerIngestQueue
+from app.db.replicas import LAST_WRITE_COOKIE, ReplicaRouter
+from app.main import app
 
-def test_create_answer_to_missing_question_returns_404(
-    client: TestClient,
+pytestmark = pytest.mark.anyio
+
+
+async def test_create_answer_to_missing_question_returns_404(
+    client: httpx.AsyncClient,
 ) -> None:
     """
     Проверить 404 при создании ответа на несуществующий вопрос.
     """
-    r = client.post(
+    r = await client.post(
         "/questions/999999/answers/", json={"user_id": "u", "text": "A"}
     )
     assert r.status_code == 404
 
 
-def test_get_and_delete_answer(client: TestClient) -> None:
+async def test_get_and_delete_answer(client: httpx.AsyncClient) -> None:
     """
     Проверить создание, чтение и удаление ответа.
     """
-    q = client.post("/questions/", json={"text": "Q"}).json()
-    a = client.post(
+    q = (await client.post("/questions/", json={"text": "Q"})).json()
+    r = await client.post(
         f"/questions/{q['id']}/answers/",
         json={"user_id": "u", "text": "A"},
-    ).json()
+    )
+    a = r.json()
 
-    r = client.get(f"/answers/{a['id']}")
+    r = await client.get(f"/answers/{a['id']}")
     assert r.status_code == 200
     fetched: dict[str, Any] = r.json()
     assert fetched["text"] == "A"
 
-    r = client.delete(f"/answers/{a['id']}")
+    r = await client.delete(f"/answers/{a['id']}")
     assert r.status_code == 204
 
-    r = client.get(f"/answers/{a['id']}")
+    r = await client.get(f"/answers/{a['id']}")
+    assert r.status_code == 404
+
+
+async def test_list_answers_for_question_pagination(
+    client: httpx.AsyncClient,
+) -> None:
+    """
+    Проверить постраничную выдачу ответов: порядок создания, отсутствие
+    пересечений и X-Next-Cursor только при наличии следующей страницы.
+    """
+    q = (await client.post("/questions/", json={"text": "Q"})).json()
+    created_ids = []
+    for i in range(5):
+        r = await client.post(
+            f"/questions/{q['id']}/answers/",
+            json={"user_id": "u", "text": f"A{i}"},
+        )
+        created_ids.append(r.json()["id"])
+
+    r = await client.get(f"/questions/{q['id']}/answers", params={"limit": 3})
+    assert r.status_code == 200, r.text
+    first = [a["id"] for a in r.json()]
+    cursor = r.headers["X-Next-Cursor"]
+
+    r = await client.get(
+        f"/questions/{q['id']}/answers",
+        params={"limit": 3, "cursor": cursor},
+    )
+    assert r.status_code == 200, r.text
+    second = [a["id"] for a in r.json()]
+    assert "X-Next-Cursor" not in r.headers
+
+    assert first + second == created_ids
+
+
+async def test_list_answers_for_missing_question_returns_404(
+    client: httpx.AsyncClient,
+) -> None:
+    """
+    Проверить 404 при запросе ответов несуществующего вопроса.
+    """
+    r = await client.get("/questions/999999/answers")
+    assert r.status_code == 404
+
+
+async def test_get_answer_cache_headers(client: httpx.AsyncClient) -> None:
+    """
+    Проверить Cache-Control и 304 по ETag для неизменяемого ответа.
+    """
+    q = (await client.post("/questions/", json={"text": "Q"})).json()
+    a = (
+        await client.post(
+            f"/questions/{q['id']}/answers/",
+            json={"user_id": "u", "text": "A"},
+        )
+    ).json()
+
+    r = await client.get(f"/answers/{a['id']}")
+    assert r.headers["Cache-Control"].startswith("public, max-age=")
+    etag = r.headers["ETag"]
+
+    r = await client.get(
+        f"/answers/{a['id']}", headers={"If-None-Match": f"W/{etag}"}
+    )
+    assert r.status_code == 304
+
+
+async def test_bulk_create_answers_reports_invalid_items(
+    client: httpx.AsyncClient,
+) -> None:
+    """
+    Проверить массовую загрузку: валидные ответы созданы в порядке входа,
+    невалидные отклонены с индексами.
+    """
+    q = (await client.post("/questions/", json={"text": "Q"})).json()
+    payload = [
+        {"user_id": "u1", "text": "A1"},
+        {"user_id": "u2", "text": "   "},
+        {"user_id": "u3"},
+        {"user_id": "u4", "text": "A4"},
+    ]
+    r = await client.post(f"/questions/{q['id']}/answers/bulk", json=payload)
+    assert r.status_code == 200, r.text
+    data: dict[str, Any] = r.json()
+    assert [a["text"] for a in data["created"]] == ["A1", "A4"]
+    assert all(a["question_id"] == q["id"] for a in data["created"])
+    assert [e["index"] for e in data["errors"]] == [1, 2]
+
+    r = await client.get(f"/questions/{q['id']}/answers")
+    assert [a["text"] for a in r.json()] == ["A1", "A4"]
+
+
+async def test_bulk_create_answers_missing_question_returns_404(
+    client: httpx.AsyncClient,
+) -> None:
+    """
+    Проверить 404 при массовой загрузке к несуществующему вопросу.
+    """
+    r = await client.post(
+        "/questions/999999/answers/bulk", json=[{"user_id": "u", "text": "A"}]
+    )
+    assert r.status_code == 404
+
+
+@pytest.fixture()
+def ingest_gate() -> asyncio.Event:
+    """Пока событие сброшено, писатель очереди ждёт перед записью группы."""
+    gate = asyncio.Event()
+    gate.set()
+    return gate
+
+
+@pytest.fixture()
+async def ingest_queue(
+    client: httpx.AsyncClient,
+    db_session: AsyncSession,
+    ingest_gate: asyncio.Event,
+) -> AsyncIterator[AnswerIngestQueue]:
+    """
+    Запущенная очередь записи ответов поверх транзакционной сессии
+    теста, подставленная в get_answer_ingest.
+    """
+
+    @contextlib.asynccontextmanager
+    async def session_factory() -> AsyncIterator[AsyncSession]:
+        await ingest_gate.wait()
+        yield db_session
+
+    queue = AnswerIngestQueue(session_factory, max_size=1, max_delay=0)
+    app.dependency_overrides[get_answer_ingest] = lambda: queue
+    queue.start()
+    yield queue
+    ingest_gate.set()
+    await queue.stop(timeout=5)
+
+
+async def test_create_answer_async_ingest(
+    client: httpx.AsyncClient,
+    ingest_queue: AnswerIngestQueue,
+    ingest_gate: asyncio.Event,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Проверить режим async: 202 с tracking_id, 503 с Retry-After при
+    заполненной очереди и статус после записи группы.
+    """
+    monkeypatch.setattr(settings, "answer_ingest_mode", "async")
+    q = (await client.post("/questions/", json={"text": "Q"})).json()
+    url = f"/questions/{q['id']}/answers/"
+
+    # Писатель забирает первый ответ и ждёт; второй занимает очередь
+    ingest_gate.clear()
+    r = await client.post(url, json={"user_id": "u", "text": "A"})
+    assert r.status_code == 202, r.text
+    accepted = [r.json()]
+    assert accepted[0]["status"] == "queued"
+    while ingest_queue.stats()["queued"]:
+        await asyncio.sleep(0.001)
+    r = await client.post(url, json={"user_id": "u", "text": "B"})
+    assert r.status_code == 202, r.text
+    accepted.append(r.json())
+    r = await client.post(url, json={"user_id": "u", "text": "C"})
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "1"
+
+    ingest_gate.set()
+    await ingest_queue.stop(timeout=5)
+    for item, text in zip(accepted, ("A", "B")):
+        r = await client.get(f"/answers/ingest/{item['tracking_id']}")
+        assert r.status_code == 200, r.text
+        status = r.json()
+        assert status["status"] == "committed"
+        r = await client.get(f"/answers/{status['answer_id']}")
+        assert r.json()["text"] == text
+
+    r = await client.get("/answers/ingest/unknown")
+    assert r.status_code == 404
+
+
+async def test_create_answer_async_ingest_sets_write_cookie(
+    client: httpx.AsyncClient,
+    db_session: AsyncSession,
+    ingest_queue: AnswerIngestQueue,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Проверить, что 202 режима async при настроенных репликах несёт
+    cookie read-your-writes: следующие чтения клиента идут на primary.
+    """
+    monkeypatch.setattr(settings, "answer_ingest_mode", "async")
+    q = (await client.post("/questions/", json={"text": "Q"})).json()
+    engine = db_session.bind.engine
+    monkeypatch.setattr(
+        app_deps, "replica_router", ReplicaRouter(engine, [engine])
+    )
+    # Настоящий get_uow: в режиме очереди он не открывает соединение
+    monkeypatch.delitem(app.dependency_overrides, app_deps.get_uow)
+
+    r = await client.post(
+        f"/questions/{q['id']}/answers/", json={"user_id": "u", "text": "A"}
+    )
+    assert r.status_code == 202, r.text
+    assert LAST_WRITE_COOKIE in r.cookies
+
+
+async def test_create_answer_sync_ingest(
+    client: httpx.AsyncClient,
+    ingest_queue: AnswerIngestQueue,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Проверить режим sync: 201 с ответом после коммита группы и 404 для
+    несуществующего вопроса.
+    """
+    monkeypatch.setattr(settings, "answer_ingest_mode", "sync")
+    q = (await client.post("/questions/", json={"text": "Q"})).json()
+
+    r = await client.post(
+        f"/questions/{q['id']}/answers/", json={"user_id": "u", "text": "A"}
+    )
+    assert r.status_code == 201, r.text
+    assert r.json()["question_id"] == q["id"]
+    r = await client.get(f"/questions/{q['id']}")
+    assert [a["text"] for a in r.json()["answers"]] == ["A"]
+
+    r = await client.post(
+        "/questions/999999/answers/", json={"user_id": "u", "text": "A"}
+    )
     assert r.status_code == 404
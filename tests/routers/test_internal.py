@@ -0,0 +1,177 @@
+"""
+API-тесты внутренних эндпоинтов: статистика пула соединений, выгрузка,
+метрики Prometheus.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.metrics import db_statements, http_latency, http_requests
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_pool_stats_endpoint(
+    client: httpx.AsyncClient, internal_headers: dict[str, str]
+) -> None:
+    """
+    Проверить, что GET /internal/pool отдаёт состояние пула и счётчики.
+    """
+    r = await client.get("/internal/pool", headers=internal_headers)
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["pool_class"] == "InstrumentedAsyncAdaptedQueuePool"
+    assert {"checkouts", "timeouts", "wait_seconds_max"} <= data.keys()
+
+
+async def test_internal_routes_require_token(
+    client: httpx.AsyncClient, internal_headers: dict[str, str]
+) -> None:
+    """
+    Проверить, что служебные маршруты без токена, с чужим токеном и при
+    незаданном INTERNAL_TOKEN отвечают 404, а с токеном — 200.
+    """
+    for path in ("/internal/pool", "/internal/export"):
+        r = await client.get(path)
+        assert r.status_code == 404, path
+        r = await client.get(path, headers={"X-Internal-Token": "wrong"})
+        assert r.status_code == 404, path
+        r = await client.get(path, headers=internal_headers)
+        assert r.status_code == 200, path
+
+    settings.internal_token = None
+    r = await client.get("/internal/pool", headers=internal_headers)
+    assert r.status_code == 404
+
+
+async def test_export_streams_ndjson(
+    client: httpx.AsyncClient, internal_headers: dict[str, str]
+) -> None:
+    """
+    Проверить, что GET /internal/export без токена недоступен, а с ним
+    отдаёт вопросы, затем ответы, и с gzip=true — корректный gzip-поток.
+    """
+    q = (await client.post("/questions/", json={"text": "Export me"})).json()
+    user_id = "00000000-0000-0000-0000-000000000001"
+    r = await client.post(
+        f"/questions/{q['id']}/answers/",
+        json={"user_id": user_id, "text": "Exported answer"},
+    )
+    assert r.status_code == 201, r.text
+
+    r = await client.get("/internal/export")
+    assert r.status_code == 404
+
+    r = await client.get("/internal/export", headers=internal_headers)
+    assert r.status_code == 200, r.text
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in r.text.splitlines()]
+    types = [rec["type"] for rec in records]
+    assert types == sorted(types, key=lambda t: t != "question")
+    assert {
+        "type": "question",
+        "id": q["id"],
+        "text": "Export me",
+    }.items() <= next(rec for rec in records if rec["id"] == q["id"]).items()
+    assert any(
+        rec["type"] == "answer" and rec["user_id"] == user_id
+        for rec in records
+    )
+
+    r = await client.get(
+        "/internal/export", params={"gzip": "true"}, headers=internal_headers
+    )
+    assert r.status_code == 200, r.text
+    assert r.headers["content-type"] == "application/gzip"
+    assert gzip.decompress(r.content).splitlines() == [
+        json.dumps(rec, ensure_ascii=False).encode() for rec in records
+    ]
+
+
+async def test_metrics_endpoint(client: httpx.AsyncClient) -> None:
+    """
+    Проверить, что запрос учитывается по шаблону маршрута вместе с
+    числом его SQL-запросов, а GET /metrics отдаёт текстовый формат.
+    """
+    q = (await client.post("/questions/", json={"text": "Metrics"})).json()
+    labels = ("GET", "/questions/{question_id}")
+    requests_before = http_requests.value(*labels, "200")
+    statements_before = db_statements.count(*labels)
+
+    r = await client.get(f"/questions/{q['id']}")
+    assert r.status_code == 200, r.text
+    assert http_requests.value(*labels, "200") == requests_before + 1
+    assert http_latency.count(*labels) >= 1
+    assert db_statements.count(*labels) == statements_before + 1
+
+    await client.get("/no/such/route")
+    assert http_requests.value("GET", "<unmatched>", "404") >= 1
+
+    r = await client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert (
+        'http_request_db_statements_count{method="GET",'
+        'route="/questions/{question_id}"}'
+    ) in r.text
+    assert "# TYPE db_pool_checkouts_total counter" in r.text
+
+
+async def test_profile_endpoints(
+    client: httpx.AsyncClient,
+    internal_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Проверить, что профиль GET /questions/{id} с его SQL-запросами
+    доступен через GET /internal/profiles только с PROFILING_TOKEN и
+    при включённом профилировании.
+    """
+    q = (await client.post("/questions/", json={"text": "Profile"})).json()
+    monkeypatch.setattr(settings, "profiling_enabled", True)
+    monkeypatch.setattr(settings, "profiling_token", "secret")
+    r = await client.get(
+        f"/questions/{q['id']}", headers={"X-Profile": "secret"}
+    )
+    assert r.status_code == 200, r.text
+    profile_id = r.headers["x-profile-id"]
+    headers = {**internal_headers, "X-Profiling-Token": "secret"}
+
+    r = await client.get("/internal/profiles", headers=headers)
+    assert r.status_code == 200, r.text
+    summary = next(p for p in r.json() if p["id"] == profile_id)
+    assert summary["route"] == "/questions/{question_id}"
+    assert summary["sql_statements"] >= 1
+
+    r = await client.get(f"/internal/profiles/{profile_id}", headers=headers)
+    assert r.status_code == 200, r.text
+    assert [p["type"] for p in r.json()["profiles"]] == ["sampled", "evented"]
+
+    r = await client.get(
+        f"/internal/profiles/{profile_id}",
+        params={"format": "collapsed"},
+        headers=headers,
+    )
+    assert r.status_code == 200, r.text
+    assert r.headers["content-type"].startswith("text/plain")
+
+    r = await client.get("/internal/profiles/missing", headers=headers)
+    assert r.status_code == 404
+
+    # Без токена профилирования и при выключенном профилировании — 404
+    for path in ("/internal/profiles", f"/internal/profiles/{profile_id}"):
+        r = await client.get(path, headers=internal_headers)
+        assert r.status_code == 404, path
+        r = await client.get(
+            path, headers={**internal_headers, "X-Profiling-Token": "bad"}
+        )
+        assert r.status_code == 404, path
+    monkeypatch.setattr(settings, "profiling_enabled", False)
+    r = await client.get("/internal/profiles", headers=headers)
+    assert r.status_code == 404
@@ -6,36 +6,41 @@ from __future__ import annotations
 
 from typing import Any
 
-from fastapi.testclient import TestClient
+import httpx
+import pytest
 
+from app.core.cache import response_cache
 
-def test_create_and_list_questions(client: TestClient) -> None:
+pytestmark = pytest.mark.anyio
+
+
+async def test_create_and_list_questions(client: httpx.AsyncClient) -> None:
     """
     Проверить создание вопроса и наличие в списке.
     """
-    r = client.post("/questions/", json={"text": "Ваш любимый язык?"})
+    r = await client.post("/questions/", json={"text": "Ваш любимый язык?"})
     assert r.status_code == 201, r.text
     created: dict[str, Any] = r.json()
     assert created["text"] == "Ваш любимый язык?"
 
-    r = client.get("/questions/")
+    r = await client.get("/questions/")
     assert r.status_code == 200
     items: list[dict[str, Any]] = r.json()
     assert any(i["id"] == created["id"] for i in items)
 
 
-def test_get_question_with_answers(client: TestClient) -> None:
+async def test_get_question_with_answers(client: httpx.AsyncClient) -> None:
     """
     Проверить детальный GET вопроса с вложенными ответами.
     """
-    q = client.post("/questions/", json={"text": "Q1"}).json()
-    a_resp = client.post(
+    q = (await client.post("/questions/", json={"text": "Q1"})).json()
+    a_resp = await client.post(
         f"/questions/{q['id']}/answers/",
         json={"user_id": "firstuser", "text": "A1"},
     )
     assert a_resp.status_code == 201, a_resp.text
 
-    r = client.get(f"/questions/{q['id']}")
+    r = await client.get(f"/questions/{q['id']}")
     assert r.status_code == 200
     data: dict[str, Any] = r.json()
     assert data["id"] == q["id"]
@@ -43,20 +48,412 @@ def test_get_question_with_answers(client: TestClient) -> None:
     assert len(data["answers"]) == 1
 
 
-def test_delete_question_cascade(client: TestClient) -> None:
+async def test_delete_question_cascade(client: httpx.AsyncClient) -> None:
     """
-    Проверить каскадное удаление ответов при удалении вопроса.
+    Проверить, что удалённый вопрос и его ответы сразу пропадают из
+    выдачи (строки удаляет фоновая очистка).
     """
-    q = client.post("/questions/", json={"text": "Q2"}).json()
-    client.post(
+    q = (await client.post("/questions/", json={"text": "Q2"})).json()
+    await client.post(
         f"/questions/{q['id']}/answers/", json={"user_id": "u1", "text": "A1"}
     )
-    client.post(
+    r = await client.post(
         f"/questions/{q['id']}/answers/", json={"user_id": "u2", "text": "A2"}
     )
+    answer = r.json()
 
-    r = client.delete(f"/questions/{q['id']}")
+    r = await client.delete(f"/questions/{q['id']}")
     assert r.status_code == 204
 
-    r = client.get(f"/questions/{q['id']}")
+    r = await client.get(f"/questions/{q['id']}")
+    assert r.status_code == 404
+    r = await client.get("/questions/")
+    assert q["id"] not in {i["id"] for i in r.json()}
+    assert (await client.get(f"/answers/{answer['id']}")).status_code == 404
+    r = await client.get(f"/questions/{q['id']}/answers")
+    assert r.status_code == 404
+    r = await client.post(
+        f"/questions/{q['id']}/answers/", json={"user_id": "u1", "text": "A3"}
+    )
+    assert r.status_code == 404
+    r = await client.get("/users/u1/answers")
+    assert r.json() == []
+    assert (await client.delete(f"/questions/{q['id']}")).status_code == 404
+
+
+async def test_list_questions_cursor_pagination(
+    client: httpx.AsyncClient,
+) -> None:
+    """
+    Проверить keyset-пагинацию: страницы не пересекаются, порядок
+    сохраняется, на последней странице нет X-Next-Cursor.
+    """
+    created_ids = []
+    for i in range(5):
+        r = await client.post("/questions/", json={"text": f"Q{i}"})
+        created_ids.append(r.json()["id"])
+
+    seen: list[int] = []
+    r = await client.get("/questions/", params={"limit": 2})
+    while True:
+        assert r.status_code == 200, r.text
+        seen.extend(i["id"] for i in r.json())
+        cursor = r.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        r = await client.get(
+            "/questions/", params={"limit": 2, "cursor": cursor}
+        )
+
+    ours = [i for i in seen if i in created_ids]
+    assert ours == sorted(created_ids, reverse=True)
+    assert len(seen) == len(set(seen))
+
+
+async def test_list_questions_invalid_cursor_and_limit(
+    client: httpx.AsyncClient,
+) -> None:
+    """
+    Проверить 400 на битый курсор и 422 на превышение лимита.
+    """
+    r = await client.get("/questions/", params={"cursor": "garbage"})
+    assert r.status_code == 400
+
+    r = await client.get("/questions/", params={"limit": 100000})
+    assert r.status_code == 422
+
+
+async def test_get_question_answers_are_paginated(
+    client: httpx.AsyncClient,
+) -> None:
+    """
+    Проверить, что деталка отдаёт ограниченную страницу ответов
+    и курсор, по которому читается продолжение.
+    """
+    q = (await client.post("/questions/", json={"text": "Q"})).json()
+    for i in range(3):
+        await client.post(
+            f"/questions/{q['id']}/answers/",
+            json={"user_id": "u", "text": f"A{i}"},
+        )
+
+    r = await client.get(f"/questions/{q['id']}", params={"answers_limit": 2})
+    assert r.status_code == 200, r.text
+    data: dict[str, Any] = r.json()
+    assert [a["text"] for a in data["answers"]] == ["A0", "A1"]
+    assert data["answers_next_cursor"]
+
+    r = await client.get(
+        f"/questions/{q['id']}",
+        params={
+            "answers_limit": 2,
+            "answers_cursor": data["answers_next_cursor"],
+        },
+    )
+    data = r.json()
+    assert [a["text"] for a in data["answers"]] == ["A2"]
+    assert data["answers_next_cursor"] is None
+
+
+async def test_get_question_invalid_answers_cursor(
+    client: httpx.AsyncClient,
+) -> None:
+    """
+    Проверить, что пустой и испорченный курсор ответов дают 400, а не
+    первую страницу.
+    """
+    q = (await client.post("/questions/", json={"text": "Q"})).json()
+    for cursor in ("", "garbage"):
+        r = await client.get(
+            f"/questions/{q['id']}", params={"answers_cursor": cursor}
+        )
+        assert r.status_code == 400, cursor
+
+
+async def test_question_detail_cache_invalidated_on_write(
+    client: httpx.AsyncClient, internal_headers: dict[str, str]
+) -> None:
+    """
+    Проверить, что повторный GET деталки отдаётся из кэша, а новый ответ
+    и удаление вопроса сразу видны (инвалидация после коммита).
+    """
+    q = (await client.post("/questions/", json={"text": "Q"})).json()
+    await client.get(f"/questions/{q['id']}")
+    before = (
+        await client.get("/internal/cache", headers=internal_headers)
+    ).json()
+    r = await client.get(f"/questions/{q['id']}")
+    assert r.json()["answers"] == []
+    after = (
+        await client.get("/internal/cache", headers=internal_headers)
+    ).json()
+    assert after["hits"] == before["hits"] + 1
+
+    await client.post(
+        f"/questions/{q['id']}/answers/", json={"user_id": "u", "text": "A"}
+    )
+    r = await client.get(f"/questions/{q['id']}")
+    assert [a["text"] for a in r.json()["answers"]] == ["A"]
+
+    r = await client.get("/questions/")
+    assert any(i["id"] == q["id"] for i in r.json())
+    await client.delete(f"/questions/{q['id']}")
+    r = await client.get("/questions/")
+    assert all(i["id"] != q["id"] for i in r.json())
+    r = await client.get(f"/questions/{q['id']}")
+    assert r.status_code == 404
+
+
+async def test_question_etag_not_modified(client: httpx.AsyncClient) -> None:
+    """
+    Проверить 304 на совпадающий If-None-Match (в том числе без кэша)
+    и смену ETag после добавления ответа.
+    """
+    q = (await client.post("/questions/", json={"text": "Q"})).json()
+    r = await client.get(f"/questions/{q['id']}")
+    etag = r.headers["ETag"]
+    assert r.headers["Cache-Control"] == "no-cache"
+
+    r = await client.get(
+        f"/questions/{q['id']}", headers={"If-None-Match": etag}
+    )
+    assert r.status_code == 304
+    assert r.content == b""
+
+    response_cache.clear()
+    r = await client.get(
+        f"/questions/{q['id']}", headers={"If-None-Match": etag}
+    )
+    assert r.status_code == 304
+
+    r = await client.get(
+        f"/questions/{q['id']}",
+        params={"answers_limit": 5},
+        headers={"If-None-Match": etag},
+    )
+    assert r.status_code == 200
+
+    await client.post(
+        f"/questions/{q['id']}/answers/", json={"user_id": "u", "text": "A"}
+    )
+    r = await client.get(
+        f"/questions/{q['id']}", headers={"If-None-Match": etag}
+    )
+    assert r.status_code == 200
+    assert r.headers["ETag"] != etag
+
+
+async def test_question_etag_for_missing_question_returns_404(
+    client: httpx.AsyncClient,
+) -> None:
+    """
+    Проверить 404 на If-None-Match для несуществующего вопроса.
+    """
+    r = await client.get("/questions/999999", headers={"If-None-Match": "*"})
     assert r.status_code == 404
+
+
+async def test_bulk_create_questions(client: httpx.AsyncClient) -> None:
+    """
+    Проверить массовое создание вопросов и отчёт по невалидным элементам.
+    """
+    r = await client.post(
+        "/questions/bulk", json=[{"text": "B1"}, {"text": ""}, {"text": "B3"}]
+    )
+    assert r.status_code == 200, r.text
+    data: dict[str, Any] = r.json()
+    assert [q["text"] for q in data["created"]] == ["B1", "B3"]
+    assert [e["index"] for e in data["errors"]] == [1]
+    assert data["errors"][0]["errors"][0]["loc"] == ["text"]
+
+    r = await client.get("/questions/")
+    ids = {i["id"] for i in r.json()}
+    assert {q["id"] for q in data["created"]} <= ids
+
+
+async def test_list_questions_sorted_by_answers_count(
+    client: httpx.AsyncClient,
+) -> None:
+    """
+    Проверить счётчики ответов в списке, сортировку sort=answers_count
+    с keyset-пагинацией и инвалидацию списка при добавлении ответа.
+    """
+    ids = [
+        (await client.post("/questions/", json={"text": f"Q{i}"})).json()["id"]
+        for i in range(3)
+    ]
+    # Прогреваем кэш списка до записи ответов
+    await client.get("/questions/", params={"sort": "answers_count"})
+    for question_id, answers in zip(ids, (0, 2, 1)):
+        for n in range(answers):
+            r = await client.post(
+                f"/questions/{question_id}/answers/",
+                json={"user_id": "u", "text": f"A{n}"},
+            )
+            assert r.status_code == 201, r.text
+
+    seen: list[dict[str, Any]] = []
+    params: dict[str, Any] = {"sort": "answers_count", "limit": 2}
+    while True:
+        r = await client.get("/questions/", params=params)
+        assert r.status_code == 200, r.text
+        seen.extend(r.json())
+        if "X-Next-Cursor" not in r.headers:
+            break
+        params["cursor"] = r.headers["X-Next-Cursor"]
+
+    ours = [item for item in seen if item["id"] in ids]
+    assert [item["id"] for item in ours] == [ids[1], ids[2], ids[0]]
+    assert [item["answers_count"] for item in ours] == [2, 1, 0]
+    assert ours[0]["last_answer_at"] is not None
+    assert ours[2]["last_answer_at"] is None
+    assert len({item["id"] for item in seen}) == len(seen)
+
+
+async def test_list_questions_cursor_of_other_sort_rejected(
+    client: httpx.AsyncClient,
+) -> None:
+    """
+    Проверить, что курсор сортировки created_at не принимается для
+    sort=answers_count.
+    """
+    for i in range(2):
+        await client.post("/questions/", json={"text": f"Q{i}"})
+    r = await client.get("/questions/", params={"limit": 1})
+    cursor = r.headers["X-Next-Cursor"]
+
+    r = await client.get(
+        "/questions/", params={"sort": "answers_count", "cursor": cursor}
+    )
+    assert r.status_code == 400
+
+
+async def test_search_questions(client: httpx.AsyncClient) -> None:
+    """
+    Проверить полнотекстовый поиск: стемминг, совпадение по ответу,
+    экранированные фрагменты с подсветкой и keyset-пагинацию.
+    """
+    by_question = (
+        await client.post(
+            "/questions/", json={"text": "Как выучить Python & Django быстро?"}
+        )
+    ).json()
+    by_answer = (
+        await client.post("/questions/", json={"text": "С чего начать?"})
+    ).json()
+    await client.post(
+        f"/questions/{by_answer['id']}/answers/",
+        json={"user_id": "u", "text": "Учите Python по документации"},
+    )
+    await client.post("/questions/", json={"text": "Про Go и Rust"})
+
+    r = await client.get("/questions/search", params={"q": "python"})
+    assert r.status_code == 200, r.text
+    items = r.json()
+    assert {i["id"] for i in items} == {by_question["id"], by_answer["id"]}
+    snippets = {i["id"]: i["snippet"] for i in items}
+    assert "<mark>Python</mark> &amp; Django" in snippets[by_question["id"]]
+    assert "<mark>Python</mark>" in snippets[by_answer["id"]]
+
+    # Стемминг: «выучил» находит «выучить»
+    r = await client.get("/questions/search", params={"q": "выучил"})
+    assert [i["id"] for i in r.json()] == [by_question["id"]]
+
+    r = await client.get(
+        "/questions/search", params={"q": "python", "limit": 1}
+    )
+    first = r.json()
+    assert len(first) == 1
+    r = await client.get(
+        "/questions/search",
+        params={"q": "python", "cursor": r.headers["X-Next-Cursor"]},
+    )
+    rest = r.json()
+    assert [i["id"] for i in first + rest] == [i["id"] for i in items]
+    assert "X-Next-Cursor" not in r.headers
+
+    r = await client.get(
+        "/questions/search", params={"q": "python", "cursor": ""}
+    )
+    assert r.status_code == 400
+
+
+@pytest.mark.usefixtures("pg_trgm")
+async def test_similar_questions(client: httpx.AsyncClient) -> None:
+    """
+    Проверить поиск похожих вопросов: порядок по сходству и порог.
+    """
+    exact = (
+        await client.post(
+            "/questions/", json={"text": "Как установить Python на Windows?"}
+        )
+    ).json()
+    close = (
+        await client.post(
+            "/questions/", json={"text": "Как установить Python в Linux"}
+        )
+    ).json()
+    await client.post("/questions/", json={"text": "Рецепт борща"})
+
+    r = await client.get(
+        "/questions/similar",
+        params={"text": "как установить python на windows"},
+    )
+    assert r.status_code == 200, r.text
+    items = r.json()
+    assert [i["id"] for i in items] == [exact["id"], close["id"]]
+    assert items[0]["similarity"] > items[1]["similarity"]
+
+    r = await client.get(
+        "/questions/similar",
+        params={"text": "как установить python на windows", "limit": 1},
+    )
+    assert [i["id"] for i in r.json()] == [exact["id"]]
+
+
+@pytest.mark.usefixtures("pg_trgm")
+async def test_create_question_suggest_similar(
+    client: httpx.AsyncClient,
+) -> None:
+    """
+    Проверить suggest_similar: при похожих вопросах — 409 без записи,
+    без похожих или без флага — обычное создание.
+    """
+    existing = (
+        await client.post("/questions/", json={"text": "Что такое GIL?"})
+    ).json()
+
+    r = await client.post(
+        "/questions/",
+        params={"suggest_similar": True},
+        json={"text": "Что такое GIL в Python?"},
+    )
+    assert r.status_code == 409, r.text
+    body = r.json()
+    assert [i["id"] for i in body["similar"]] == [existing["id"]]
+    r = await client.get("/questions/")
+    assert [i["id"] for i in r.json()] == [existing["id"]]
+
+    r = await client.post(
+        "/questions/",
+        params={"suggest_similar": True},
+        json={"text": "Как работает asyncio?"},
+    )
+    assert r.status_code == 201, r.text
+
+    r = await client.post(
+        "/questions/", json={"text": "Что такое GIL в Python?"}
+    )
+    assert r.status_code == 201, r.text
+
+
+async def test_similar_questions_requires_text(
+    client: httpx.AsyncClient,
+) -> None:
+    """
+    Проверить валидацию параметра text.
+    """
+    r = await client.get("/questions/similar")
+    assert r.status_code == 422
+    r = await client.get("/questions/similar", params={"text": ""})
+    assert r.status_code == 422
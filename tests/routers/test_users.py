@@ -0,0 +1,96 @@
+"""
+API-тесты ответов пользователя: список с пагинацией и удаление пачками.
+"""
+
+from __future__ import annotations
+
+import uuid
+
+import httpx
+import pytest
+
+from app.core.config import settings
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_list_user_answers(client: httpx.AsyncClient) -> None:
+    """
+    Проверить список ответов пользователя: нормализация user_id в пути,
+    порядок (новые первыми) и keyset-пагинацию.
+    """
+    q1 = (await client.post("/questions/", json={"text": "Q1"})).json()
+    q2 = (await client.post("/questions/", json={"text": "Q2"})).json()
+    user_id = str(uuid.uuid4())
+    created = []
+    for i, q in enumerate((q1, q2, q1)):
+        r = await client.post(
+            f"/questions/{q['id']}/answers/",
+            json={"user_id": user_id, "text": f"A{i}"},
+        )
+        created.append(r.json())
+    await client.post(
+        f"/questions/{q1['id']}/answers/",
+        json={"user_id": "other", "text": "B"},
+    )
+
+    r = await client.get(
+        f"/users/{user_id.upper()}/answers", params={"limit": 2}
+    )
+    assert r.status_code == 200, r.text
+    first = r.json()
+    assert first[0] == created[-1]
+    r = await client.get(
+        f"/users/{user_id}/answers",
+        params={"limit": 2, "cursor": r.headers["X-Next-Cursor"]},
+    )
+    second = r.json()
+    assert "X-Next-Cursor" not in r.headers
+    assert [a["id"] for a in first + second] == [
+        a["id"] for a in reversed(created)
+    ]
+
+    # Произвольная строка приводится к тому же UUID5, что и в теле ответа
+    r = await client.get("/users/other/answers")
+    assert [a["text"] for a in r.json()] == ["B"]
+
+
+async def test_delete_user_answers_in_batches(
+    client: httpx.AsyncClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Проверить удаление всех ответов пользователя пачками: чужие ответы
+    остаются, счётчики вопросов пересчитаны, кэш деталки сброшен.
+    """
+    monkeypatch.setattr(settings, "user_answers_delete_batch", 2)
+    q1 = (await client.post("/questions/", json={"text": "Q1"})).json()
+    q2 = (await client.post("/questions/", json={"text": "Q2"})).json()
+    kept = (
+        await client.post(
+            f"/questions/{q1['id']}/answers/",
+            json={"user_id": "keep", "text": "K"},
+        )
+    ).json()
+    for q in (q1, q2, q1, q2, q1):
+        await client.post(
+            f"/questions/{q['id']}/answers/",
+            json={"user_id": "erase", "text": "E"},
+        )
+    r = await client.get(f"/questions/{q1['id']}")
+    assert len(r.json()["answers"]) == 4
+
+    r = await client.delete("/users/erase/answers")
+    assert r.status_code == 200, r.text
+    assert r.json() == {"deleted": 5}
+    assert (await client.get("/users/erase/answers")).json() == []
+
+    r = await client.get(f"/questions/{q1['id']}")
+    assert [a["id"] for a in r.json()["answers"]] == [kept["id"]]
+    items = {i["id"]: i for i in (await client.get("/questions/")).json()}
+    assert items[q1["id"]]["answers_count"] == 1
+    assert items[q1["id"]]["last_answer_at"] == kept["created_at"]
+    assert items[q2["id"]]["answers_count"] == 0
+    assert items[q2["id"]]["last_answer_at"] is None
+
+    r = await client.delete("/users/erase/answers")
+    assert r.json() == {"deleted": 0}
@@ -0,0 +1,84 @@
+"""
+Тесты быстрой сериализации строк: JSON совпадает с Pydantic-схемами
+ответа, а поля TypedDict — с полями схем.
+"""
+
+from __future__ import annotations
+
+from collections import namedtuple
+from datetime import datetime, timezone
+from typing import List
+
+import pytest
+from pydantic import BaseModel, TypeAdapter
+
+from app.schemas import rows
+from app.schemas.answer import AnswerOut, AnswerShortOut
+from app.schemas.question import (
+    QuestionDetail,
+    QuestionListItem,
+    QuestionSearchItem,
+)
+
+CREATED = datetime(2024, 1, 2, 3, 4, 5, 678000, tzinfo=timezone.utc)
+
+
+# namedtuple повторяет интерфейс sqlalchemy.Row: атрибуты и _asdict()
+QuestionRow = namedtuple(
+    "QuestionRow", "id text created_at answers_count last_answer_at"
+)
+QuestionVersionRow = namedtuple(
+    "QuestionVersionRow", "id text created_at version"
+)
+AnswerRow = namedtuple("AnswerRow", "id user_id text created_at")
+
+
+@pytest.mark.parametrize(
+    "row_type, model",
+    [
+        (rows.QuestionRow, QuestionListItem),
+        (rows.QuestionSearchRow, QuestionSearchItem),
+        (rows.AnswerShortRow, AnswerShortOut),
+        (rows.AnswerRow, AnswerOut),
+        (rows.QuestionDetailRow, QuestionDetail),
+    ],
+)
+def test_row_fields_match_models(row_type, model: type[BaseModel]) -> None:
+    """
+    Проверить, что TypedDict повторяет поля схемы ответа.
+    """
+    assert list(row_type.__annotations__) == list(model.model_fields)
+
+
+def test_dump_question_list_matches_model() -> None:
+    """
+    Проверить побайтное совпадение JSON списка вопросов.
+    """
+    items = [
+        QuestionRow(i, f"Вопрос {i}", CREATED, i, CREATED if i else None)
+        for i in (0, 2)
+    ]
+    expected = TypeAdapter(List[QuestionListItem]).dump_json(
+        [QuestionListItem.model_validate(r._asdict()) for r in items]
+    )
+    assert rows.dump_question_list(items) == expected
+
+
+def test_dump_question_detail_matches_model() -> None:
+    """
+    Проверить побайтное совпадение JSON деталки; лишние колонки
+    строки вопроса (version) в JSON не попадают.
+    """
+    question = QuestionVersionRow(1, "Q", CREATED, 3)
+    answers = [
+        AnswerRow(10, "00000000-0000-0000-0000-000000000001", "A", CREATED)
+    ]
+    expected = QuestionDetail(
+        id=1,
+        text="Q",
+        created_at=CREATED,
+        answers=[AnswerShortOut(**a._asdict()) for a in answers],
+        answers_next_cursor="abc",
+    ).model_dump_json()
+    body = rows.dump_question_detail(question, answers, "abc")
+    assert body == expected.encode()
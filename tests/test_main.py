@@ -0,0 +1,46 @@
+"""
+Тесты сборки приложения (app.main): импорт без побочных эффектов и
+фабрика create_app.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from app.db.base import get_database
+from app.main import create_app
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_import_has_no_side_effects(tmp_path: Path) -> None:
+    """
+    Проверить, что импорт app.main не читает настройки, не создаёт
+    движки и приложение: без DATABASE_URL он не падает.
+    """
+    code = (
+        "import app.main, app.core.config as c, app.db.base as b\n"
+        "assert c.get_settings.cache_info().currsize == 0\n"
+        "assert b.get_database.cache_info().currsize == 0\n"
+        "assert app.main._module_app.cache_info().currsize == 0\n"
+    )
+    env = {k: v for k, v in os.environ.items() if k != "DATABASE_URL"}
+    env["PYTHONPATH"] = str(ROOT)
+    # Вне корня репозитория: .env оттуда не читается
+    subprocess.run(
+        [sys.executable, "-c", code], env=env, cwd=tmp_path, check=True
+    )
+
+
+def test_create_app_shares_process_engines() -> None:
+    """
+    Проверить, что create_app сохраняет настройки и движки процесса в
+    app.state и не создаёт движки заново при повторной сборке.
+    """
+    first, second = create_app(), create_app()
+    assert first is not second
+    assert first.state.database is second.state.database is get_database()
+    assert first.state.settings is second.state.settings
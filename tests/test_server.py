@@ -0,0 +1,196 @@
+"""
+Тесты production-сервера (app.server): проверка живости воркера,
+перезапуск с сохранением номера, закрытие сокета родителя и пауза
+перед остановкой по SIGTERM, лимит запросов с разбросом и выбор числа
+воркеров.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Iterator, List, Optional
+
+import pytest
+import uvicorn
+from uvicorn.supervisors.multiprocess import SIGNALS
+
+from app.core.config import settings
+from app.server import (
+    WORKER_ID_ENV,
+    Supervisor,
+    WorkerServer,
+    _responds,
+    resolve_workers,
+)
+
+# Каталог, куда воркеры тестов пишут свои номера
+OUT_DIR_ENV = "TEST_SERVER_OUT_DIR"
+
+
+def record_worker(sockets: Optional[List[socket.socket]] = None) -> None:
+    """Воркер: записать свой pid в файл по номеру и ждать остановки."""
+    path = Path(os.environ[OUT_DIR_ENV]) / os.environ[WORKER_ID_ENV]
+    path.write_text(str(os.getpid()))
+    while True:
+        time.sleep(0.05)
+
+
+def _wait_for(check: Callable[[], bool], timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not check():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.05)
+
+
+@pytest.fixture()
+def listener() -> Iterator[socket.socket]:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    sock.listen()
+    yield sock
+    sock.close()
+
+
+@pytest.fixture()
+def supervisor_factory(
+    listener: socket.socket,
+) -> Iterator[Callable[..., Supervisor]]:
+    """
+    Supervisor без запуска главного цикла; обработчики сигналов,
+    которые он ставит, восстанавливаются, воркеры останавливаются.
+    """
+    handlers = {sig: signal.getsignal(sig) for sig in SIGNALS}
+    created: List[Supervisor] = []
+
+    def factory(workers: int, target=record_worker, **options):
+        config = uvicorn.Config("app.main:create_app", workers=workers)
+        options.setdefault("drain_delay", 0.0)
+        options.setdefault("stop_timeout", 10.0)
+        supervisor = Supervisor(config, target, [listener], **options)
+        created.append(supervisor)
+        return supervisor
+
+    yield factory
+    for supervisor in created:
+        supervisor.terminate_all()
+        supervisor.join_all()
+    for sig, handler in handlers.items():
+        signal.signal(sig, handler)
+
+
+def test_responds_stops_waiting_when_worker_exits() -> None:
+    """
+    Проверить, что проверка живости отвечающего воркера проходит, а для
+    завершающегося воркера, который уже не отвечает, возвращает False
+    по выходу процесса, не дожидаясь таймаута.
+    """
+    spawn = multiprocessing.get_context("spawn")
+
+    def fake(process, answer: bool) -> SimpleNamespace:
+        parent_conn, child_conn = multiprocessing.Pipe()
+        if answer:
+
+            def pong() -> None:
+                child_conn.recv()
+                child_conn.send(b"pong")
+
+            threading.Thread(target=pong, daemon=True).start()
+        process.start()
+        return SimpleNamespace(
+            process=process, parent_conn=parent_conn, child_conn=child_conn
+        )
+
+    alive = fake(spawn.Process(target=time.sleep, args=(30,)), answer=True)
+    exiting = fake(spawn.Process(target=time.sleep, args=(1,)), answer=False)
+    try:
+        assert _responds(alive)
+        started = time.monotonic()
+        assert not _responds(exiting)
+        assert time.monotonic() - started < 4
+    finally:
+        for worker in (alive, exiting):
+            worker.process.kill()
+            worker.process.join()
+
+
+def test_supervisor_restarts_worker_with_same_id(
+    supervisor_factory, listener: socket.socket, tmp_path: Path, monkeypatch
+) -> None:
+    """
+    Проверить, что воркеры получают номера 0..N-1, упавший воркер
+    перезапускается с тем же номером, а при остановке родитель
+    закрывает свой слушающий сокет.
+    """
+    monkeypatch.setenv(OUT_DIR_ENV, str(tmp_path))
+    supervisor = supervisor_factory(workers=2)
+    supervisor.init_processes()
+    _wait_for(lambda: {p.name for p in tmp_path.iterdir()} == {"0", "1"})
+    assert (tmp_path / "0").read_text() == str(supervisor.processes[0].pid)
+
+    first = supervisor.processes[0]
+    first.kill()
+    first.join()
+    supervisor.keep_subprocess_alive()
+    assert supervisor.processes[0] is not first
+    _wait_for(
+        lambda: (tmp_path / "0").read_text()
+        == str(supervisor.processes[0].pid)
+    )
+
+    supervisor.terminate_all()
+    assert listener.fileno() == -1
+    supervisor.join_all()
+    assert not any(p.process.is_alive() for p in supervisor.processes)
+
+
+def test_supervisor_drain_delay(supervisor_factory) -> None:
+    """
+    Проверить, что после SIGTERM остановка начинается только через
+    drain_delay.
+    """
+    supervisor = supervisor_factory(workers=1, drain_delay=0.3)
+    supervisor.handle_term()
+    supervisor.keep_subprocess_alive()
+    assert not supervisor.should_exit.is_set()
+    time.sleep(0.35)
+    supervisor.keep_subprocess_alive()
+    assert supervisor.should_exit.is_set()
+
+
+def test_worker_max_requests_jitter(monkeypatch) -> None:
+    """
+    Проверить, что лимит запросов воркера получает случайную прибавку.
+    """
+    monkeypatch.setattr(uvicorn.Server, "run", lambda self, sockets: None)
+    limits = set()
+    for _ in range(50):
+        config = uvicorn.Config("app.main:create_app", limit_max_requests=10)
+        WorkerServer(config, max_requests_jitter=5).run()
+        limits.add(config.limit_max_requests)
+    assert limits <= set(range(10, 16))
+    assert len(limits) > 1
+
+
+def test_resolve_workers(monkeypatch) -> None:
+    """
+    Проверить число воркеров по умолчанию и отказ от async-приёма
+    ответов при нескольких воркерах.
+    """
+    monkeypatch.setattr(settings, "server_workers", None)
+    monkeypatch.setattr(settings, "answer_ingest_mode", "off")
+    assert resolve_workers() >= 1
+
+    monkeypatch.setattr(settings, "server_workers", 4)
+    assert resolve_workers() == 4
+    monkeypatch.setattr(settings, "answer_ingest_mode", "async")
+    with pytest.raises(ValueError):
+        resolve_workers()
+    monkeypatch.setattr(settings, "server_workers", 1)
+    assert resolve_workers() == 1
@@ -0,0 +1,96 @@
+"""
+Тесты потоковой выгрузки в NDJSON (app.tools.export_ndjson).
+"""
+
+from __future__ import annotations
+
+import json
+from typing import AsyncIterator, List
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import to_async_url
+from app.db import dependences as app_deps
+from app.tools.export_ndjson import iter_ndjson
+
+pytestmark = pytest.mark.anyio
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+
+
+@pytest.fixture()
+async def engine(test_database_url: str) -> AsyncIterator[AsyncEngine]:
+    """
+    Движок тестовой БД с коммитами (выгрузка читает в своей
+    транзакции); созданные тестом вопросы удаляются по завершении.
+    """
+    engine = create_async_engine(
+        to_async_url(test_database_url), poolclass=NullPool
+    )
+    yield engine
+    async with engine.begin() as conn:
+        await conn.execute(
+            sa.text(
+                "DELETE FROM answers WHERE question_id IN "
+                "(SELECT id FROM questions WHERE text LIKE 'snapshot %')"
+            )
+        )
+        await conn.execute(
+            sa.text("DELETE FROM questions WHERE text LIKE 'snapshot %'")
+        )
+    await engine.dispose()
+
+
+async def _insert_question(engine: AsyncEngine, text: str) -> int:
+    async with engine.begin() as conn:
+        question_id = (
+            await conn.execute(
+                sa.text(
+                    "INSERT INTO questions (text) VALUES (:text) "
+                    "RETURNING id"
+                ),
+                {"text": text},
+            )
+        ).scalar_one()
+        await conn.execute(
+            sa.text(
+                "INSERT INTO answers (question_id, user_id, text) "
+                "VALUES (:question_id, :user_id, 'answer')"
+            ),
+            {"question_id": question_id, "user_id": USER_ID},
+        )
+    return question_id
+
+
+async def test_export_reads_one_snapshot(
+    engine: AsyncEngine, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Проверить, что ответы, записанные во время выгрузки вопросов, не
+    попадают в файл без своих вопросов: обе выборки — в одном снимке.
+    """
+    monkeypatch.setattr(
+        app_deps.replica_router,
+        "pick",
+        lambda prefer_primary=False: engine,
+    )
+    await _insert_question(engine, "snapshot before")
+
+    records: List[dict] = []
+    async with app_deps.read_session(snapshot=True) as db:
+        chunks = iter_ndjson(db, batch_size=1)
+        records += map(json.loads, (await chunks.__anext__()).splitlines())
+        late_id = await _insert_question(engine, "snapshot late")
+        async for chunk in chunks:
+            records += map(json.loads, chunk.splitlines())
+
+    question_ids = {r["id"] for r in records if r["type"] == "question"}
+    answer_question_ids = {
+        r["question_id"] for r in records if r["type"] == "answer"
+    }
+    assert question_ids
+    assert late_id not in question_ids
+    assert answer_question_ids <= question_ids
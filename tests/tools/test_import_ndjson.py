@@ -0,0 +1,83 @@
+"""
+Тесты загрузки NDJSON через COPY (app.tools.import_ndjson).
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import sqlalchemy as sa
+from sqlalchemy.engine import Connection
+
+from app.tools.import_ndjson import load_ndjson
+
+QUESTION_ID = 9_000_000_000_001
+USER_ID = "00000000-0000-0000-0000-000000000001"
+
+
+def _write_dump(path: Path) -> None:
+    records = [
+        {
+            "type": "question",
+            "id": QUESTION_ID,
+            "text": "Tab\there,\nnewline and \\ backslash",
+            "created_at": "2024-01-01T00:00:00+00:00",
+        },
+        {
+            "type": "answer",
+            "id": QUESTION_ID,
+            "question_id": QUESTION_ID,
+            "user_id": USER_ID,
+            "text": "Ответ",
+            "created_at": "2024-01-01T00:00:01+00:00",
+        },
+        # Ответ на отсутствующий вопрос пропускается
+        {
+            "type": "answer",
+            "id": QUESTION_ID + 1,
+            "question_id": QUESTION_ID + 100,
+            "user_id": USER_ID,
+            "text": "Orphan",
+            "created_at": "2024-01-01T00:00:02+00:00",
+        },
+    ]
+    path.write_text(
+        "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records),
+        encoding="utf-8",
+    )
+
+
+def test_load_ndjson_copies_and_merges(
+    sync_conn: Connection, tmp_path: Path
+) -> None:
+    """
+    Проверить, что загрузка экранирует спецсимволы COPY, пропускает
+    ответы без вопроса, не дублирует записи при повторе и сдвигает
+    последовательности id.
+    """
+    dump = tmp_path / "dump.ndjson"
+    _write_dump(dump)
+
+    def open_source():
+        return dump.open("r", encoding="utf-8")
+
+    stats = load_ndjson(sync_conn, open_source)
+    assert (stats.questions_read, stats.answers_read) == (1, 2)
+    assert (stats.questions_inserted, stats.answers_inserted) == (1, 1)
+    assert stats.answers_orphaned == 1
+
+    text = sync_conn.execute(
+        sa.text("SELECT text FROM questions WHERE id = :id"),
+        {"id": QUESTION_ID},
+    ).scalar_one()
+    assert text == "Tab\there,\nnewline and \\ backslash"
+
+    again = load_ndjson(sync_conn, open_source)
+    assert (again.questions_inserted, again.answers_inserted) == (0, 0)
+    assert again.answers_orphaned == 1
+
+    next_id = sync_conn.execute(
+        sa.text("SELECT nextval(pg_get_serial_sequence('questions', 'id'))")
+    ).scalar_one()
+    assert next_id > QUESTION_ID